@@ -4,8 +4,8 @@ import sys
 
 import time
 import copy
+import json
 import threading
-import random
 
 from collections import deque
 
@@ -13,20 +13,37 @@ import logging
 logger = logging.getLogger("underworlds.client")
 
 from grpc.beta import implementations
+from grpc.beta import interfaces as beta_interfaces
 from grpc.framework.interfaces.face.face import ExpirationError,NetworkError,AbortionError
 import underworlds.underworlds_pb2 as gRPC
 
-from underworlds.types import World, Node, Situation, MeshData, NEW, DELETE, UPDATE
+from underworlds.types import World, Node, Situation, MeshData, MeshInfo, NEW, DELETE, UPDATE, RESYNC, LOD_FULL
+from underworlds.meshstore import MeshCache, lod_id
 
 from underworlds.helpers.profile import profile, profileonce
 
 _TIMEOUT_SECONDS = 1
 _TIMEOUT_SECONDS_MESH_LOADING = 20
 
+# meshes whose serialized size is larger than this (in bytes) are transferred
+# in chunks of _MESH_CHUNK_SIZE bytes, with pushMeshStream/getMeshStream
+_MESH_STREAMING_THRESHOLD = 2 * 1024 * 1024
+_MESH_CHUNK_SIZE = 1024 * 1024
+
+# max number of consecutive attempts, without any progress, at resuming an
+# interrupted mesh transfer
+_MESH_STREAMING_RETRIES = 3
+_RETRIABLE_STATUS_CODES = [beta_interfaces.StatusCode.DEADLINE_EXCEEDED,
+                           beta_interfaces.StatusCode.UNAVAILABLE]
+
 #TODO: inherit for a collections.MutableSequence? what is the benefit?
 class NodesProxy:
 
-    def __init__(self, context, world):
+    def __init__(self, context, world, snapshot=None):
+        """ If a world snapshot (as returned by the `getScene` RPC) is
+        provided, the nodes are initialized from it. Otherwise, they are
+        lazily fetched from the server.
+        """
 
         self._ctx = context # current underworlds context (useful to know the client name)
         self._world = world
@@ -35,36 +52,91 @@ class NodesProxy:
         # when communicating with the server
         self._server_ctx = gRPC.Context(client=self._ctx.id, world=self._world.name)
 
-        self._len = self._ctx.rpc.getNodesLen(self._server_ctx, _TIMEOUT_SECONDS).size
-
         self._nodes = {} # node store
 
         # list of all node IDs that were once obtained.
         # They may be valid or invalid (if present in _updated_ids)
         self._ids = []
 
-        # list of invalid ids (ie, nodes that have remotely changed).
-        # This list is updated asynchronously from a server publisher
-        self._updated_ids = deque(self._ctx.rpc.getNodesIds(self._server_ctx, _TIMEOUT_SECONDS).ids)
-
         self._deleted_ids = deque()
 
         # holds futures for non-blocking RPC calls when updating/removing nodes
         self.update_future = None
         self.remove_future = None
 
-        # Get the root node
-        self.rootnode = self._ctx.rpc.getRootNode(self._server_ctx, _TIMEOUT_SECONDS).id
-        self._update_node_from_remote(self.rootnode)
+        if snapshot is not None:
+            self._len = len(snapshot.nodes)
+
+            for gRPCNode in snapshot.nodes:
+                self._ids.append(gRPCNode.id)
+                self._nodes[gRPCNode.id] = Node.deserialize(gRPCNode)
+
+            # list of invalid ids (ie, nodes that have remotely changed).
+            # This list is updated asynchronously from a server publisher
+            self._updated_ids = deque()
+
+            self.rootnode = snapshot.rootnode
+
+        else:
+            self._len = self._ctx.rpc.getNodesLen(self._server_ctx, _TIMEOUT_SECONDS).size
+
+            # list of invalid ids (ie, nodes that have remotely changed).
+            # This list is updated asynchronously from a server publisher
+            self._updated_ids = deque(self._ctx.rpc.getNodesIds(self._server_ctx, _TIMEOUT_SECONDS).ids)
+
+            # Get the root node
+            self.rootnode = self._ctx.rpc.getRootNode(self._server_ctx, _TIMEOUT_SECONDS).id
+            self._get_node_from_remote(self.rootnode)
+            self._updated_ids.remove(self.rootnode)
  
         self.waitforchanges_cv = threading.Condition()
         self.lastchange = None
 
+    def _store_pushed_nodes(self, nodes):
+        """ Stores nodes pushed by the server along with their invalidation
+        (push mode), and returns the set of their IDs.
+        """
+        ids = set()
+
+        for gRPCNode in nodes:
+            id = gRPCNode.id
+            if id not in self._ids:
+                self._ids.append(id)
+            self._nodes[id] = Node.deserialize(gRPCNode)
+            if id in self._updated_ids:
+                self._updated_ids.remove(id)
+            ids.add(id)
+
+        return ids
+
+    def _discard_world_fields(self, ids):
+        """ Discards the world transformation and AABB of the known
+        descendants of nodes which have (possibly) moved.
+
+        The server does not invalidate the descendants of the nodes which
+        move: their world transformation and AABB are unknown (None) until
+        they are fetched again.
+        """
+        visited = set()
+        stack = [child for id in ids if id in self._nodes for child in self._nodes[id].children]
+        while stack:
+            id = stack.pop()
+            node = self._nodes.get(id)
+            if node is None or id in visited:
+                continue
+            visited.add(id)
+            node._world_transformation = None
+            node._world_aabb = None
+            stack.extend(node.children)
+
     @profile
-    def _on_remotely_updated_nodes(self, ids):
+    def _on_remotely_updated_nodes(self, ids, nodes=()):
+
+        self._discard_world_fields(ids)
+        pushed = self._store_pushed_nodes(nodes)
 
         for id in ids:
-            if id not in self._updated_ids:
+            if id not in pushed and id not in self._updated_ids:
                 self._updated_ids.append(id)
 
         with self.waitforchanges_cv:
@@ -73,12 +145,16 @@ class NodesProxy:
 
 
     @profile
-    def _on_remotely_added_nodes(self, ids):
+    def _on_remotely_added_nodes(self, ids, nodes=()):
+
+        # nodes we already know (eg, obtained with the initial snapshot or
+        # with a resync) are not counted twice
+        self._len += len([id for id in ids if id not in self._nodes and id not in self._updated_ids])
 
-        self._len += len(ids)
+        pushed = self._store_pushed_nodes(nodes)
 
         for id in ids:
-            if id not in self._updated_ids:
+            if id not in pushed and id not in self._updated_ids:
                 self._updated_ids.append(id)
 
         with self.waitforchanges_cv:
@@ -89,14 +165,44 @@ class NodesProxy:
     @profile
     def _on_remotely_deleted_nodes(self, ids):
 
-        self._len -= len(ids)
-        self._deleted_ids.extend(ids)
+        # the invalidations may refer to nodes we do not know (eg, deleted
+        # before the initial snapshot was taken): these are ignored
+        for id in ids:
+            known = id in self._nodes and id not in self._deleted_ids
+            pending = id in self._updated_ids
+            if pending:
+                self._updated_ids.remove(id)
+            if known:
+                self._deleted_ids.append(id)
+            if known or pending:
+                self._len -= 1
 
         with self.waitforchanges_cv:
             self.lastchange = (ids, DELETE)
             self.waitforchanges_cv.notify_all()
 
 
+    def _apply_changes(self, changes):
+        """ Brings the nodes up to date with a set of changes obtained with
+        the `getChangesSince` RPC (see WorldProxy.resync).
+
+        Applying changes that are already known is harmless.
+        """
+
+        for id in changes.deleted_ids:
+            if id in self._updated_ids:
+                self._updated_ids.remove(id)
+            if id in self._nodes and id not in self._deleted_ids:
+                self._deleted_ids.append(id)
+
+        self._discard_world_fields(changes.updated_ids)
+
+        for id in list(changes.new_ids) + list(changes.updated_ids):
+            if id not in self._updated_ids:
+                self._updated_ids.append(id)
+
+        self._len = changes.size
+
     def _get_more_node(self):
         
         if not self._updated_ids:
@@ -110,10 +216,9 @@ class NodesProxy:
                              "IPC transport is really slow.")
                 raise Exception()
 
-        # here, _updated_ids is not empty. It should not raise an exception
-        id = self._updated_ids.pop()
-
-        self._get_node_from_remote(id)
+        # fetched as a batch, even for a single node: nodes deleted in the
+        # meantime are then skipped instead of failing
+        self._update_stale_nodes_from_remote()
 
     def _get_node_from_remote(self, id):
 
@@ -131,11 +236,53 @@ class NodesProxy:
         self._nodes[id] = Node.deserialize(gRPCNode)
 
 
+    def _update_stale_nodes_from_remote(self):
+        """ Refreshes all the nodes marked as updated in a single call.
+
+        Nodes that do not exist anymore on the server are removed right
+        away: as they are not pending anymore, the invalidation notifying
+        their deletion is then ignored (see _on_remotely_deleted_nodes).
+        """
+        ids = []
+        while self._updated_ids:
+            ids.append(self._updated_ids.popleft())
+
+        nodesInCtxt = gRPC.NodesInContext(context=self._server_ctx)
+        nodesInCtxt.nodes.extend([gRPC.Node(id=id) for id in ids])
+
+        fetched = set()
+        try:
+            for gRPCNode in self._ctx.rpc.getNodes(nodesInCtxt, _TIMEOUT_SECONDS):
+                id = gRPCNode.id
+
+                # is it a new node, or rather an update to an existing one?
+                if id not in self._nodes:
+                    self._ids.append(id)
+
+                self._nodes[id] = Node.deserialize(gRPCNode)
+                fetched.add(id)
+        except AbortionError as e:
+            # the nodes we did not get are still stale
+            self._updated_ids.extend([id for id in ids if id not in fetched])
+            raise ValueError(e.details)
+
+        for id in ids:
+            if id in fetched:
+                continue
+            # deleted on the server between its invalidation and now
+            if id in self._nodes and id not in self._deleted_ids:
+                self._deleted_ids.append(id)
+            self._len -= 1
+
     def _update_node_from_remote(self, id):
 
-        self._get_node_from_remote(id)
+        if len(self._updated_ids) > 1:
+            # several nodes are stale: refresh them all at once
+            self._update_stale_nodes_from_remote()
+        else:
+            self._get_node_from_remote(id)
 
-        self._updated_ids.remove(id)
+            self._updated_ids.remove(id)
 
     def __getitem__(self, key):
 
@@ -161,6 +308,9 @@ class NodesProxy:
             # not downloaded enough nodes yet?
             while key >= len(self._ids):
                 self._get_more_node()
+                # some of the nodes may have vanished in the meantime
+                if key >= self._len:
+                    raise IndexError
 
             id = self._ids[key]
 
@@ -284,11 +434,11 @@ class NodesProxy:
 
 class SceneProxy(object):
 
-    def __init__(self, ctx, world):
+    def __init__(self, ctx, world, snapshot=None):
 
         self._ctx = ctx # context
 
-        self.nodes = NodesProxy(self._ctx, world)
+        self.nodes = NodesProxy(self._ctx, world, snapshot)
 
     @property
     def rootnode(self):
@@ -318,11 +468,69 @@ class SceneProxy(object):
     def nodebyname(self, name):
         """ Returns a list of node that have the given name (or [] if no node has this name)
         """
-        nodes = []
-        for n in self.nodes:
-            if n.name == name:
-                nodes.append(n)
-        return nodes
+        return [self.nodes[id] for id in self.find(name=name)]
+
+    def find(self, name=None, types=None, properties=None):
+        """ Returns the IDs of the nodes matching all the given criteria.
+
+        The nodes are looked up by the server, in its indices: only the
+        matching nodes need to be fetched afterwards.
+
+        :param name: the name of the nodes
+        :param types: a list of accepted node types
+        :param properties: a dictionary of properties the nodes must have.
+        A node matches a property if its value is the given one, or contains
+        it (if the property is a list). None matches any value.
+        """
+        f = gRPC.NodeFilter(name=name or "", types=types or [])
+        for key, value in (properties or {}).items():
+            f.properties[key] = "" if value is None else json.dumps(value)
+
+        ids = self._ctx.rpc.findNodes(gRPC.NodeFilterInContext(context=self.nodes._server_ctx,
+                                                               filter=f),
+                                      _TIMEOUT_SECONDS)
+        return list(ids.ids)
+
+    def query_box(self, bb_min, bb_max):
+        """ Returns the IDs of the nodes whose world AABB (see
+        Node.world_aabb) intersects the given box.
+
+        The query is performed by the server, using its spatial index of the
+        world. The nodes without geometry are represented by the origin of
+        their frame.
+
+        :param bb_min: (x, y, z) minimum corner of the box, in the world frame
+        :param bb_max: (x, y, z) maximum corner of the box, in the world frame
+        """
+        x1, y1, z1 = bb_min
+        x2, y2, z2 = bb_max
+        ids = self._ctx.rpc.queryBox(gRPC.BoxInContext(context=self.nodes._server_ctx,
+                                                       min=gRPC.Pointf(x=x1, y=y1, z=z1),
+                                                       max=gRPC.Pointf(x=x2, y=y2, z=z2)),
+                                     _TIMEOUT_SECONDS)
+        return list(ids.ids)
+
+    def query_sphere(self, center, radius):
+        """ Returns the IDs of the nodes whose world AABB intersects the given
+        sphere (see SceneProxy.query_box).
+        """
+        x, y, z = center
+        ids = self._ctx.rpc.querySphere(gRPC.SphereInContext(context=self.nodes._server_ctx,
+                                                             center=gRPC.Pointf(x=x, y=y, z=z),
+                                                             radius=radius),
+                                        _TIMEOUT_SECONDS)
+        return list(ids.ids)
+
+    def nearest(self, point, k=1):
+        """ Returns the IDs of the k nodes whose world AABB is the nearest to
+        a point, nearest first (see SceneProxy.query_box).
+        """
+        x, y, z = point
+        ids = self._ctx.rpc.kNearest(gRPC.NearestInContext(context=self.nodes._server_ctx,
+                                                           point=gRPC.Pointf(x=x, y=y, z=z),
+                                                           k=k),
+                                     _TIMEOUT_SECONDS)
+        return list(ids.ids)
 
     def append_and_propagate(self, nodes):
         """An alias for NodesProxy.append
@@ -342,7 +550,11 @@ class SceneProxy(object):
 
 class TimelineProxy:
 
-    def __init__(self, ctx, world):
+    def __init__(self, ctx, world, snapshot=None):
+        """ If a world snapshot (as returned by the `getScene` RPC) is
+        provided, the situations are initialized from it. Otherwise, they are
+        lazily fetched from the server.
+        """
 
         self._ctx = ctx # context
         self._world = world
@@ -351,26 +563,40 @@ class TimelineProxy:
         # when communicating with the server
         self._server_ctx = gRPC.Context(client=self._ctx.id, world=self._world.name)
 
-        self._len = self._ctx.rpc.getSituationsLen(self._server_ctx, _TIMEOUT_SECONDS).size
-
         self._situations = {}
 
         # list of all node IDs that were once obtained.
         # They may be valid or invalid (if present in _updated_ids)
         self._ids = []
 
-        # list of invalid ids (ie, nodes that have remotely changed).
-        # This list is updated asynchronously from a server publisher
-        self._updated_ids = deque(self._ctx.rpc.getSituationsIds(self._server_ctx, _TIMEOUT_SECONDS).ids)
-
         self._deleted_ids = deque()
 
         # holds futures for non-blocking RPC calls when updating/removing nodes
         self.update_future = None
         self.remove_future = None
 
+        if snapshot is not None:
+            self._len = len(snapshot.situations)
+
+            for gRPCSituation in snapshot.situations:
+                self._ids.append(gRPCSituation.id)
+                self._situations[gRPCSituation.id] = Situation.deserialize(gRPCSituation)
+
+            # list of invalid ids (ie, nodes that have remotely changed).
+            # This list is updated asynchronously from a server publisher
+            self._updated_ids = deque()
+
+            self.origin = snapshot.origin.time
+
+        else:
+            self._len = self._ctx.rpc.getSituationsLen(self._server_ctx, _TIMEOUT_SECONDS).size
+
+            # list of invalid ids (ie, nodes that have remotely changed).
+            # This list is updated asynchronously from a server publisher
+            self._updated_ids = deque(self._ctx.rpc.getSituationsIds(self._server_ctx, _TIMEOUT_SECONDS).ids)
+
+            self.origin = self._ctx.rpc.timelineOrigin(self._server_ctx, _TIMEOUT_SECONDS).time
 
-        self.origin = self._ctx.rpc.timelineOrigin(self._server_ctx, _TIMEOUT_SECONDS).time
         logger.debug("Accessing world <%s> (initially created on  %s)"%(self._world.name, time.asctime(time.localtime(self.origin))))
 
         self.waitforchanges_cv = threading.Condition()
@@ -390,8 +616,9 @@ class TimelineProxy:
     @profile
     def _on_remotely_added_situations(self, ids):
 
-
-        self._len += len(ids)
+        # situations we already know (eg, obtained with the initial snapshot
+        # or with a resync) are not counted twice
+        self._len += len([id for id in ids if id not in self._situations and id not in self._updated_ids])
 
         for id in ids:
             if id not in self._updated_ids:
@@ -405,13 +632,41 @@ class TimelineProxy:
     @profile
     def _on_remotely_deleted_situations(self, ids):
 
-        self._len -= len(ids)
-        self._deleted_ids.extend(ids)
+        # the invalidations may refer to situations we do not know (eg,
+        # deleted before the initial snapshot was taken): these are ignored
+        for id in ids:
+            known = id in self._situations and id not in self._deleted_ids
+            pending = id in self._updated_ids
+            if pending:
+                self._updated_ids.remove(id)
+            if known:
+                self._deleted_ids.append(id)
+            if known or pending:
+                self._len -= 1
 
         with self.waitforchanges_cv:
             self.lastchange = (ids, DELETE)
             self.waitforchanges_cv.notify_all()
 
+    def _apply_changes(self, changes):
+        """ Brings the situations up to date with a set of changes obtained
+        with the `getChangesSince` RPC (see WorldProxy.resync).
+
+        Applying changes that are already known is harmless.
+        """
+
+        for id in changes.deleted_ids:
+            if id in self._updated_ids:
+                self._updated_ids.remove(id)
+            if id in self._situations and id not in self._deleted_ids:
+                self._deleted_ids.append(id)
+
+        for id in list(changes.new_ids) + list(changes.updated_ids):
+            if id not in self._updated_ids:
+                self._updated_ids.append(id)
+
+        self._len = changes.size
+
     def _get_more_situations(self):
         
         if not self._updated_ids:
@@ -692,19 +947,61 @@ class WorldProxy:
         self._world = World(name)
 
         self.name = name
-        self.scene = SceneProxy(self._ctx, self._world)
-        self.timeline = TimelineProxy(self._ctx, self._world)
+
+        self._server_ctx = gRPC.Context(client=self._ctx.id, world=name)
+
+        self._bootstrap()
+
+    def _bootstrap(self):
+        """ Creates the scene and the timeline from a snapshot of the world,
+        obtained in a single call.
+        """
+        snapshot = self._ctx.rpc.getScene(self._server_ctx, _TIMEOUT_SECONDS)
+
+        # the revision of the world at the last synchronisation with the server
+        self.revision = snapshot.revision
+
+        self.scene = SceneProxy(self._ctx, self._world, snapshot)
+        self.timeline = TimelineProxy(self._ctx, self._world, snapshot)
+
+    def resync(self):
+        """ Resynchronises the world with the server, for instance after
+        missed invalidations.
+
+        Only the changes since the last synchronisation are fetched. If these
+        changes are too old to be known by the server, the whole world is
+        fetched again: in that case, `scene` and `timeline` are replaced by
+        new instances.
+        """
+        changes = self._ctx.rpc.getChangesSince(gRPC.RevisionInContext(context=self._server_ctx,
+                                                                       revision=self.revision),
+                                                _TIMEOUT_SECONDS)
+
+        if changes.outdated:
+            logger.warning("Changes in world <%s> since revision %d are not known anymore. "
+                           "Fetching the whole world." % (self.name, self.revision))
+            self._bootstrap()
+            return
+
+        self.scene.nodes._apply_changes(changes.nodes)
+        self.timeline._apply_changes(changes.situations)
+        self.revision = changes.revision
 
     def copy_from(self, world):
         """ Creates and/or replaces the content of the world with an exact copy
-        of the given `world`.
-        """
-        req = {"client":self._ctx.id,
-               "world": self._world.name,
-               "req": "deepcopy %s" % (world.name)}
+        of the given `world` (a world proxy or a world name).
+
+        The copy is performed by the server, without transferring the content
+        of the world. The root node of this world is kept (with the content of
+        the other world's root node), so that the existing references to it
+        remain valid.
 
-        self._ctx.rpc.send_json(req)
-        self._ctx.rpc.recv() #ack
+        As for any other change, the new content is propagated asynchronously
+        to this world proxy.
+        """
+        self._ctx.rpc.forkWorld(gRPC.WorldInContext(context=self._server_ctx,
+                                                    world=str(world)),
+                                _TIMEOUT_SECONDS)
 
     def __str__(self):
         return self.name
@@ -739,72 +1036,24 @@ class WorldsProxy:
         for world in topo.worlds:
             yield self.__getitem__(world)
 
-class InvalidationServer(gRPC.BetaUnderworldsInvalidationServicer):
-
-    def __init__(self, ctx):
-        self.ctx=ctx
-
-    @profile
-    def emitInvalidation(self, invalidation, context):
-        logger.debug("Got <emitInvalidation> for world <%s>" % invalidation.world)
-       
-        target, action, world, ids = invalidation.target, invalidation.type, invalidation.world, invalidation.ids
-
-        if target == gRPC.Invalidation.SCENE:
-            if action == UPDATE:
-                logger.debug("Server notification: nodes updated: " + str(ids))
-                self.ctx.worlds[world].scene.nodes._on_remotely_updated_nodes(ids)
-            elif action == NEW:
-                logger.debug("Server notification: nodes added: " + str(ids))
-                self.ctx.worlds[world].scene.nodes._on_remotely_added_nodes(ids)
-            elif action == DELETE:
-                logger.debug("Server notification: nodes deleted: " + str(ids))
-                self.ctx.worlds[world].scene.nodes._on_remotely_deleted_nodes(ids)
-            else:
-                raise RuntimeError("Unexpected invalidation action")
-
-        elif target == gRPC.Invalidation.TIMELINE:
-            if action == UPDATE:
-                logger.debug("Server notification: situations updated: " + str(ids))
-                self.ctx.worlds[world].timeline._on_remotely_updated_situations(ids)
-            elif action == NEW:
-                logger.debug("Server notification: situations added: " + str(ids))
-                self.ctx.worlds[world].timeline._on_remotely_added_situations(ids)
-            elif action == DELETE:
-                logger.debug("Server notification: situations deleted: " + str(ids))
-                self.ctx.worlds[world].timeline._on_remotely_deleted_situations(ids)
-            else:
-                raise RuntimeError("Unexpected invalidation action")
-        else:
-            raise RuntimeError("Unexpected invalidation target")
-
-        return gRPC.Empty()
-
-
 class Context(object):
 
-    def __init__(self, name, host="localhost",port=50051):
+    def __init__(self, name, host="localhost",port=50051, push_nodes=False):
+        """ Connects to the underworlds server.
+
+        If `push_nodes` is true, the server sends the new or updated nodes
+        along with their invalidations, so that they do not have to be
+        fetched afterwards (push mode). This trades bandwidth for latency.
+        """
 
         self.name = name
         self.worlds = WorldsProxy(self)
 
-        self.invalidation_port = 0
-
-        while self.invalidation_port == 0:
-            invalidation_port = random.randint(port + 1,60000)
-            logger.debug("Creating my own invalidation server on port %s..." % (invalidation_port))
-
-            self.invalidation_server = gRPC.beta_create_UnderworldsInvalidation_server(InvalidationServer(self))
-            self.invalidation_port = self.invalidation_server.add_insecure_port('[::]:%d' % invalidation_port)
-
-            if self.invalidation_port == 0:
-                logger.error("The port for my invalidation server is already in use! Trying another one...")
-
-
-        self.invalidation_server.start()
-
-        logger.debug("Invalidation server created")
-
+        # local cache of the meshes, shared with the other clients of the
+        # host (see underworlds.meshstore.MeshCache)
+        self.mesh_cache = MeshCache()
+        # mesh ID -> MeshInfo
+        self._mesh_infos = {}
 
         if "UWDS_SERVER" in os.environ and os.environ["UWDS_SERVER"] != "":
             if ":" in os.environ["UWDS_SERVER"]:
@@ -821,8 +1070,8 @@ class Context(object):
             self.rpc = gRPC.beta_create_Underworlds_stub(channel)
 
             self.id = self.rpc.helo(gRPC.Welcome(name=name,
-                                                 host="localhost", 
-                                                 invalidation_server_port=self.invalidation_port), _TIMEOUT_SECONDS).id
+                                                 push_nodes=push_nodes,
+                                                 packed_meshes=True), _TIMEOUT_SECONDS).id
         except NetworkError as e:
             logger.fatal("Underworlds server unreachable on %s:%d! Is it started?\n"
                          "Set UWDS_SERVER=host:port if underworlded is running on a different machine.\n"
@@ -835,6 +1084,70 @@ class Context(object):
 
         logger.debug("<%s> connected to the underworlds server." % self.name)
 
+        # the invalidations are streamed by the server on the same channel,
+        # and processed in a dedicated thread. No timeout: the stream remains
+        # open until we say byebye.
+        self._invalidations = self.rpc.subscribe(gRPC.Client(id=self.id), None)
+        self._invalidations_thread = threading.Thread(target=self._process_invalidations,
+                                                      name="invalidations for <%s>" % self.name)
+        self._invalidations_thread.daemon = True
+        self._invalidations_thread.start()
+
+    def _process_invalidations(self):
+
+        try:
+            for invalidation in self._invalidations:
+                # a failing invalidation must not stop the processing of the
+                # following ones
+                try:
+                    self._on_invalidation(invalidation)
+                except AbortionError:
+                    raise
+                except Exception:
+                    logger.exception("Error while processing an invalidation for world <%s>" % invalidation.world)
+        except AbortionError as e:
+            logger.warning("The stream of invalidations from the server has been interrupted: %s" % str(e))
+
+    @profile
+    def _on_invalidation(self, invalidation):
+        logger.debug("Got invalidation for world <%s>" % invalidation.world)
+
+        target, action, world, ids = invalidation.target, invalidation.type, invalidation.world, invalidation.ids
+
+        if action == RESYNC:
+            # the server had to drop some of our invalidations for this world
+            logger.warning("Server notification: invalidations for world <%s> have been missed. "
+                           "Resynchronising." % world)
+            self.worlds[world].resync()
+
+        elif target == gRPC.Invalidation.SCENE:
+            if action == UPDATE:
+                logger.debug("Server notification: nodes updated: " + str(ids))
+                self.worlds[world].scene.nodes._on_remotely_updated_nodes(ids, invalidation.nodes)
+            elif action == NEW:
+                logger.debug("Server notification: nodes added: " + str(ids))
+                self.worlds[world].scene.nodes._on_remotely_added_nodes(ids, invalidation.nodes)
+            elif action == DELETE:
+                logger.debug("Server notification: nodes deleted: " + str(ids))
+                self.worlds[world].scene.nodes._on_remotely_deleted_nodes(ids)
+            else:
+                raise RuntimeError("Unexpected invalidation action")
+
+        elif target == gRPC.Invalidation.TIMELINE:
+            if action == UPDATE:
+                logger.debug("Server notification: situations updated: " + str(ids))
+                self.worlds[world].timeline._on_remotely_updated_situations(ids)
+            elif action == NEW:
+                logger.debug("Server notification: situations added: " + str(ids))
+                self.worlds[world].timeline._on_remotely_added_situations(ids)
+            elif action == DELETE:
+                logger.debug("Server notification: situations deleted: " + str(ids))
+                self.worlds[world].timeline._on_remotely_deleted_situations(ids)
+            else:
+                raise RuntimeError("Unexpected invalidation action")
+        else:
+            raise RuntimeError("Unexpected invalidation target")
+
 
     def reset(self):
         """ Hard reset of Underworlds: all the worlds are deleted.
@@ -867,30 +1180,153 @@ class Context(object):
         """
         return self.rpc.uptime(gRPC.Client(id=self.id),_TIMEOUT_SECONDS).time
 
+    def stats(self):
+        """Returns the metrics of the server, as a dictionary (see
+        underworlds.helpers.metrics.Metrics.snapshot):
+        - 'latencies': histograms of the latencies (in seconds) of the RPCs
+          (`rpc.<name>`) and of some steps of the server's hot paths
+        - 'counters': number of calls and request/response bytes of the RPCs,
+          number of invalidations enqueued and dropped...
+        - 'gauges': the number of nodes of each world, and the invalidation
+          queue depth and lag of each client
+        """
+        return json.loads(self.rpc.stats(gRPC.Client(id=self.id), _TIMEOUT_SECONDS).metrics)
+
     def has_mesh(self, id):
         ok = self.rpc.hasMesh(gRPC.MeshInContext(client=gRPC.Client(id=self.id),
                                                    mesh=gRPC.Mesh(id=id)),
                               _TIMEOUT_SECONDS)
         return ok.value
 
-    def mesh(self, id):
-        mesh = self.rpc.getMesh(gRPC.MeshInContext(client=gRPC.Client(id=self.id),
-                                                   mesh=gRPC.Mesh(id=id)),
-                              _TIMEOUT_SECONDS_MESH_LOADING)
-        return MeshData.deserialize(mesh)
+    def mesh(self, id, lod=LOD_FULL):
+        """ Returns a mesh (a MeshData) from its ID.
+
+        The mesh is only downloaded from the server if it is not in the local
+        mesh cache yet.
+
+        :param lod: the level of detail of the mesh (see underworlds.types):
+        LOD_FULL (the default) returns the mesh itself, LOD_HIGH and LOD_LOW
+        simplified versions of the mesh, and LOD_HULL its convex hull.
+        """
+        try:
+            return self.mesh_cache[lod_id(id, lod)]
+        except KeyError:
+            pass
+
+        try:
+            mesh = self.rpc.getMesh(gRPC.MeshInContext(client=gRPC.Client(id=self.id),
+                                                       mesh=gRPC.Mesh(id=id),
+                                                       lod=lod),
+                                  _TIMEOUT_SECONDS_MESH_LOADING)
+        except AbortionError as e:
+            if e.code != beta_interfaces.StatusCode.RESOURCE_EXHAUSTED:
+                raise
+            # the mesh is too large to be sent at once
+            mesh = gRPC.Mesh.FromString(self._get_mesh_stream(id, lod))
+
+        self.mesh_cache[lod_id(id, lod)] = mesh
+        return self.mesh_cache[lod_id(id, lod)]
+
+    def mesh_info(self, id):
+        """ Returns the geometric properties of a mesh (a MeshInfo: bounding
+        box, bounding sphere and convex hull vertices) from its ID.
+
+        They are precomputed by the server, and much cheaper to fetch than
+        the mesh itself. If the mesh has just been pushed, this waits (up to
+        _TIMEOUT_SECONDS_MESH_LOADING) for the server to compute them.
+        """
+        if id not in self._mesh_infos:
+            deadline = time.time() + _TIMEOUT_SECONDS_MESH_LOADING
+            while True:
+                try:
+                    info = self.rpc.getMeshInfo(gRPC.MeshInContext(client=gRPC.Client(id=self.id),
+                                                                   mesh=gRPC.Mesh(id=id)),
+                                                _TIMEOUT_SECONDS_MESH_LOADING)
+                    break
+                except AbortionError as e:
+                    # UNAVAILABLE: the properties are not computed yet
+                    if e.code != beta_interfaces.StatusCode.UNAVAILABLE or time.time() > deadline:
+                        raise
+                    time.sleep(0.05)
+            self._mesh_infos[id] = MeshInfo.deserialize(info)
+
+        return self._mesh_infos[id]
 
     def push_mesh(self, mesh):
 
         starttime = time.time()
+        gRPCMesh = mesh.serialize(gRPC.Mesh)
+        self.mesh_cache[mesh.id] = gRPCMesh
         try:
-            self.rpc.pushMesh(gRPC.MeshInContext(client=gRPC.Client(id=self.id),
-                                             mesh=mesh.serialize(gRPC.Mesh)),
-                              _TIMEOUT_SECONDS_MESH_LOADING)
+            if gRPCMesh.ByteSize() > _MESH_STREAMING_THRESHOLD:
+                self._push_mesh_stream(mesh.id, gRPCMesh.SerializeToString())
+            else:
+                self.rpc.pushMesh(gRPC.MeshInContext(client=gRPC.Client(id=self.id),
+                                                 mesh=gRPCMesh),
+                                  _TIMEOUT_SECONDS_MESH_LOADING)
         except ExpirationError:
             logger.error("Timeout while trying to push a mesh to the server!")
 
         logger.info("Pushed mesh <%s> in %.2fsec" % (mesh.id, time.time() - starttime))
 
+    def _get_mesh_stream(self, id, lod=LOD_FULL):
+        """ Downloads a serialized mesh in chunks, resuming the download
+        where it stopped if it gets interrupted.
+        """
+        data = bytearray()
+        size = None
+        failures = 0
+
+        while size is None or len(data) < size:
+            offset = len(data)
+            try:
+                for chunk in self.rpc.getMeshStream(gRPC.MeshChunk(client=gRPC.Client(id=self.id),
+                                                                   id=id,
+                                                                   offset=offset,
+                                                                   lod=lod),
+                                                    _TIMEOUT_SECONDS_MESH_LOADING):
+                    data += chunk.data
+                    size = chunk.size
+                if size is None: # empty mesh
+                    break
+            except AbortionError as e:
+                failures = 0 if len(data) > offset else failures + 1
+                if e.code not in _RETRIABLE_STATUS_CODES or failures == _MESH_STREAMING_RETRIES:
+                    raise
+                logger.warning("Download of mesh <%s> interrupted after %d bytes. Resuming." % (id, len(data)))
+
+        return bytes(data)
+
+    def _push_mesh_stream(self, id, data):
+        """ Uploads a serialized mesh in chunks, resuming the upload where the
+        server stopped receiving it (possibly during a previous call) if it
+        gets interrupted.
+        """
+        client = gRPC.Client(id=self.id)
+        request = gRPC.MeshChunk(client=client, id=id)
+        failures = 0
+
+        offset = self.rpc.getPushedMeshOffset(request, _TIMEOUT_SECONDS).offset
+
+        while offset < len(data):
+            chunks = (gRPC.MeshChunk(client=client,
+                                     id=id,
+                                     offset=start,
+                                     size=len(data),
+                                     data=data[start:start + _MESH_CHUNK_SIZE])
+                      for start in range(offset, len(data), _MESH_CHUNK_SIZE))
+            try:
+                offset = self.rpc.pushMeshStream(chunks, _TIMEOUT_SECONDS_MESH_LOADING).offset
+            except AbortionError as e:
+                if e.code not in _RETRIABLE_STATUS_CODES:
+                    raise
+                received = self.rpc.getPushedMeshOffset(request, _TIMEOUT_SECONDS).offset
+                failures = 0 if received > offset else failures + 1
+                if failures == _MESH_STREAMING_RETRIES:
+                    raise
+                offset = received
+                logger.warning("Upload of mesh <%s> interrupted after %d bytes. Resuming." % (id, offset))
+
     def __enter__(self):
         return self
 
@@ -900,7 +1336,14 @@ class Context(object):
     def close(self):
         logger.debug("Closing context [%s]..." % self.name)
         self.rpc.byebye(gRPC.Client(id=self.id), _TIMEOUT_SECONDS)
-        self.invalidation_server.stop(1).wait()
+
+        # the server closes the invalidation stream once all the pending
+        # invalidations are sent
+        self._invalidations_thread.join(_TIMEOUT_SECONDS)
+        if self._invalidations_thread.is_alive():
+            self._invalidations.cancel()
+
+        self.mesh_cache.close()
         logger.debug("The context [%s] is now closed." % self.name)
 
     def __repr__(self):
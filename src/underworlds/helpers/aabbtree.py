@@ -0,0 +1,290 @@
+""" Dynamic bounding volume hierarchy of axis-aligned bounding boxes.
+
+Boxes are given as (min, max) pairs of (x, y, z) sequences.
+"""
+
+import heapq
+
+class _TreeNode(object):
+
+    __slots__ = ("min", "max", "parent", "left", "right", "height", "id")
+
+    def __init__(self, bb_min, bb_max, parent = None, id = None):
+        self.min = bb_min
+        self.max = bb_max
+        self.parent = parent
+        self.left = None
+        self.right = None
+        self.height = 0 # 0 for the leaves
+        self.id = id
+
+    def is_leaf(self):
+        return self.left is None
+
+def _union(a_min, a_max, b_min, b_max):
+    return (min(a_min[0], b_min[0]), min(a_min[1], b_min[1]), min(a_min[2], b_min[2])), \
+           (max(a_max[0], b_max[0]), max(a_max[1], b_max[1]), max(a_max[2], b_max[2]))
+
+def _area(bb_min, bb_max):
+    dx, dy, dz = bb_max[0] - bb_min[0], bb_max[1] - bb_min[1], bb_max[2] - bb_min[2]
+    return 2 * (dx * dy + dy * dz + dz * dx)
+
+def _distance2(point, bb_min, bb_max):
+    """ Returns the squared distance between a point and a box (0 if the
+    point is inside the box).
+    """
+    d = 0.
+    for i in range(3):
+        if point[i] < bb_min[i]:
+            d += (bb_min[i] - point[i]) ** 2
+        elif point[i] > bb_max[i]:
+            d += (point[i] - bb_max[i]) ** 2
+    return d
+
+class AABBTree(object):
+    """ A dynamic AABB tree (as found in eg Box2D): a binary tree whose
+    leaves are the indexed objects' boxes, and whose inner nodes bound their
+    children.
+
+    Objects are inserted where they increase the least the area of the tree,
+    and the tree is kept balanced by rotations: insertion, update and removal
+    are O(log n), and queries are O(log n + k) for k results.
+
+    The tree is not thread-safe.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._leaves = {} # object ID -> leaf
+
+    def __len__(self):
+        return len(self._leaves)
+
+    def __contains__(self, id):
+        return id in self._leaves
+
+    def aabb(self, id):
+        """ Returns the box of an object, as a (min, max) pair.
+
+        :raises KeyError: if the object is not indexed
+        """
+        leaf = self._leaves[id]
+        return leaf.min, leaf.max
+
+    def update(self, id, bb_min, bb_max):
+        """ Inserts an object in the tree, or moves it if already indexed.
+        """
+        bb_min, bb_max = tuple(float(v) for v in bb_min), tuple(float(v) for v in bb_max)
+
+        leaf = self._leaves.get(id)
+        if leaf is not None:
+            if leaf.min == bb_min and leaf.max == bb_max:
+                return
+            self._remove_leaf(leaf)
+
+        leaf = _TreeNode(bb_min, bb_max, id = id)
+        self._leaves[id] = leaf
+        self._insert_leaf(leaf)
+
+    def remove(self, id):
+        """ Removes an object from the tree (if indexed).
+        """
+        leaf = self._leaves.pop(id, None)
+        if leaf is not None:
+            self._remove_leaf(leaf)
+
+    def query_box(self, bb_min, bb_max):
+        """ Returns the IDs of the objects whose box intersects the given box.
+        """
+        res = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            if node.min[0] > bb_max[0] or node.max[0] < bb_min[0] or \
+               node.min[1] > bb_max[1] or node.max[1] < bb_min[1] or \
+               node.min[2] > bb_max[2] or node.max[2] < bb_min[2]:
+                continue
+            if node.is_leaf():
+                res.append(node.id)
+            else:
+                stack.append(node.left)
+                stack.append(node.right)
+        return res
+
+    def query_sphere(self, center, radius):
+        """ Returns the IDs of the objects whose box intersects the given
+        sphere.
+        """
+        radius2 = radius * radius
+
+        res = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            if _distance2(center, node.min, node.max) > radius2:
+                continue
+            if node.is_leaf():
+                res.append(node.id)
+            else:
+                stack.append(node.left)
+                stack.append(node.right)
+        return res
+
+    def nearest(self, point, k = 1):
+        """ Returns the IDs of the k objects whose box is the nearest to a
+        point, nearest first, as a list of (ID, distance) pairs.
+
+        The distance to a box is 0 if the point is inside the box.
+        """
+        res = []
+        if self._root is None or k <= 0:
+            return res
+
+        # best-first traversal: a node is never closer than its parent
+        heap = [(0., 0, self._root)]
+        count = 1 # (breaks the ties between nodes)
+        while heap and len(res) < k:
+            distance2, _, node = heapq.heappop(heap)
+            if node.is_leaf():
+                res.append((node.id, distance2 ** 0.5))
+                continue
+            for child in (node.left, node.right):
+                heapq.heappush(heap, (_distance2(point, child.min, child.max), count, child))
+                count += 1
+        return res
+
+    def _insert_leaf(self, leaf):
+
+        if self._root is None:
+            self._root = leaf
+            return
+
+        # finds the best sibling for the new leaf, ie the one minimizing the
+        # increase of the area of the tree
+        node = self._root
+        while not node.is_leaf():
+            area = _area(node.min, node.max)
+            combined = _area(*_union(node.min, node.max, leaf.min, leaf.max))
+
+            # cost of creating a new parent for this node and the leaf...
+            cost = 2 * combined
+            # ...and minimum cost of pushing the leaf further down
+            inheritance = 2 * (combined - area)
+
+            costs = []
+            for child in (node.left, node.right):
+                child_cost = _area(*_union(child.min, child.max, leaf.min, leaf.max))
+                if not child.is_leaf():
+                    child_cost -= _area(child.min, child.max)
+                costs.append(child_cost + inheritance)
+
+            if cost < costs[0] and cost < costs[1]:
+                break
+
+            node = node.left if costs[0] < costs[1] else node.right
+
+        sibling = node
+        old_parent = sibling.parent
+
+        parent = _TreeNode(*_union(sibling.min, sibling.max, leaf.min, leaf.max), parent = old_parent)
+        parent.height = sibling.height + 1
+        parent.left, parent.right = sibling, leaf
+        sibling.parent = leaf.parent = parent
+
+        if old_parent is None:
+            self._root = parent
+        elif old_parent.left is sibling:
+            old_parent.left = parent
+        else:
+            old_parent.right = parent
+
+        self._refit(leaf.parent)
+
+    def _remove_leaf(self, leaf):
+
+        if leaf is self._root:
+            self._root = None
+            return
+
+        parent = leaf.parent
+        grand_parent = parent.parent
+        sibling = parent.left if parent.right is leaf else parent.right
+
+        if grand_parent is None:
+            self._root = sibling
+            sibling.parent = None
+        else:
+            if grand_parent.left is parent:
+                grand_parent.left = sibling
+            else:
+                grand_parent.right = sibling
+            sibling.parent = grand_parent
+            self._refit(grand_parent)
+
+        leaf.parent = None
+
+    def _refit(self, node):
+        """ Balances and updates the boxes and heights of a node and of its
+        ancestors.
+        """
+        while node is not None:
+            node = self._balance(node)
+
+            left, right = node.left, node.right
+            node.height = 1 + max(left.height, right.height)
+            node.min, node.max = _union(left.min, left.max, right.min, right.max)
+
+            node = node.parent
+
+    def _balance(self, a):
+        """ Rotates the tree at node `a` if it is imbalanced, and returns the
+        new root of this subtree.
+        """
+        if a.is_leaf() or a.height < 2:
+            return a
+
+        b, c = a.left, a.right
+        balance = c.height - b.height
+
+        if balance > 1:
+            return self._rotate(a, c, "right")
+        if balance < -1:
+            return self._rotate(a, b, "left")
+        return a
+
+    def _rotate(self, a, c, side):
+        """ Promotes `c` (the `side` child of `a`, higher than the other one)
+        in place of `a`.
+        """
+        f, g = c.left, c.right
+
+        # c takes the place of a
+        c.parent = a.parent
+        a.parent = c
+        if c.parent is None:
+            self._root = c
+        elif c.parent.left is a:
+            c.parent.left = c
+        else:
+            c.parent.right = c
+
+        # c keeps its highest child, and gives the other one to a
+        if f.height < g.height:
+            f, g = g, f
+        kept, given = f, g
+
+        if side == "right":
+            c.left, c.right = a, kept
+            a.right = given
+        else:
+            c.left, c.right = kept, a
+            a.left = given
+        given.parent = a
+
+        a.min, a.max = _union(a.left.min, a.left.max, a.right.min, a.right.max)
+        a.height = 1 + max(a.left.height, a.right.height)
+
+        c.min, c.max = _union(a.min, a.max, kept.min, kept.max)
+        c.height = 1 + max(a.height, kept.height)
+
+        return c
@@ -14,6 +14,40 @@ def transform(vector3, matrix4x4):
     """
     return numpy.dot(matrix4x4, numpy.append(vector3, 1.))
 
+def bounding_sphere(points):
+    """ Returns a bounding sphere (center, radius) of a set of 3D points.
+
+    The sphere is computed with Ritter's algorithm: it is not the minimal
+    bounding sphere, but usually a few percent larger at most.
+
+    :param points: a (n, 3) array
+    """
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+    if len(points) == 0:
+        return numpy.zeros(3), 0.
+
+    # initial sphere, from two distant points...
+    x = points[0]
+    y = points[numpy.argmax(linalg.norm(points - x, axis=1))]
+    z = points[numpy.argmax(linalg.norm(points - y, axis=1))]
+    center = (y + z) / 2
+    radius = linalg.norm(z - y) / 2
+
+    # ...grown until it contains the farthest point
+    for i in range(100):
+        distances = linalg.norm(points - center, axis=1)
+        farthest = numpy.argmax(distances)
+        distance = distances[farthest]
+        if distance <= radius:
+            break
+        new_radius = (radius + distance) / 2
+        center = center + (points[farthest] - center) * (new_radius - radius) / distance
+        radius = new_radius
+    else:
+        radius = linalg.norm(points - center, axis=1).max()
+
+    return center, float(radius)
+
 def get_scene_bounding_box(scene):
     """
     Returns the axis-aligned bounding box (AABB) of a whole scene,
@@ -55,10 +89,20 @@ def get_bounding_box_for_node(scene, node):
     return _compute_bounding_box_for_node(scene.nodes, node, bb_min, bb_max, global_transformation)
 
 def get_world_transform(scene, node):
+    """ Returns the transformation of a node relative to the world.
 
+    The world transformation of the node's parent, maintained by the server
+    (see Node.world_transformation), is used when available: the node's
+    own transformation may have been locally modified. Otherwise, the
+    transformations of all the node's ancestors are multiplied.
+    """
     if node == scene.rootnode:
         return numpy.identity(4, dtype=numpy.float32)
 
+    parent = scene.nodes[node.parent]
+    if parent.world_transformation is not None:
+        return numpy.dot(parent.world_transformation, node.transformation)
+
     parents = reversed(_get_parent_chain(scene, node, []))
     parent_transform = reduce(numpy.dot, [p.transformation for p in parents])
     return numpy.dot(parent_transform, node.transformation)
@@ -95,15 +139,23 @@ def compute_transformed_bounding_box(ctx, scene, node, trans_matrix, bb_min, bb_
     transformation = numpy.dot(trans_matrix, pos)
     
     for mesh_id in node.properties["mesh_ids"]:
-        mesh = ctx.mesh(mesh_id)
-        for v in mesh.vertices:
-            v = transform(v, transformation)
-            bb_min[0] = float(round(min(bb_min[0], v[0]), 5))
-            bb_min[1] = float(round(min(bb_min[1], v[1]), 5))
-            bb_min[2] = float(round(min(bb_min[2], v[2]), 5))
-            bb_max[0] = float(round(max(bb_max[0], v[0]), 5))
-            bb_max[1] = float(round(max(bb_max[1], v[1]), 5))
-            bb_max[2] = float(round(max(bb_max[2], v[2]), 5))
+        # the bounding box of the transformed mesh is the bounding box of its
+        # transformed convex hull: only the hull vertices (precomputed by the
+        # server) are needed
+        hull = ctx.mesh_info(mesh_id).hull
+        if len(hull) == 0:
+            continue
+
+        # transforms all the vertices at once, in homogeneous coordinates
+        vertices = numpy.asarray(hull, dtype=numpy.float64)
+        vertices = numpy.hstack([vertices, numpy.ones((len(vertices), 1))])
+        vertices = numpy.dot(vertices, numpy.transpose(transformation))
+
+        v_min = vertices.min(axis=0)
+        v_max = vertices.max(axis=0)
+        for i in range(3):
+            bb_min[i] = float(round(min(bb_min[i], v_min[i]), 5))
+            bb_max[i] = float(round(max(bb_max[i], v_max[i]), 5))
     
     for child in node.children:
         bb_min, bb_max = compute_transformed_bounding_box(ctx, scene, scene.nodes[child], trans_matrix, bb_min, bb_max)
@@ -0,0 +1,266 @@
+""" Generation of simplified versions (levels of detail) of meshes.
+
+Meshes are given and returned as numpy arrays: (n, 3) float vertices and
+(m, 3) integer faces (triangles, indices in the vertices array).
+"""
+
+import numpy
+
+import logging; logger = logging.getLogger("underworlds.helpers.lod")
+
+# meshes are never decimated below this number of faces
+_MIN_FACES = 12
+
+# max number of cells, along each axis, of the grid used for decimation
+_MAX_GRID_RESOLUTION = 1024
+
+def decimate(vertices, faces, ratio):
+    """ Simplifies a mesh by vertex clustering, down to about `ratio` times
+    its number of faces.
+
+    The vertices are merged on a regular grid (each cell is replaced by the
+    mean of its vertices), and the faces which become degenerate are
+    removed. The resolution of the grid is chosen (by dichotomy) as the
+    highest one producing at most the requested number of faces.
+
+    :param ratio: the target ratio of faces, in ]0, 1]
+    :returns: (vertices, faces) of the simplified mesh. The mesh itself is
+    returned if it is already small enough.
+    """
+    vertices = numpy.asarray(vertices, dtype=numpy.float64).reshape(-1, 3)
+    faces = numpy.asarray(faces, dtype=numpy.int64).reshape(-1, 3)
+
+    # (ignores the faces referring to non-existent vertices)
+    faces = faces[((faces >= 0) & (faces < len(vertices))).all(axis=1)]
+
+    target = max(int(len(faces) * ratio), _MIN_FACES)
+    if len(faces) <= target:
+        return vertices, faces
+
+    best = None
+    low, high = 1, _MAX_GRID_RESOLUTION
+    while low <= high:
+        resolution = (low + high) // 2
+        simplified = _cluster(vertices, faces, resolution)
+        if len(simplified[1]) <= target:
+            best = simplified
+            low = resolution + 1
+        else:
+            high = resolution - 1
+
+    if best is None or len(best[1]) == 0:
+        # (the coarsest grid already produces too many faces: unlikely, but
+        # possible with very elongated meshes)
+        best = _cluster(vertices, faces, 1 if best is None else low)
+
+    return best
+
+def _cluster(vertices, faces, resolution):
+
+    bb_min = vertices.min(axis=0)
+    size = (vertices.max(axis=0) - bb_min).max()
+    if size == 0:
+        size = 1.
+
+    cells = numpy.floor((vertices - bb_min) / size * resolution).astype(numpy.int64)
+    numpy.clip(cells, 0, resolution - 1, out=cells)
+
+    # (1D keys are much faster to sort than rows)
+    keys = (cells[:, 0] * resolution + cells[:, 1]) * resolution + cells[:, 2]
+    _, clusters, counts = numpy.unique(keys, return_inverse=True, return_counts=True)
+    clusters = clusters.reshape(-1)
+
+    # each cluster is replaced by the mean of its vertices
+    new_vertices = numpy.zeros((len(counts), 3))
+    numpy.add.at(new_vertices, clusters, vertices)
+    new_vertices /= counts[:, None]
+
+    new_faces = clusters[faces]
+
+    # removes the degenerate faces...
+    new_faces = new_faces[(new_faces[:, 0] != new_faces[:, 1]) & \
+                          (new_faces[:, 1] != new_faces[:, 2]) & \
+                          (new_faces[:, 2] != new_faces[:, 0])]
+
+    # ...and the duplicated ones
+    sorted_faces = numpy.sort(new_faces, axis=1)
+    if len(counts) ** 3 < 2 ** 63:
+        sorted_faces = (sorted_faces[:, 0] * len(counts) + sorted_faces[:, 1]) * len(counts) + sorted_faces[:, 2]
+        _, unique = numpy.unique(sorted_faces, return_index=True)
+    else:
+        _, unique = numpy.unique(sorted_faces, axis=0, return_index=True)
+    new_faces = new_faces[numpy.sort(unique)]
+
+    # removes the vertices which are not used anymore
+    used, new_faces = numpy.unique(new_faces, return_inverse=True)
+    return new_vertices[used], new_faces.reshape(-1, 3)
+
+def extreme_points(points, n):
+    """ Returns the (distinct) points of a set which are the farthest along
+    n directions evenly distributed on the unit sphere, plus the 6 axis
+    directions.
+
+    They are vertices of the convex hull of the set, and have the same
+    axis-aligned bounding box. Their convex hull is an approximation (from
+    the inside) of the convex hull of the set.
+    """
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+
+    # (Fibonacci sphere)
+    i = numpy.arange(n) + 0.5
+    z = 1 - 2 * i / n
+    r = numpy.sqrt(1 - z * z)
+    theta = numpy.pi * (1 + 5 ** 0.5) * i
+    directions = numpy.concatenate([numpy.column_stack([r * numpy.cos(theta), r * numpy.sin(theta), z]),
+                                    numpy.identity(3), -numpy.identity(3)])
+
+    selected = numpy.unique(numpy.argmax(numpy.dot(points, directions.T), axis=0))
+    return numpy.unique(points[selected], axis=0)
+
+def convex_hull(vertices, max_vertices = None):
+    """ Computes the convex hull of a set of points (quickhull algorithm).
+
+    Quickhull is slow on large sets of points which are mostly on their hull
+    (eg, a finely tessellated sphere). If max_vertices is provided, the hull
+    of a larger set of points is only approximated by the hull of about
+    max_vertices of its extreme points (see extreme_points), which has the
+    same axis-aligned bounding box.
+
+    :returns: (vertices, faces) of the hull, with the faces oriented
+    outwards
+    :raises ValueError: if the points are all coplanar
+    """
+    points = numpy.unique(numpy.asarray(vertices, dtype=numpy.float64).reshape(-1, 3), axis=0)
+
+    if max_vertices is not None and len(points) > max_vertices:
+        points = extreme_points(points, max_vertices)
+
+    if len(points) < 4:
+        raise ValueError("At least 4 non-coplanar points are needed to compute a convex hull")
+
+    eps = 1e-9 * max(numpy.abs(points).max(), 1.)
+
+    # initial tetrahedron, built from extreme points
+    a = int(numpy.argmin(points[:, 0]))
+    b = int(numpy.argmax(numpy.linalg.norm(points - points[a], axis=1)))
+    c = int(numpy.argmax(numpy.linalg.norm(numpy.cross(points - points[a], points[b] - points[a]), axis=1)))
+    normal = numpy.cross(points[b] - points[a], points[c] - points[a])
+    d = int(numpy.argmax(numpy.abs(numpy.dot(points - points[a], normal))))
+
+    if numpy.abs(numpy.dot(points[d] - points[a], normal)) <= eps * numpy.linalg.norm(normal):
+        raise ValueError("Can not compute the convex hull of coplanar points")
+
+    faces = {} # face id -> (indices, normal, offset)
+    edges = {} # directed edge (i, j) -> id of the face it belongs to
+    outside = {} # face id -> indices of the points outside of the face
+    next_id = [0]
+
+    def add_face(i, j, k):
+        normal = numpy.cross(points[j] - points[i], points[k] - points[i])
+        norm = numpy.linalg.norm(normal)
+        if norm > 0:
+            normal /= norm
+        id = next_id[0]
+        next_id[0] += 1
+        faces[id] = ((i, j, k), normal, numpy.dot(normal, points[i]))
+        edges[(i, j)] = edges[(j, k)] = edges[(k, i)] = id
+        return id
+
+    def assign(candidates, new_faces):
+        """ Assigns each candidate point to the new face it is the farthest
+        outside of (if any). Returns the faces with outside points.
+        """
+        if len(candidates) == 0 or not new_faces:
+            return []
+        normals = numpy.array([faces[f][1] for f in new_faces])
+        offsets = numpy.array([faces[f][2] for f in new_faces])
+        distances = numpy.dot(points[candidates], normals.T) - offsets
+        best = numpy.argmax(distances, axis=1)
+        is_outside = distances[numpy.arange(len(candidates)), best] > eps
+
+        pending = []
+        for idx, f in enumerate(new_faces):
+            selected = candidates[is_outside & (best == idx)]
+            if len(selected):
+                outside[f] = selected
+                pending.append(f)
+        return pending
+
+    center = points[[a, b, c, d]].mean(axis=0)
+    initial = []
+    for i, j, k in [(a, b, c), (a, b, d), (a, c, d), (b, c, d)]:
+        normal = numpy.cross(points[j] - points[i], points[k] - points[i])
+        if numpy.dot(normal, center - points[i]) > 0:
+            j, k = k, j
+        initial.append(add_face(i, j, k))
+
+    candidates = numpy.setdiff1d(numpy.arange(len(points)), [a, b, c, d])
+    pending = assign(candidates, initial)
+
+    while pending:
+        f = pending.pop()
+        if f not in faces or f not in outside:
+            continue
+
+        # the farthest point outside of the face is added to the hull
+        candidates = outside.pop(f)
+        _, normal, offset = faces[f]
+        apex = int(candidates[numpy.argmax(numpy.dot(points[candidates], normal) - offset)])
+
+        # finds the faces visible from the apex, and their horizon
+        visible = {f}
+        not_visible = set()
+        horizon = []
+        stack = [f]
+        while stack:
+            g = stack.pop()
+            (i, j, k), _, _ = faces[g]
+            for edge in [(i, j), (j, k), (k, i)]:
+                neighbour = edges[(edge[1], edge[0])]
+                if neighbour in visible:
+                    continue
+                if neighbour not in not_visible:
+                    _, n, o = faces[neighbour]
+                    if numpy.dot(points[apex], n) - o > eps:
+                        visible.add(neighbour)
+                        stack.append(neighbour)
+                        continue
+                    not_visible.add(neighbour)
+                horizon.append(edge)
+
+        # replaces the visible faces by a cone from the horizon to the apex
+        orphans = [candidates]
+        for g in visible:
+            (i, j, k), _, _ = faces.pop(g)
+            for edge in [(i, j), (j, k), (k, i)]:
+                if edges.get(edge) == g:
+                    del edges[edge]
+            if g in outside:
+                orphans.append(outside.pop(g))
+
+        new_faces = [add_face(i, j, apex) for i, j in horizon]
+
+        orphans = numpy.concatenate(orphans)
+        pending.extend(assign(orphans[orphans != apex], new_faces))
+
+    hull = numpy.array([indices for indices, _, _ in faces.values()])
+    used, hull = numpy.unique(hull, return_inverse=True)
+    return points[used], hull.reshape(-1, 3)
+
+def vertex_normals(vertices, faces):
+    """ Computes the normals of the vertices of a mesh, as the normalized
+    sum of the normals of their faces weighted by the faces' area.
+    """
+    vertices = numpy.asarray(vertices, dtype=numpy.float64).reshape(-1, 3)
+    faces = numpy.asarray(faces, dtype=numpy.int64).reshape(-1, 3)
+
+    face_normals = numpy.cross(vertices[faces[:, 1]] - vertices[faces[:, 0]],
+                               vertices[faces[:, 2]] - vertices[faces[:, 0]])
+
+    normals = numpy.zeros(vertices.shape)
+    for i in range(3):
+        numpy.add.at(normals, faces[:, i], face_normals)
+
+    norms = numpy.linalg.norm(normals, axis=1)
+    norms[norms == 0] = 1.
+    return normals / norms[:, None]
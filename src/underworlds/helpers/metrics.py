@@ -0,0 +1,265 @@
+""" Lightweight metrics (counters, latency histograms, gauges) for the
+underworlds server.
+
+Recording a value only costs a lock and a few additions, so the metrics can
+be left enabled in production. The metrics are read as a whole (see
+Metrics.snapshot), as a JSON-serializable dictionary.
+
+The sizes of the requests and responses of the RPCs (see metered) require
+an additional pass over each message: they are only recorded if
+UWDS_METRICS_SIZES is set (or if Metrics.sizes is set to True).
+"""
+
+import os
+import json
+import time
+import bisect
+import threading
+from functools import wraps
+from collections.abc import Iterator
+
+import grpc
+
+import logging; logger = logging.getLogger("underworlds.helpers.metrics")
+
+# upper bounds (in seconds) of the buckets of the latency histograms. Values
+# above the last bound fall in an extra, unbounded, bucket.
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5,
+                   1., 2.5, 5., 10.)
+
+class Histogram(object):
+    """ A histogram with fixed buckets, which also keeps the number, sum and
+    maximum of the recorded values.
+
+    Not thread-safe: see Metrics.
+    """
+
+    def __init__(self, buckets = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.
+        self.max = 0.
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """ Returns an upper bound of the q-quantile (q in [0, 1]) of the
+        recorded values: the upper bound of the bucket it falls in (or the
+        maximum, for the last bucket).
+        """
+        if not self.count:
+            return 0.
+
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def stats(self):
+        return {"count": self.count,
+                "sum": self.sum,
+                "mean": self.sum / self.count if self.count else 0.,
+                "max": self.max,
+                "p50": self.quantile(0.5),
+                "p90": self.quantile(0.9),
+                "p99": self.quantile(0.99),
+                "buckets": [[bound, count] for bound, count in zip(list(self.buckets) + [None], self.counts)]}
+
+
+class Metrics(object):
+    """ A thread-safe registry of metrics:
+
+    - latencies: histograms of durations, in seconds (see observe, timer)
+    - counters: monotonic integers (see count)
+    - gauges: callables returning the current value of a metric (eg, a queue
+      depth), called only when the metrics are read (see gauge)
+
+    Metrics are created upon their first use.
+
+    :param sizes: whether the sizes of the RPC messages are recorded (see
+    metered). Defaults to whether UWDS_METRICS_SIZES is set.
+    """
+
+    def __init__(self, sizes = None):
+        self.sizes = bool(os.environ.get("UWDS_METRICS_SIZES")) if sizes is None else sizes
+
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._counters = {}
+        self._gauges = {}
+
+        self.starttime = time.time()
+
+    def observe(self, name, duration):
+        """ Records a duration (in seconds) in the latency histogram `name`.
+        """
+        with self._lock:
+            histogram = self._latencies.get(name)
+            if histogram is None:
+                histogram = self._latencies[name] = Histogram()
+            histogram.observe(duration)
+
+    def count(self, name, n = 1):
+        """ Increments the counter `name` by n.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        """ Registers a gauge: `value` is a callable returning the current
+        value of the metric (any JSON-serializable value).
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def timer(self, name):
+        """ Returns a context manager recording the duration of its block in
+        the latency histogram `name`.
+        """
+        return _Timer(self, name)
+
+    def snapshot(self):
+        """ Returns the current value of all the metrics, as a
+        JSON-serializable dictionary.
+        """
+        with self._lock:
+            latencies = {name: h.stats() for name, h in self._latencies.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        res = {"time": time.time(),
+               "uptime": time.time() - self.starttime,
+               "latencies": latencies,
+               "counters": counters,
+               "gauges": {}}
+
+        # (gauges are evaluated without holding the lock, as they may need to
+        # acquire other locks)
+        for name, value in gauges.items():
+            try:
+                res["gauges"][name] = value()
+            except Exception as e:
+                logger.warning("Error while reading gauge <%s>: %s" % (name, e))
+
+        return res
+
+    def dump(self, path):
+        """ Writes a snapshot of the metrics to a JSON file.
+        """
+        dump(self.snapshot(), path)
+
+
+class _Timer(object):
+
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._metrics.observe(self._name, time.time() - self._start)
+
+
+def dump(snapshot, path):
+    """ Writes a snapshot of metrics (see Metrics.snapshot) to a JSON file.
+    """
+    with open(path, "w") as f:
+        json.dump(snapshot, f, indent = 2, sort_keys = True)
+
+
+def metered(f):
+    """ Decorator for the RPC methods of a servicer owning a Metrics instance
+    (as `self.metrics`).
+
+    For each call, records the latency of the method (`rpc.<name>`, in
+    seconds), including the calls which fail. For streamed responses, the
+    latency covers the whole stream. The calls raising an exception or
+    setting an error status on their context are also counted as errors
+    (`rpc.<name>.errors`).
+
+    If `self.metrics.sizes` is set, the size of the request and of the
+    response are recorded as well (`rpc.<name>.request_bytes` and
+    `rpc.<name>.response_bytes` counters). Streamed requests and responses
+    are counted as their messages are consumed.
+    """
+    name = "rpc." + f.__name__
+
+    @wraps(f)
+    def wrapper(self, request, context):
+
+        metrics = self.metrics
+        metrics.count(name + ".calls")
+
+        sizes = metrics.sizes
+        if sizes:
+            if isinstance(request, Iterator):
+                request = _counted(request, metrics, name + ".request_bytes")
+            else:
+                metrics.count(name + ".request_bytes", request.ByteSize())
+
+        start = time.time()
+        try:
+            res = f(self, request, context)
+        except Exception:
+            metrics.observe(name, time.time() - start)
+            metrics.count(name + ".errors")
+            raise
+
+        if isinstance(res, Iterator):
+            return _streamed(res, metrics, name, start, sizes, context)
+
+        metrics.observe(name, time.time() - start)
+        if _failed(context):
+            metrics.count(name + ".errors")
+        if sizes:
+            metrics.count(name + ".response_bytes", res.ByteSize())
+        return res
+
+    return wrapper
+
+def _failed(context):
+    """ Returns true if an error status has been set on the RPC context.
+    """
+    try:
+        code = context.code()
+    except AttributeError:
+        # (no context, or grpc < 1.38 which does not expose the status)
+        return False
+    return code is not None and code != grpc.StatusCode.OK
+
+def _counted(messages, metrics, counter):
+    for msg in messages:
+        metrics.count(counter, msg.ByteSize())
+        yield msg
+
+def _streamed(messages, metrics, name, start, sizes, context):
+    try:
+        for msg in messages:
+            if sizes:
+                metrics.count(name + ".response_bytes", msg.ByteSize())
+            yield msg
+    except Exception:
+        metrics.count(name + ".errors")
+        raise
+    else:
+        if _failed(context):
+            metrics.count(name + ".errors")
+    finally:
+        metrics.observe(name, time.time() - start)
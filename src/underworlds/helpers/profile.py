@@ -1,31 +1,262 @@
-from functools import wraps
+""" Tracing of the underworlds server and clients.
+
+The functions decorated with @profile are recorded as Chrome Trace Event
+'complete' events (with their thread, nesting and arguments like the world
+or the size of the batch of nodes), which can be opened in chrome://tracing
+or https://ui.perfetto.dev.
+
+Tracing is disabled by default. It is enabled:
+- at startup, by setting the environment variable UWDS_TRACE to a directory;
+- at runtime, by sending SIGUSR2 to a process which called
+  toggle_on_signal() (like the server): each signal switches the tracing on
+  or off.
+
+Each process writes its own trace file in this directory (by default,
+/tmp/underworlds-traces), named after the process and its pid. Since the
+timestamps are taken from the system clock, the traces of several
+processes (eg, the server and its clients) can be merged in a single file
+(see merge) to follow the propagation of a change across processes.
+
+If UWDS_TRACE_SAMPLING is set to a ratio in ]0, 1], only this ratio of the
+top-level calls (with the calls nested in them) are recorded.
+"""
+
+import os
+import sys
+import json
 import time
+import atexit
+import random
+import signal
+import threading
+from functools import wraps
+from collections.abc import Sequence
 
-PROFILING_ENABLED=False
+import logging; logger = logging.getLogger("underworlds.helpers.profile")
 
-def profile(f):
+DEFAULT_TRACE_DIR = "/tmp/underworlds-traces"
 
-    if not PROFILING_ENABLED:
-        return f
+# the events are written to the trace file by batches of this size
+_FLUSH_SIZE = 1000
 
-    try:
-        name = f.__qualname__ # python3
-    except:
-        name = f.__module__ + "." + f.__name__ # python3
+class Tracer(object):
+    """ Records events in the Chrome Trace Event format, in a JSON array
+    (one event per line).
 
-    @wraps(f)
-    def wrapper(*args, **kwargs):
+    The array is only closed when the tracing is disabled, but trace viewers
+    also accept unterminated arrays (eg, if the process has crashed).
+    """
 
-        stime=time.time();print("PROFILE;%f;enter %s" % (stime,name))
+    def __init__(self):
+        self.enabled = False
+        self.sampling = 1.
 
-        res=f(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._events = []
+        self._file = None
+        self._written = 0 # number of events written to the file
+        self._threads = set() # threads whose name has been recorded
+        self._local = threading.local()
 
-        endtime=time.time();print("PROFILE;%f;exit %s;%.2f" % (endtime,name,(endtime-stime)*1000))
-        return res
+    def enable(self, directory = DEFAULT_TRACE_DIR, sampling = 1.):
+        """ Starts recording the events in a new trace file in `directory`,
+        and returns the path of the file.
+        """
+        with self._lock:
+            if self.enabled:
+                return self._file.name
 
-    return wrapper
+            os.makedirs(directory, exist_ok = True)
+            name = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+            path = os.path.join(directory, "%s-%d-%d.json" % (name, os.getpid(), int(time.time() * 1000)))
 
-def profileonce(msg):
-    if not PROFILING_ENABLED:
+            self._file = open(path, "w")
+            self._file.write("[\n")
+            self._written = 0
+            self._threads = set()
+            self._events = [{"ph": "M", "name": "process_name", "pid": os.getpid(), "tid": 0,
+                             "args": {"name": "%s (%d)" % (name, os.getpid())}}]
+            self.sampling = sampling
+            self.enabled = True
+
+        logger.info("Tracing enabled. Writing the trace to %s" % path)
+        return path
+
+    def disable(self):
+        """ Stops recording, and completes the current trace file.
+        """
+        with self._lock:
+            if not self.enabled:
+                return
+            self.enabled = False
+            self._flush()
+            self._file.write("\n]\n")
+            self._file.close()
+            logger.info("Tracing disabled. Trace written to %s" % self._file.name)
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable(os.environ.get("UWDS_TRACE", DEFAULT_TRACE_DIR),
+                        float(os.environ.get("UWDS_TRACE_SAMPLING", 1.)))
+
+    def record(self, event):
+
+        tid = event["tid"]
+
+        with self._lock:
+            if not self.enabled:
+                return
+
+            if tid not in self._threads:
+                self._threads.add(tid)
+                self._events.append({"ph": "M", "name": "thread_name", "pid": event["pid"], "tid": tid,
+                                     "args": {"name": threading.current_thread().name}})
+
+            self._events.append(event)
+            if len(self._events) >= _FLUSH_SIZE:
+                self._flush()
+
+    def _flush(self):
+        # (events are separated by commas, without trailing comma)
+        for event in self._events:
+            if self._written:
+                self._file.write(",\n")
+            self._file.write(json.dumps(event))
+            self._written += 1
+        self._file.flush()
+        self._events = []
+
+    def span(self, f):
+        """ Decorator recording each call to `f` as a complete event.
+        """
+        name = f.__qualname__
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+
+            if not self.enabled:
+                return f(*args, **kwargs)
+
+            # sampling decisions are taken for top-level calls only: nested
+            # calls are recorded if their caller is.
+            local = self._local
+            depth = getattr(local, "depth", 0)
+            if depth == 0:
+                local.sampled = self.sampling >= 1. or random.random() < self.sampling
+
+            local.depth = depth + 1
+            if not local.sampled:
+                try:
+                    return f(*args, **kwargs)
+                finally:
+                    local.depth = depth
+
+            start = time.time()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                end = time.time()
+                local.depth = depth
+                self.record({"ph": "X", "name": name, "cat": f.__module__,
+                             "ts": start * 1e6, "dur": (end - start) * 1e6,
+                             "pid": os.getpid(), "tid": threading.get_native_id(),
+                             "args": _args(args)})
+
+        return wrapper
+
+    def instant(self, msg):
+        if not self.enabled:
+            return
+        self.record({"ph": "i", "s": "t", "name": msg,
+                     "ts": time.time() * 1e6,
+                     "pid": os.getpid(), "tid": threading.get_native_id()})
+
+
+def _args(args):
+    """ Returns the arguments worth recording from the arguments of a traced
+    call: the world and the size of the batch of nodes/situations/IDs.
+    """
+    res = {}
+    for arg in args:
+
+        # requests of the RPCs carry a context; client proxies their server context
+        ctx = getattr(arg, "_server_ctx", None) or getattr(arg, "context", None)
+        world = getattr(ctx, "world", None) or getattr(arg, "world", None)
+        if world and isinstance(world, str):
+            res["world"] = world
+
+        if isinstance(arg, Sequence) and not isinstance(arg, (str, bytes)):
+            res["batch_size"] = len(arg)
+        else:
+            for field in ("nodes", "situations", "ids"):
+                items = getattr(arg, field, None)
+                if isinstance(items, Sequence):
+                    res["batch_size"] = len(items)
+                    break
+    return res
+
+
+def merge(paths, output):
+    """ Merges trace files (eg, of the server and of its clients) into a
+    single trace file.
+    """
+    events = []
+    for path in paths:
+        with open(path) as f:
+            content = f.read().rstrip()
+        if not content.endswith("]"):
+            # (trace of a process which has not completed its trace)
+            content += "]"
+        events += json.loads(content)
+
+    with open(output, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def toggle_on_signal(signum = getattr(signal, "SIGUSR2", None)):
+    """ Switches the tracing on or off upon reception of a signal (SIGUSR2 by
+    default). Must be called from the main thread.
+    """
+    if signum is None:
         return
-    print("PROFILE;%f;%s" % (time.time(),msg))
+    def handler(signum, frame):
+        # (the signal may interrupt the main thread while it holds the
+        # tracer's lock: the tracer is toggled from another thread)
+        threading.Thread(target = _tracer.toggle, name = "tracing toggler").start()
+
+    try:
+        signal.signal(signum, handler)
+    except ValueError: # not in the main thread
+        logger.warning("Tracing can not be toggled by signals outside of the main thread")
+
+
+_tracer = Tracer()
+atexit.register(_tracer.disable)
+
+if os.environ.get("UWDS_TRACE") and __name__ != "__main__":
+    _tracer.enable(os.environ["UWDS_TRACE"], float(os.environ.get("UWDS_TRACE_SAMPLING", 1.)))
+
+def profile(f):
+    """ Records the calls to the decorated function in the trace (when
+    tracing is enabled).
+    """
+    return _tracer.span(f)
+
+def profileonce(msg):
+    """ Records an instant event in the trace (when tracing is enabled).
+    """
+    _tracer.instant(msg)
+
+enable = _tracer.enable
+disable = _tracer.disable
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Merges underworlds trace files into a single Chrome Trace Event file.")
+    parser.add_argument("output", help="the merged trace file")
+    parser.add_argument("traces", nargs="+", help="trace files (see UWDS_TRACE)")
+    args = parser.parse_args()
+
+    merge(args.traces, args.output)
@@ -0,0 +1,73 @@
+import threading
+from contextlib import contextmanager
+
+class RWLock(object):
+    """A readers/writer lock.
+
+    Any number of readers can hold the lock at the same time, while a writer
+    has exclusive access. Waiting writers have priority over new readers, so
+    that a continuous flow of readers can not starve the writers.
+
+    The lock is *not* re-entrant.
+
+    Typical use is:
+
+    >>> lock = RWLock()
+    >>>
+    >>> with lock.reader():
+    >>>     # read the shared data
+    >>>
+    >>> with lock.writer():
+    >>>     # modify the shared data
+    """
+
+    def __init__(self):
+        self._cv = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cv:
+            while self._writer or self._waiting_writers:
+                self._cv.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cv:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cv.notify_all()
+
+    def acquire_write(self):
+        with self._cv:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cv.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cv:
+            self._writer = False
+            self._cv.notify_all()
+
+    @contextmanager
+    def reader(self):
+        """ Context manager holding the lock for reading.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writer(self):
+        """ Context manager holding the lock for writing.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
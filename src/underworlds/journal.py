@@ -0,0 +1,305 @@
+import os
+import struct
+import threading
+import time
+import atexit
+import zlib
+import logging;logger = logging.getLogger("underworlds.journal")
+
+# kinds of records. Except for WORLD (the complete content of a world, upon its
+# creation or in snapshots), the payload of a record is the serialized request
+# of the corresponding RPC.
+WORLD = 0
+UPDATE_NODES = 1
+DELETE_NODES = 2
+UPDATE_SITUATIONS = 3
+DELETE_SITUATIONS = 4
+FORK_WORLD = 5
+RESET = 6
+
+# default maximum delay (in sec) before appended records are flushed and
+# fsync'ed to the disk
+_SYNC_INTERVAL = 0.1
+
+# default number of records appended to the log before a new snapshot is taken
+_SNAPSHOT_INTERVAL = 10000
+
+# record header: sequence number, timestamp, kind, payload length.
+# The payload is followed by the CRC32 of the header + payload.
+_HEADER = struct.Struct("<QdBI")
+_CRC = struct.Struct("<I")
+
+LOG = "journal.log"
+OLD_LOG = "journal.log.old"
+SNAPSHOT = "snapshot"
+
+class Journal:
+    """ Append-only, on-disk log of the mutations of the underworlds model,
+    with periodic compacted snapshots.
+
+    The journal directory contains:
+     - `snapshot`: the records needed to rebuild the worlds as they were when
+       the snapshot was taken,
+     - `journal.log`: the records appended since then,
+     - `journal.log.old`: while a snapshot is being written, the records
+       appended before the snapshot was taken.
+
+    Each record carries a sequence number: the records of the snapshot all
+    have the sequence number of the last record they account for, and the
+    records of the logs which are older than the snapshot are skipped upon
+    replay. A torn record at the end of the log (eg, after a crash while
+    writing it) is detected by its checksum, and discarded.
+
+    The journal itself does not know about the content of the records: it
+    only stores (kind, timestamp, payload) tuples. See Server._replay and
+    Server.snapshot for their meaning.
+
+    :param path: the journal directory (created if needed)
+    :param sync_interval: maximum delay, in seconds, before an appended
+    record is written and fsync'ed to the disk. Records appended during this
+    delay are synced all at once, off the caller's thread. If 0, each record
+    is synced before `append` returns (slowest, but no mutation is ever lost).
+    :param snapshot_interval: number of records appended to the log after
+    which `on_snapshot` is called (from the journal's thread).
+    :param on_snapshot: callable taking no argument, in charge of taking a
+    snapshot (see `rotate` and `write_snapshot`).
+    """
+
+    def __init__(self, path,
+                       sync_interval = _SYNC_INTERVAL,
+                       snapshot_interval = _SNAPSHOT_INTERVAL,
+                       on_snapshot = None):
+
+        self.path = path
+        os.makedirs(path, exist_ok = True)
+
+        self.sync_interval = sync_interval
+        self.snapshot_interval = snapshot_interval
+        self.on_snapshot = on_snapshot
+
+        self._lock = threading.Lock()
+        self._log = None
+        self._seq = 0 # sequence number of the last record
+        self._dirty = False # true if records have been appended since the last sync
+        self._records_since_snapshot = 0
+
+        self._closed = threading.Event()
+        self._syncer = None
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read(self, name, since = -1):
+        """ Yields the valid records of the given file, with a sequence
+        number greater than `since`, as (seq, kind, timestamp, payload)
+        tuples.
+
+        Stops at the first torn or corrupted record, and returns the offset
+        of the end of the last valid record.
+        """
+        offset = 0
+
+        if not os.path.exists(self._file(name)):
+            return offset
+
+        with open(self._file(name), "rb") as f:
+            while True:
+                header = f.read(_HEADER.size)
+                if not header:
+                    break
+
+                if len(header) < _HEADER.size:
+                    logger.warning("Truncated record at the end of %s. Ignoring it." % name)
+                    break
+
+                seq, timestamp, kind, length = _HEADER.unpack(header)
+                payload = f.read(length)
+                crc = f.read(_CRC.size)
+
+                if len(payload) < length or len(crc) < _CRC.size \
+                   or _CRC.unpack(crc)[0] != zlib.crc32(header + payload):
+                    logger.warning("Truncated or corrupted record at the end of %s. Ignoring it." % name)
+                    break
+
+                offset = f.tell()
+
+                if seq > since:
+                    yield seq, kind, timestamp, payload
+
+        return offset
+
+    def replay(self):
+        """ Yields the records of the journal (the snapshot first, then the
+        records appended since the snapshot), as (kind, timestamp, payload)
+        tuples, then opens the journal for appending.
+
+        Must be fully consumed before calling `append`.
+        """
+
+        since = -1
+        for seq, kind, timestamp, payload in self._read(SNAPSHOT):
+            since = seq
+            yield kind, timestamp, payload
+
+        self._seq = max(self._seq, since)
+
+        for name in [OLD_LOG, LOG]:
+            records = self._read(name, since)
+            while True:
+                try:
+                    seq, kind, timestamp, payload = next(records)
+                except StopIteration as end:
+                    offset = end.value
+                    break
+
+                self._seq = max(self._seq, seq)
+                self._records_since_snapshot += 1
+                yield kind, timestamp, payload
+
+        # the last log may end with a torn record: truncate it so that new
+        # records are appended after the last valid one.
+        self._log = open(self._file(LOG), "ab")
+        self._log.truncate(offset)
+
+        logger.info("Journal %s replayed (%d records since the last snapshot)" % \
+                                (self.path, self._records_since_snapshot))
+
+        self._syncer = threading.Thread(target = self._run, name = "journal syncer")
+        self._syncer.daemon = True
+        self._syncer.start()
+
+        atexit.register(self.close)
+
+    def append(self, kind, payload, timestamp = None):
+        """ Appends a record to the log.
+
+        Unless the journal's `sync_interval` is 0, this only buffers the
+        record: it reaches the disk at most `sync_interval` seconds later.
+
+        :param payload: the record's content (bytes)
+        :param timestamp: the time of the mutation (now, by default)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._lock:
+            self._seq += 1
+            record = _HEADER.pack(self._seq, timestamp, kind, len(payload)) + payload
+            self._log.write(record)
+            self._log.write(_CRC.pack(zlib.crc32(record)))
+
+            self._records_since_snapshot += 1
+
+            if self.sync_interval == 0:
+                self._sync()
+            else:
+                self._dirty = True
+
+    def _sync(self):
+        """ Must be called with the journal's lock held.
+        """
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._dirty = False
+
+    def sync(self):
+        """ Writes and fsyncs all the appended records to the disk.
+        """
+        with self._lock:
+            if self._log is not None and not self._log.closed:
+                self._sync()
+
+    def rotate(self):
+        """ Starts a new log, and returns the sequence number of the last
+        record of the previous one.
+
+        This is the first step of a snapshot: the caller must ensure that no
+        record is appended while the state accounting for all the records up
+        to this sequence number is captured, and then write this state with
+        `write_snapshot`.
+        """
+        with self._lock:
+            self._sync()
+            self._log.close()
+
+            if os.path.exists(self._file(OLD_LOG)):
+                # a previous snapshot has failed: keep all the records not
+                # accounted for by a snapshot
+                with open(self._file(OLD_LOG), "ab") as old, \
+                     open(self._file(LOG), "rb") as log:
+                    old.write(log.read())
+                os.remove(self._file(LOG))
+            else:
+                os.rename(self._file(LOG), self._file(OLD_LOG))
+
+            self._log = open(self._file(LOG), "ab")
+            self._records_since_snapshot = 0
+
+            return self._seq
+
+    def write_snapshot(self, seq, records):
+        """ Atomically replaces the snapshot by the given records, and removes
+        the log records older than the snapshot.
+
+        :param seq: the sequence number returned by `rotate`
+        :param records: iterable of (kind, payload) tuples
+        """
+        tmp = self._file(SNAPSHOT + ".tmp")
+
+        nb_records = 0
+        timestamp = time.time()
+        with open(tmp, "wb") as f:
+            for kind, payload in records:
+                record = _HEADER.pack(seq, timestamp, kind, len(payload)) + payload
+                f.write(record)
+                f.write(_CRC.pack(zlib.crc32(record)))
+                nb_records += 1
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, self._file(SNAPSHOT))
+        self._sync_dir()
+
+        if os.path.exists(self._file(OLD_LOG)):
+            os.remove(self._file(OLD_LOG))
+
+        logger.info("Snapshot of journal %s written (%d records)" % (self.path, nb_records))
+
+    def _sync_dir(self):
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _run(self):
+
+        interval = self.sync_interval or 1.
+
+        while not self._closed.wait(interval):
+            with self._lock:
+                if self._dirty:
+                    self._sync()
+
+                snapshot_needed = self._records_since_snapshot >= self.snapshot_interval
+
+            if snapshot_needed and self.on_snapshot is not None:
+                try:
+                    self.on_snapshot()
+                except Exception as e:
+                    logger.error("Error while taking a snapshot of journal %s: %s" % (self.path, e))
+
+    def close(self):
+        """ Syncs the pending records, and closes the journal.
+        """
+        if self._closed.is_set():
+            return
+        self._closed.set()
+
+        if self._syncer is not None:
+            self._syncer.join()
+
+        with self._lock:
+            if self._log is not None:
+                self._sync()
+                self._log.close()
@@ -0,0 +1,422 @@
+import os
+import time
+import mmap
+import struct
+import hashlib
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from urllib.parse import quote
+
+import logging;logger = logging.getLogger("underworlds.meshstore")
+
+import numpy
+
+import underworlds.underworlds_pb2 as gRPC
+from underworlds.types import MeshData, MESH_FLOAT, MESH_INDEX, \
+                              LOD_FULL, LOD_HIGH, LOD_LOW, LOD_HULL, LOD_NAMES
+from underworlds.helpers.lod import decimate, convex_hull, extreme_points, vertex_normals
+from underworlds.helpers.geometry import bounding_sphere
+
+# default (approximate) amount of memory, in bytes, used to keep the most
+# recently used meshes deserialized
+_CACHE_SIZE = 256 * 1024 * 1024
+
+# mesh file header: magic, number of vertices, faces, normals and colors,
+# diffuse color. It is followed by the vertices (float32 x 3), faces
+# (uint32 x 3), normals (float32 x 3) and colors (uint32), little-endian.
+_MAGIC = b"UWMESH01"
+_HEADER = struct.Struct("<8sIIII4f")
+
+_COLOR = numpy.dtype("<u4")
+
+BLOBS = "blobs"
+IDS = "ids"
+INFOS = "infos"
+
+# target ratio of faces of the decimated levels of detail
+_LOD_RATIOS = {LOD_HIGH: 0.5, LOD_LOW: 0.1}
+
+# the convex hulls of the meshes with more vertices are approximated with
+# about this number of vertices (see helpers.lod.convex_hull)
+_HULL_MAX_VERTICES = 256
+
+# suffixes of the IDs of the stored files which are not meshes (temporary
+# files and levels of detail, see lod_id)
+_NOT_COUNTED = tuple([".tmp"] + [".%s" % name for lod, name in LOD_NAMES.items() if lod != LOD_FULL])
+
+def lod_id(id, lod):
+    """ Returns the ID under which a level of detail of a mesh is stored.
+    """
+    if lod == LOD_FULL:
+        return id
+    return "%s.%s" % (id, LOD_NAMES[lod])
+
+class MeshStore:
+    """ On-disk repository of meshes.
+
+    Meshes are stored as packed arrays, in files named after the digest of
+    their content (so that identical meshes are only stored once), and
+    memory-mapped on demand. Each mesh ID is a hard link to its content.
+    A bounded LRU cache keeps the most recently used meshes in memory, ready
+    to be sent.
+
+    The store can be used like a dictionary of gRPC.Mesh indexed by mesh ID
+    (see MeshCache for a store of MeshData).
+
+    :param path: the directory of the store (created if needed). If None, a
+    temporary directory is used, and removed with the store.
+    :param cache_size: approximate amount of memory, in bytes, used by the
+    cache.
+    """
+
+    def __init__(self, path = None, cache_size = _CACHE_SIZE):
+
+        self._tmpdir = None
+        if path is None:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix = "underworlds-meshes-")
+            path = self._tmpdir.name
+
+        self.path = path
+        os.makedirs(os.path.join(path, BLOBS), exist_ok = True)
+        os.makedirs(os.path.join(path, IDS), exist_ok = True)
+        os.makedirs(os.path.join(path, INFOS), exist_ok = True)
+
+        self.cache_size = cache_size
+
+        # id -> (gRPC.Mesh, size), in least recently used first order
+        self._cache = OrderedDict()
+        self._cached_size = 0
+        self._lock = threading.Lock()
+
+        # number of meshes in the store, counted once here and then kept up
+        # to date by `put`. Meshes added to the directory by other processes
+        # (eg, to a MeshCache shared by several clients) are not counted.
+        self._len = len([name for name in os.listdir(os.path.join(path, IDS)) \
+                                        if not name.endswith(_NOT_COUNTED)])
+        self._ids_lock = threading.Lock()
+
+    def _id_path(self, id):
+        return os.path.join(self.path, IDS, quote(id, safe = ""))
+
+    def _info_path(self, id):
+        return os.path.join(self.path, INFOS, quote(id, safe = ""))
+
+    def __contains__(self, id):
+        return id in self._cache or os.path.exists(self._id_path(id))
+
+    def __len__(self):
+        """ Returns the number of meshes in the store (their levels of
+        detail are not counted).
+        """
+        return self._len
+
+    def __getitem__(self, id):
+        return self.get(id)
+
+    def __setitem__(self, id, mesh):
+        self.put(mesh, id)
+
+    def put(self, mesh, id = None):
+        """ Stores a mesh (a gRPC.Mesh), under its ID or under `id` if
+        provided.
+        """
+        id = id or mesh.id
+
+        blob = self._pack(mesh)
+        digest = hashlib.blake2b(blob, digest_size = 20).hexdigest()
+        blob_path = os.path.join(self.path, BLOBS, digest)
+
+        if not os.path.exists(blob_path):
+            tmp = "%s.%s.tmp" % (blob_path, uuid.uuid4())
+            with open(tmp, "wb") as f:
+                f.write(blob)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, blob_path)
+
+        with self._ids_lock:
+            try:
+                if os.path.samefile(blob_path, self._id_path(id)):
+                    return # the same mesh is already stored under this ID
+                replaced = True
+            except FileNotFoundError:
+                replaced = False
+
+            # (linking then renaming atomically replaces a previous mesh)
+            tmp = "%s.%s.tmp" % (self._id_path(id), uuid.uuid4())
+            os.link(blob_path, tmp)
+            os.replace(tmp, self._id_path(id))
+
+            if not replaced and not id.endswith(_NOT_COUNTED):
+                self._len += 1
+
+        outdated = [id]
+        if replaced:
+            # the levels of detail and the properties of the previous mesh
+            # are outdated
+            outdated += [lod_id(id, lod) for lod in [LOD_HIGH, LOD_LOW, LOD_HULL]]
+            for path in [self._id_path(lod) for lod in outdated[1:]] + [self._info_path(id)]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+        # (the mesh is cached the next time it is read)
+        with self._lock:
+            for outdated_id in outdated:
+                if outdated_id in self._cache:
+                    self._cached_size -= self._cache.pop(outdated_id)[1]
+
+    def arrays(self, id):
+        """ Returns the memory-mapped content of a mesh, as a dictionary with
+        the keys 'vertices', 'faces', 'normals' (read-only (n, 3) numpy
+        arrays), 'colors' (read-only numpy array) and 'diffuse' (tuple).
+
+        :raises KeyError: if the mesh does not exist
+        """
+        try:
+            with open(self._id_path(id), "rb") as f:
+                # the mapping remains valid (and is only released with the
+                # arrays) once the file is closed
+                data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise KeyError(id)
+
+        magic, nb_vertices, nb_faces, nb_normals, nb_colors, r, g, b, a = \
+                _HEADER.unpack_from(data)
+
+        if magic != _MAGIC:
+            raise RuntimeError("Mesh %s is not a valid mesh file" % self._id_path(id))
+
+        offset = _HEADER.size
+        arrays = {"diffuse": (r, g, b, a)}
+        for name, dtype, count, width in [("vertices", MESH_FLOAT, nb_vertices, 3),
+                                          ("faces", MESH_INDEX, nb_faces, 3),
+                                          ("normals", MESH_FLOAT, nb_normals, 3),
+                                          ("colors", _COLOR, nb_colors, 1)]:
+            if count:
+                array = numpy.frombuffer(data, dtype = dtype, count = count * width, offset = offset)
+            else:
+                array = numpy.empty(0, dtype = dtype)
+            arrays[name] = array.reshape(-1, 3) if width == 3 else array
+            offset += dtype.itemsize * count * width
+
+        return arrays
+
+    def get(self, id):
+        """ Returns a mesh (a gRPC.Mesh) from its ID.
+
+        :raises KeyError: if the mesh does not exist
+        """
+        with self._lock:
+            if id in self._cache:
+                self._cache.move_to_end(id)
+                return self._cache[id][0]
+
+        mesh = self._decode(id, self.arrays(id))
+
+        self._cache_put(id, mesh, os.path.getsize(self._id_path(id)))
+
+        return mesh
+
+    def lod(self, id, lod):
+        """ Returns a level of detail of a mesh (LOD_FULL being the mesh
+        itself), as returned by `get`.
+
+        The levels of detail are generated (see `generate_lod`) upon first
+        access, if needed.
+
+        :raises KeyError: if the mesh does not exist
+        """
+        if lod == LOD_FULL:
+            return self.get(id)
+
+        try:
+            return self.get(lod_id(id, lod))
+        except KeyError:
+            self.generate_lod(id, lod)
+            return self.get(lod_id(id, lod))
+
+    def generate_lod(self, id, lod):
+        """ Generates and stores a level of detail of a mesh (if not already
+        present): LOD_HIGH and LOD_LOW are decimated versions of the mesh, and
+        LOD_HULL its convex hull (or LOD_LOW if the mesh is flat).
+
+        The colors of the mesh are not kept.
+
+        :raises KeyError: if the mesh does not exist
+        """
+        if lod == LOD_FULL or lod_id(id, lod) in self:
+            return
+
+        starttime = time.time()
+
+        arrays = self.arrays(id)
+        vertices, faces = arrays["vertices"], arrays["faces"]
+
+        if lod == LOD_HULL:
+            try:
+                vertices, faces = convex_hull(vertices, _HULL_MAX_VERTICES)
+            except ValueError:
+                vertices, faces = decimate(vertices, faces, _LOD_RATIOS[LOD_LOW])
+        else:
+            vertices, faces = decimate(vertices, faces, _LOD_RATIOS[lod])
+
+        if len(arrays["normals"]):
+            normals = vertex_normals(vertices, faces)
+        else:
+            normals = numpy.empty((0, 3))
+
+        mesh = gRPC.Mesh(id = lod_id(id, lod),
+                         packed_vertices = numpy.asarray(vertices, dtype = MESH_FLOAT).tobytes(),
+                         packed_faces = numpy.asarray(faces, dtype = MESH_INDEX).tobytes(),
+                         packed_normals = numpy.asarray(normals, dtype = MESH_FLOAT).tobytes())
+        mesh.diffuse.r, mesh.diffuse.g, mesh.diffuse.b, mesh.diffuse.a = arrays["diffuse"]
+
+        self.put(mesh)
+
+        logger.info("Generated the %s level of detail of mesh %s (%d faces, instead of %d) in %.2fsec" % \
+                        (LOD_NAMES[lod], id, len(faces), len(arrays["faces"]), time.time() - starttime))
+
+    def info(self, id, compute = True):
+        """ Returns the geometric properties of a mesh (a gRPC.MeshInfo): its
+        axis-aligned bounding box, bounding sphere and the vertices of its
+        convex hull.
+
+        They are computed upon first access, and stored alongside the mesh.
+
+        :param compute: if false, only returns already computed properties
+        :raises KeyError: if the mesh does not exist (or if its properties
+        are not computed yet, and `compute` is false)
+        """
+        try:
+            with open(self._info_path(id), "rb") as f:
+                return gRPC.MeshInfo.FromString(f.read())
+        except FileNotFoundError:
+            if not compute:
+                raise KeyError(id)
+
+        starttime = time.time()
+
+        arrays = self.arrays(id)
+        vertices = arrays["vertices"]
+
+        info = gRPC.MeshInfo(id = id,
+                             nb_vertices = len(vertices),
+                             nb_faces = len(arrays["faces"]))
+
+        if len(vertices):
+            try:
+                hull = convex_hull(vertices, _HULL_MAX_VERTICES)[0]
+            except ValueError:
+                # flat mesh: its (distinct) vertices, or its extreme ones, are kept
+                hull = numpy.unique(vertices, axis = 0)
+                if len(hull) > _HULL_MAX_VERTICES:
+                    hull = extreme_points(hull, _HULL_MAX_VERTICES)
+
+            center, radius = bounding_sphere(hull)
+            # (the hull may only approximate the mesh: the sphere must
+            # enclose all the vertices)
+            radius = max(radius, float(numpy.linalg.norm(vertices - center, axis = 1).max()))
+
+            info.aabb_min.x, info.aabb_min.y, info.aabb_min.z = vertices.min(axis = 0).tolist()
+            info.aabb_max.x, info.aabb_max.y, info.aabb_max.z = vertices.max(axis = 0).tolist()
+            info.sphere_center.x, info.sphere_center.y, info.sphere_center.z = center.tolist()
+            info.sphere_radius = radius
+            info.packed_hull_vertices = numpy.asarray(hull, dtype = MESH_FLOAT).tobytes()
+
+        tmp = "%s.%s.tmp" % (self._info_path(id), uuid.uuid4())
+        with open(tmp, "wb") as f:
+            f.write(info.SerializeToString())
+        os.replace(tmp, self._info_path(id))
+
+        logger.info("Computed the properties of mesh %s (%d hull vertices, instead of %d) in %.2fsec" % \
+                        (id, len(info.packed_hull_vertices) // (3 * MESH_FLOAT.itemsize), len(vertices), time.time() - starttime))
+
+        return info
+
+    def _decode(self, id, arrays):
+        """ Returns the mesh returned by `get` (and cached) from the arrays
+        returned by `arrays`.
+        """
+        mesh = gRPC.Mesh(id = id,
+                         packed_vertices = arrays["vertices"].tobytes(),
+                         packed_faces = arrays["faces"].tobytes(),
+                         packed_normals = arrays["normals"].tobytes(),
+                         colors = arrays["colors"].tolist())
+
+        mesh.diffuse.r, mesh.diffuse.g, mesh.diffuse.b, mesh.diffuse.a = arrays["diffuse"]
+
+        return mesh
+
+    def _cache_put(self, id, mesh, size):
+
+        with self._lock:
+            if id in self._cache:
+                self._cached_size -= self._cache.pop(id)[1]
+
+            self._cache[id] = (mesh, size)
+            self._cached_size += size
+
+            # (the last mesh is always kept, even if larger than the cache)
+            while self._cached_size > self.cache_size and len(self._cache) > 1:
+                _, (_, evicted_size) = self._cache.popitem(last = False)
+                self._cached_size -= evicted_size
+
+    def _pack(self, mesh):
+
+        vertices, faces, normals = MeshData.arrays(mesh)
+        colors = numpy.array(mesh.colors, dtype = _COLOR)
+
+        header = _HEADER.pack(_MAGIC,
+                              len(vertices), len(faces), len(normals), len(colors),
+                              mesh.diffuse.r, mesh.diffuse.g, mesh.diffuse.b, mesh.diffuse.a)
+
+        return b"".join([header,
+                         vertices.tobytes(),
+                         faces.tobytes(),
+                         normals.tobytes(),
+                         colors.tobytes()])
+
+    def close(self):
+        """ Empties the cache, and removes the store if it is temporary.
+        """
+        with self._lock:
+            self._cache.clear()
+            self._cached_size = 0
+
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+
+
+class MeshCache(MeshStore):
+    """ Client-side cache of the meshes downloaded from (or pushed to) the
+    server.
+
+    It is a MeshStore whose `get` returns MeshData objects, with vertices,
+    faces and normals memory-mapped from the store. The cache directory is
+    meant to be shared by all the clients of the host: since mesh IDs are
+    digests of the meshes' content (see MeshData.digest), a mesh fetched
+    once by any client is then read locally by all of them.
+
+    :param path: the directory of the cache. Defaults to $UWDS_MESH_CACHE,
+    or ~/.cache/underworlds/meshes.
+    :param cache_size: approximate amount of memory, in bytes, used by the
+    in-process cache of MeshData.
+    """
+
+    def __init__(self, path = None, cache_size = _CACHE_SIZE):
+
+        if path is None:
+            path = os.environ.get("UWDS_MESH_CACHE") or \
+                   os.path.join(os.path.expanduser("~"), ".cache", "underworlds", "meshes")
+
+        super().__init__(path, cache_size)
+
+    def _decode(self, id, arrays):
+        return MeshData(arrays["vertices"],
+                        arrays["faces"],
+                        arrays["normals"],
+                        arrays["diffuse"])
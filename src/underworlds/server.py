@@ -1,129 +1,428 @@
+import os
 import uuid
+import json
+import copy
 import time
 import threading
+import queue
+from collections import OrderedDict
 import logging;logger = logging.getLogger("underworlds.server")
 
+import numpy
+
 from underworlds.types import *
-from underworlds.helpers.profile import profile, profileonce
-from grpc.framework.interfaces.face.face import ExpirationError,NetworkError,AbortionError
+from underworlds.helpers.profile import profile, profileonce, toggle_on_signal
+from underworlds.helpers.metrics import Metrics, metered
+from underworlds.helpers.rwlock import RWLock
+import underworlds.journal as journal
+from underworlds.meshstore import MeshStore
 import underworlds.underworlds_pb2 as gRPC 
-from grpc.beta import interfaces as beta_interfaces
-from grpc.beta import implementations
+import grpc
+from concurrent import futures
 
 _TIMEOUT_SECONDS = 1
 
+# max number of invalidations waiting to be sent to a given client
+_INVALIDATION_QUEUE_SIZE = 1000
+
+# default duration (in sec) of the window during which the invalidations
+# emitted on a given world are merged before being sent to the clients.
+_COALESCING_WINDOW = 0.005
+
+# default size of the server's thread pool. The invalidation stream of each
+# client (see Server.subscribe) holds one thread of the pool for as long as
+# the client is connected: the pool must be large enough for all the clients
+# + the concurrent requests.
+_THREAD_POOL_SIZE = 200
+
+# meshes whose serialized size is larger than this (in bytes) are not sent by
+# getMesh (the default gRPC maximum message size is 4MB): clients must use
+# getMeshStream instead
+_MESH_STREAMING_THRESHOLD = 2 * 1024 * 1024
+
+# size (in bytes) of the chunks sent by getMeshStream
+_MESH_CHUNK_SIZE = 1024 * 1024
+
+# partial uploads of meshes (see pushMeshStream) are discarded after this
+# duration (in sec) without receiving new chunks
+_UPLOAD_TIMEOUT = 60
+
 class Client:
 
-    def __init__(self, name, host, port):
+    def __init__(self, name, push_nodes = False, queue_size = _INVALIDATION_QUEUE_SIZE, metrics = None,
+                 packed_meshes = True):
         self.id = str(uuid.uuid4())
         self.name = name
 
+        # if provided, the lag and the drops of the invalidations are also
+        # recorded in these metrics (see underworlds.helpers.metrics)
+        self._metrics = metrics
+
+        # if true, the client expects the invalidations to carry the new or
+        # updated nodes (push mode)
+        self.push_nodes = push_nodes
+
+        # if false, the meshes are sent to the client with the repeated
+        # vertices, faces and normals fields instead of the packed ones
+        # (clients predating Welcome.packed_meshes)
+        self.packed_meshes = packed_meshes
+
         # stores the links (cf clients' types) with the various worlds.
         self.links = {}
 
-        self.channel = None
-        self.invalidation_server = self._connect_invalidation_server(name, host, port)
-        self.isactive = (self.invalidation_server is not None)
+        self.isactive = True
 
-        self.active_invalidations = []
+        # outbound invalidations, streamed to the client by `invalidations`.
+        # The queue is bounded so that a slow or stalled client can not make
+        # the server memory grow unboundedly: when full, new invalidations
+        # for this client are dropped (and counted).
+        self._invalidations = queue.Queue(maxsize = queue_size)
 
-        self.grpc_client = gRPC.Client(id=self.id)
+        self._subscribed = False
+        self._unsubscribed = threading.Event()
 
-        if self.isactive:
-            logger.debug("Client %s (id: %s) successfully created." % (self.name, self.id))
-        else:
-            logger.warn("Client %s (id: %s) created but inactive." % (self.name, self.id))
+        # worlds for which invalidations have been dropped: the client is
+        # asked to resync them (with a RESYNC invalidation) once its queue
+        # is drained
+        self._resyncs = set()
+        self._resyncs_lock = threading.Lock()
 
+        # invalidations statistics
+        self.sent_invalidations = 0
+        self.dropped_invalidations = 0
+        self.last_lag = 0. # time, in sec, between enqueuing and sending the last invalidation
 
-    def _connect_invalidation_server(self, name, host, port):
-        try:
-            self.channel = implementations.insecure_channel(host, port)
-            invalidation_server = gRPC.beta_create_UnderworldsInvalidation_stub(self.channel)
-            logger.info("Connected to invalidation server of client <%s>" % name)
-            return invalidation_server
+        self.grpc_client = gRPC.Client(id=self.id)
 
-        except (NetworkError, AbortionError) as e:
-            logger.warn("Underworld server unable to establish a connection with Underworlds'\n"
-                         " client <%> on %s:%d. Client died? Unreachable over network?\n"
-                         "Removing the client.\nOriginal error: %s" % (name, host, port, str(e)))
-            return None
+        # meshes being uploaded by the client with pushMeshStream: mesh ID ->
+        # bytearray of the chunks received so far, and mesh ID -> time of the
+        # last received chunk. Kept until the upload completes so that it can
+        # be resumed, unless the client disconnects or the upload times out
+        # (see expire_uploads).
+        self.uploads = {}
+        self.uploads_activity = {}
+
+        logger.debug("Client %s (id: %s) successfully created." % (self.name, self.id))
+
+    @property
+    def queue_depth(self):
+        """ Number of invalidations waiting to be sent to the client.
+        """
+        return self._invalidations.qsize()
+
+    def stats(self):
+        """ Returns a dictionary with the statistics of the invalidations
+        sent to this client.
+        """
+        return {"name": self.name,
+                "queue_depth": self.queue_depth,
+                "sent": self.sent_invalidations,
+                "dropped": self.dropped_invalidations,
+                "lag": self.last_lag}
 
     def emit_invalidation(self, invalidation):
+        """ Enqueues an invalidation for this client, and returns immediately.
+
+        The invalidation is actually sent on the client's invalidation stream
+        (see `invalidations`).
+        """
 
         if not self.isactive:
             logger.debug("Attempting to send invalidations to inactive client <%s>. Skipping" % self.name)
             return
 
-        future = self.invalidation_server.emitInvalidation.future(invalidation, _TIMEOUT_SECONDS)
-
-        self.active_invalidations.append(future)
-
-        # remove the future form the current list of active invalidations upon completion
-        future.add_done_callback(self._cleanup_completed_invalidations)
-
+        try:
+            self._invalidations.put_nowait((time.time(), invalidation))
+        except queue.Full:
+            self.dropped_invalidations += 1
+            if self._metrics is not None:
+                self._metrics.count("invalidations.dropped")
+            logger.warn("Invalidation queue of client <%s> is full! Dropping invalidation "
+                        "(%d invalidations dropped so far). The client will have to resync "
+                        "world <%s>." % (self.name, self.dropped_invalidations, invalidation.world))
+            with self._resyncs_lock:
+                self._resyncs.add(invalidation.world)
+
+    def _take_resyncs(self):
+        """ Returns the RESYNC invalidations for the worlds whose
+        invalidations have been dropped so far.
+        """
+        with self._resyncs_lock:
+            worlds, self._resyncs = self._resyncs, set()
+
+        return [gRPC.Invalidation(type=RESYNC, world=world) for world in sorted(worlds)]
+
+    def invalidations(self, context):
+        """ Returns a generator yielding, in order, the invalidations for this
+        client until the client is closed or the RPC `context` is not active
+        anymore.
+
+        The client is considered as subscribed as soon as this method returns,
+        even if the stream is not iterated yet: a later `close` will then
+        close the stream after the pending invalidations.
+        """
+        self._subscribed = True
+        return self._stream(context)
+
+    def _stream(self, context):
 
-    def _cleanup_completed_invalidations(self, invalidation):
-        e = invalidation.exception()
-        if e is not None:
-            logger.warn("An exception occured while sending invalidations to %s: %s" % (self.name, str(e)))
-            self.isactive = False
-        else:
-            self.active_invalidations.remove(invalidation)
+        try:
+            while True:
+                # the dropped invalidations are superseded by a RESYNC, sent
+                # after all the invalidations enqueued before the drop
+                if self._invalidations.empty():
+                    for invalidation in self._take_resyncs():
+                        yield invalidation
+
+                try:
+                    item = self._invalidations.get(timeout = _TIMEOUT_SECONDS)
+                except queue.Empty:
+                    if not context.is_active():
+                        logger.warn("The invalidation stream of client <%s> has been interrupted" % self.name)
+                        self.isactive = False
+                        self.expire_uploads(timeout = 0)
+                        return
+                    self.expire_uploads()
+                    continue
+
+                if item is None:
+                    return
+
+                enqueued_at, invalidation = item
+                self.sent_invalidations += 1
+                self.last_lag = time.time() - enqueued_at
+                if self._metrics is not None:
+                    self._metrics.observe("invalidations.lag", self.last_lag)
+
+                yield invalidation
+        finally:
+            self._unsubscribed.set()
+
+    def expire_uploads(self, timeout = None):
+        """ Discards the partial uploads which have not received any chunk
+        for `timeout` seconds (by default, _UPLOAD_TIMEOUT).
+        """
+        timeout = _UPLOAD_TIMEOUT if timeout is None else timeout
+        now = time.time()
+        for id, last_activity in list(self.uploads_activity.items()):
+            if now - last_activity >= timeout:
+                logger.warn("Discarding the partial upload of mesh <%s> by client <%s>" % (id, self.name))
+                self.uploads.pop(id, None)
+                self.uploads_activity.pop(id, None)
 
     def reset_links(self):
         self.links = {}
 
     def close(self):
         self.isactive = False
-        logger.debug("Waiting for all pending invalidation to client <%s> to complete..." % self.name)
-        for i in self.active_invalidations:
-            i.result()
-        logger.debug("No more pending invalidations. The client <%s> is now properly disconnected." % self.name)
-        self.active_invalidations = []
 
+        if not self._subscribed:
+            return
+
+        logger.debug("Waiting for all pending invalidation to client <%s> to be sent..." % self.name)
+        try:
+            self._invalidations.put(None, timeout = _TIMEOUT_SECONDS)
+        except queue.Full:
+            logger.warn("The client <%s> does not read its invalidations anymore!" % self.name)
+            return
+
+        if self._unsubscribed.wait(_TIMEOUT_SECONDS):
+            logger.debug("No more pending invalidations. The client <%s> is now properly disconnected." % self.name)
+        else:
+            logger.warn("Timeout while sending the last invalidations to client <%s>" % self.name)
+
+
+class InvalidationCoalescer:
+    """ Merges the invalidations emitted on each world during a short time
+    window, and emits them at the end of the window.
+
+    Within a window, the sets of new, updated and deleted IDs are merged: an
+    ID updated after being created in the same window remains 'new', and an
+    ID created then deleted in the same window is not emitted at all. At most
+    one invalidation per type is therefore emitted, per world and target, for
+    each window.
+
+    The serialized nodes to push to the clients in push mode, if any, are
+    merged as well: only the latest version of each node is emitted.
+
+    :param window: duration of the coalescing window, in seconds
+    :param emit: callable `emit(target, world, ids, invalidation_type, nodes)`,
+    called from the coalescer's thread at the end of each window.
+    """
+
+    def __init__(self, window, emit):
+
+        self.window = window
+        self._emit = emit
+
+        # (world, target) -> (deadline, changes, nodes)
+        # changes is a ChangeSet, and 'nodes' maps IDs to the nodes to push.
+        # As the window duration is constant, the insertion order is also
+        # the order of the deadlines.
+        self._pending = OrderedDict()
+
+        self._cv = threading.Condition()
+
+        self._flusher = threading.Thread(target = self._run,
+                                         name = "invalidations coalescer")
+        self._flusher.daemon = True
+        self._flusher.start()
+
+    def add(self, target, world, ids, invalidation_type, nodes = None):
+
+        with self._cv:
+            key = (world, target)
+            if key not in self._pending:
+                self._pending[key] = (time.time() + self.window, ChangeSet(), {})
+                self._cv.notify()
+
+            _, changes, pending_nodes = self._pending[key]
+
+            changes.add(ids, invalidation_type)
+
+            if invalidation_type == DELETE:
+                for id in ids:
+                    pending_nodes.pop(id, None)
+            elif nodes:
+                for node in nodes:
+                    pending_nodes[node.id] = node
+
+    def _run(self):
+
+        while True:
+            with self._cv:
+                while not self._pending:
+                    self._cv.wait()
 
+                key, (deadline, changes, pending_nodes) = next(iter(self._pending.items()))
 
+                delay = deadline - time.time()
+                if delay > 0:
+                    self._cv.wait(delay)
+                    continue
 
-class Server(gRPC.BetaUnderworldsServicer):
+                del self._pending[key]
 
-    def __init__(self):
+            world, target = key
+            for invalidation_type in [NEW, UPDATE, DELETE]:
+                ids = changes.ids(invalidation_type)
+                if ids:
+                    nodes = [pending_nodes[id] for id in ids if id in pending_nodes]
+                    self._emit(target, world, ids, invalidation_type, nodes)
 
+
+class Server(gRPC.UnderworldsServicer):
+
+    def __init__(self, coalescing_window = _COALESCING_WINDOW, journal = None, meshes = None):
+
+        # worlds are protected by one readers/writer lock per world (stored
+        # in self._world_locks). self._worlds_lock only protects the
+        # dictionaries of worlds and locks themselves.
         self._worlds = {}
+        self._world_locks = {}
+        self._worlds_lock = threading.Lock()
 
         self._clients = {} 
         self._client_lock = threading.RLock()
 
-        # meshes are stored as a dictionary:
-        # - the key is a unique ID
-        # - the value is a ditionary with these keys:
-        #   - vertices: [(x,y,z), ...]
-        #   - faces: [(i1, i2, i3), ...] with i an index in the vertices list
-        #   - normals
-        self.meshes = {}
+        # meshes are stored on disk by a MeshStore (by default, in a
+        # temporary directory), which can be used as a dictionary of
+        # gRPC.Mesh indexed by mesh ID
+        self.meshes = meshes if meshes is not None else MeshStore()
+
+        # mesh ID -> vertices of the convex hull of the mesh (see _mesh_hull),
+        # and IDs of the meshes whose properties were not computed yet when
+        # last looked up on disk
+        self._hulls = {}
+        self._pending_hulls = set()
+
+        # the levels of detail of the meshes are generated in the background
+        # once pushed (or upon their first request, if not ready yet)
+        self._lod_requests = queue.Queue()
+        self._lod_generator = threading.Thread(target=self._generate_lods, name="LOD generator")
+        self._lod_generator.daemon = True
+        self._lod_generator.start()
+
+        # if coalescing_window is 0, invalidations are sent immediately
+        self._coalescer = None
+        if coalescing_window > 0:
+            self._coalescer = InvalidationCoalescer(coalescing_window, self._send_invalidation)
+
+        # if a journal (see underworlds.journal) is provided, every mutation
+        # of the worlds is journaled, and the worlds are restored from the
+        # journal upon startup. The meshes are persisted by the mesh store.
+        self._journal = journal
+        self._snapshot_lock = threading.Lock()
+        if self._journal is not None:
+            self._journal.on_snapshot = self.snapshot
+            self._replay()
+
+        # latencies and sizes of the RPCs (see helpers.metrics.metered), plus
+        # a few other metrics of the hot paths. Read with the 'stats' RPC.
+        self.metrics = Metrics()
+        self.metrics.gauge("worlds", self._worlds_stats)
+        self.metrics.gauge("clients", self._clients_stats)
 
         self.starttime = time.time()
 
+    def _worlds_stats(self):
+        with self._worlds_lock:
+            worlds = list(self._worlds.values())
+
+        # (approximate values: the worlds are not locked)
+        return {w.name: {"nodes": len(w.scene),
+                         "situations": len(w.timeline.situations),
+                         "revision": w.revision} for w in worlds}
+
+    def _clients_stats(self):
+        with self._client_lock:
+            return {id: c.stats() for id, c in self._clients.items()}
+
     def _clientname(self, id):
         with self._client_lock:
             return self._clients[id].name
 
+    def _packed_meshes(self, id):
+        """ Returns whether the meshes can be sent packed to a client (see
+        Client.packed_meshes). Unknown clients get packed meshes.
+        """
+        with self._client_lock:
+            c = self._clients.get(id)
+        return c is None or c.packed_meshes
+
     def _new_world(self, name):
-        self._worlds[name] = World(name)
+        self._worlds[name] = World(name, self._mesh_hull)
+        self._world_locks[name] = RWLock()
 
 
-    def _get_scene_timeline(self, ctxt):
+    def _get_world(self, ctxt):
+        """ Returns the context's world and its readers/writer lock, creating
+        the world if needed.
+
+        The world (scene, timeline, revision) must only be accessed while
+        holding the lock.
+        """
 
         world = ctxt.world
 
-        if world not in self._worlds:
-            self._new_world(world)
-            logger.info("<%s> created a new world <%s>" % (self._clientname(ctxt.client), 
-                                                         world))
+        with self._worlds_lock:
+            if world not in self._worlds:
+                self._new_world(world)
+                logger.info("<%s> created a new world <%s>" % (self._clientname(ctxt.client), 
+                                                             world))
+
+                # the root node ID and the timeline origin are journaled too
+                w = self._worlds[world]
+                self._journal_append(journal.WORLD,
+                                     gRPC.WorldSnapshot(world=world,
+                                                        snapshot=self._serialize_world(w.revision,
+                                                                                       w.scene,
+                                                                                       w.timeline)))
 
-        scene = self._worlds[world].scene
-        timeline = self._worlds[world].timeline
+            w = self._worlds[world]
+            lock = self._world_locks[world]
 
-        return scene, timeline
+        return w, lock
 
     def _update_current_links(self, client, world, type):
 
@@ -135,39 +434,36 @@ class Server(gRPC.BetaUnderworldsServicer):
                 type = type if current_type == READER else current_type
             self._clients[client].links[world] = (type, time.time())
 
-    def _update_node(self, scene, node):
+    def _update_node(self, scene, node, now):
 
-        node.last_update = time.time()
+        node.last_update = now
 
         if node.parent is None and node.id != scene.rootnode.id:
             node.parent = scene.rootnode.id
 
-        oldnode = scene.node(node.id)
-
-        if oldnode: # the node already exist
-            parent_has_changed = oldnode.parent != node.parent
+        former_parent = scene.parent(node.id)
 
-            # update the list of children
-            node._children = [n.id for n in scene.nodes if n.parent == node.id]
-
-            # replace the node
-            scene.nodes = [node if old == node else old for old in scene.nodes]
-            
+        if node in scene: # the node already exist
+            parent_has_changed = former_parent != node.parent
             action = UPDATE
 
         else: # new node
-            scene.nodes.append(node)
             parent_has_changed = True
             action = NEW
 
-        return action, parent_has_changed
+        # add or replace (in place) the node. This also updates the list of
+        # children of the node, and of its current and former parents, and
+        # discards the cached world transformations of the node's subtree.
+        scene.update(node)
+
+        return action, parent_has_changed, former_parent
 
     def _delete_node(self, scene, id):
-        scene.nodes.remove(scene.node(id))
+        scene.remove(scene.node(id))
 
-    def _update_situation(self, timeline, situation):
+    def _update_situation(self, timeline, situation, now):
 
-        situation.last_update = time.time()
+        situation.last_update = now
 
         if situation.id in timeline.situations:
             action = UPDATE
@@ -178,20 +474,475 @@ class Server(gRPC.BetaUnderworldsServicer):
 
         return action
 
+    def _update_nodes(self, w, gRPCNodes, now, clientname = None):
+        """ Adds or updates nodes in a world.
+
+        Must be called with the world's lock held for writing.
+
+        :param clientname: the name of the client requesting the changes, for
+        logging purposes. If None, the individual changes are not logged.
+        :returns: the lists of IDs of the new and of the updated nodes
+        (including the parents whose children have changed)
+        """
+        scene = w.scene
+
+        nodes_to_invalidate_new = []
+        nodes_to_invalidate_update = []
+        for gRPCNode in gRPCNodes:
+            node = Node.deserialize(gRPCNode)
+
+            invalidation_type, parent_has_changed, former_parent = self._update_node(scene, node, now)
+
+            if clientname:
+                logger.info("<%s> %s node <%s> in world <%s>" % \
+                                    (clientname,
+                                    "updated" if invalidation_type==UPDATE else "created",
+                                    repr(node), 
+                                    w.name))
+
+            if invalidation_type ==  UPDATE:
+                nodes_to_invalidate_update.append(gRPCNode.id)
+            elif invalidation_type ==  NEW:
+                nodes_to_invalidate_new.append(gRPCNode.id)
+            else:
+                raise RuntimeError("Unexpected invalidation type")
+
+
+            ## If the hierarchy has changed (the scene has already updated the
+            ## children lists), tells everyone about the change to the parents
+            if parent_has_changed:
+                parent = scene.node(node.parent)
+                if parent is None:
+                    if node.parent is not None:
+                        logger.warning("Node %s references a non-exisiting parent" % node)
+                else:
+                    logger.debug("Adding invalidation action [update " + parent.id + "] due to hierarchy update")
+                    nodes_to_invalidate_update.append(parent.id)
+
+                # As a node has only one parent, if the parent has changed our
+                # node has been removed from its previous parent
+                if former_parent is not None and scene.node(former_parent):
+                    logger.debug("Adding invalidation action [update " + former_parent + "] due to hierarchy update")
+                    nodes_to_invalidate_update.append(former_parent)
+
+        return nodes_to_invalidate_new, nodes_to_invalidate_update
+
+    def _delete_nodes(self, w, gRPCNodes, clientname = None):
+        """ Deletes nodes from a world. Their children are re-parented to the
+        root node.
+
+        Must be called with the world's lock held for writing.
+
+        :param clientname: see _update_nodes
+        :returns: the lists of IDs of the updated nodes (re-parented children
+        and former parents) and of the deleted nodes
+        """
+        scene = w.scene
+
+        nodes_to_invalidate_delete = []
+        nodes_to_invalidate_update = []
+        for gRPCNode in gRPCNodes:
+            node = scene.node(gRPCNode.id)
+            if clientname:
+                logger.info("<%s> deleted node <%s> in world <%s>" % \
+                                    (clientname,
+                                    repr(node), 
+                                    w.name))
+
+            action = self._delete_node(scene, gRPCNode.id)
+
+            # tells everyone about the change
+            logger.debug("Sent invalidation action [delete]")
+            nodes_to_invalidate_delete.append(gRPCNode.id)
+
+            # reparent children to the scene's root node
+            orphans = list(node.children)
+            for child_id in orphans:
+                # (nodes may be shared with forked worlds: never modify them in place)
+                child = copy.copy(scene.node(child_id))
+                child.parent = scene.rootnode.id
+                scene.update(child)
+                logger.debug("Reparenting child " + child_id + " to root node")
+                nodes_to_invalidate_update.append(child_id)
+
+            if orphans:
+                # the root node has new children
+                nodes_to_invalidate_update.append(scene.rootnode.id)
+
+            # The node has been removed from its parent's children by the
+            # scene: tells everyone about the change to the parent
+            parent = scene.node(node.parent)
+            if parent:
+                logger.debug("Sent invalidation action [update " + parent.id + "] due to hierarchy update")
+                nodes_to_invalidate_update.append(parent.id)
+
+        return nodes_to_invalidate_update, nodes_to_invalidate_delete
+
+    def _update_situations(self, w, gRPCSits, now, clientname = None):
+        """ Adds or updates situations in a world.
+
+        Must be called with the world's lock held for writing.
+
+        :param clientname: see _update_nodes
+        :returns: the lists of IDs of the new and of the updated situations
+        """
+        situations_to_invalidate_new = []
+        situations_to_invalidate_update = []
+        for gRPCSit in gRPCSits:
+
+            situation = Situation.deserialize(gRPCSit)
+
+            invalidation_type = self._update_situation(w.timeline, situation, now)
+
+            if clientname:
+                logger.info("<%s> updated situation <%s> in world <%s>" % \
+                                    (clientname,
+                                    repr(situation), 
+                                    w.name))
+
+
+            logger.debug("Adding invalidation action [" + str(invalidation_type) + "]")
+
+            if invalidation_type == UPDATE:
+                situations_to_invalidate_update.append(situation.id)
+            elif invalidation_type == NEW:
+                situations_to_invalidate_new.append(situation.id)
+            else:
+                raise RuntimeError("Unexpected invalidation type")
+
+        return situations_to_invalidate_new, situations_to_invalidate_update
+
+    def _delete_situations(self, w, gRPCSits, clientname = None):
+        """ Deletes situations from a world.
+
+        Must be called with the world's lock held for writing.
+
+        :param clientname: see _update_nodes
+        :returns: the list of IDs of the deleted situations
+        """
+        situations_to_invalidate_delete = []
+        for gRPCSit in gRPCSits:
+
+            situation = Situation.deserialize(gRPCSit)
+
+            w.timeline.remove(situation)
+
+            if clientname:
+                logger.info("<%s> deleted situation <%s> in world <%s>" % \
+                                    (clientname,
+                                    repr(situation), 
+                                    w.name))
+
+            # tells everyone about the change
+            logger.debug("Sent invalidation action [delete]")
+            situations_to_invalidate_delete.append(situation.id)
+
+        return situations_to_invalidate_delete
+
+    def _fork_world(self, src, dst):
+        """ Replaces the content of world `dst` by a (copy-on-write) copy of
+        world `src`.
+
+        Must be called with the lock of `src` held for reading, and the lock
+        of `dst` held for writing.
+
+        :returns: the changes of the nodes and of the situations of `dst`, as
+        two ChangeSets
+        """
+        former_nodes = set(node.id for node in dst.scene.nodes)
+        former_situations = set(dst.timeline.situations.keys())
+
+        dst.fork(src)
+
+        nodes = [node.id for node in dst.scene.nodes]
+        situations = list(dst.timeline.situations.keys())
+
+        # every remaining node is invalidated, since it may differ from
+        # the former one with the same ID
+        nodes_changes = ChangeSet()
+        nodes_changes.add([id for id in nodes if id in former_nodes], UPDATE)
+        nodes_changes.add([id for id in nodes if id not in former_nodes], NEW)
+        nodes_changes.add(list(former_nodes.difference(nodes)), DELETE)
+
+        situations_changes = ChangeSet()
+        situations_changes.add([id for id in situations if id in former_situations], UPDATE)
+        situations_changes.add([id for id in situations if id not in former_situations], NEW)
+        situations_changes.add(list(former_situations.difference(situations)), DELETE)
+
+        return nodes_changes, situations_changes
+
+    def _serialize_node(self, scene, node):
+        """ Serializes a node for the clients, with its world transformation
+        and AABB.
+
+        Must be called with the world's lock held.
+        """
+        res = node.serialize(gRPC.Node)
+
+        res.world_transformation.extend(scene.world_transform(node.id).flatten().tolist())
+
+        aabb = scene.world_aabb(node.id)
+        if aabb is not None:
+            res.world_aabb.extend(aabb[0].tolist() + aabb[1].tolist())
+
+        return res
+
+    def _mesh_hull(self, mesh_id):
+        """ Returns the vertices of the convex hull of a mesh (see
+        Scene.hulls).
+
+        The hulls are kept in memory: the mesh store is only read upon the
+        first request of a mesh whose properties were computed before the
+        server started. Otherwise, the hulls are stored once computed (see
+        _generate_lods).
+
+        :raises KeyError: if the mesh or its properties are not available
+        (yet)
+        """
+        hull = self._hulls.get(mesh_id)
+        if hull is not None:
+            return hull
+
+        if mesh_id in self._pending_hulls:
+            raise KeyError(mesh_id)
+
+        try:
+            return self._store_hull(mesh_id, self.meshes.info(mesh_id, compute = False))
+        except KeyError:
+            self._pending_hulls.add(mesh_id)
+            raise
+
+    def _store_hull(self, mesh_id, info):
+        hull = numpy.frombuffer(info.packed_hull_vertices, dtype = MESH_FLOAT).reshape(-1, 3)
+        self._hulls[mesh_id] = hull
+        self._pending_hulls.discard(mesh_id)
+        return hull
+
+    def _serialize_world(self, revision, scene, timeline, world_fields = False):
+        """ Serializes a world (a gRPC.Snapshot).
+
+        :param world_fields: if true, the world transformations and AABBs of
+        the nodes are serialized as well (see _serialize_node)
+        """
+        res = gRPC.Snapshot(revision=revision,
+                            rootnode=scene.rootnode.id,
+                            origin=gRPC.Time(time=timeline.origin))
+        if world_fields:
+            res.nodes.extend([self._serialize_node(scene, node) for node in scene.nodes])
+        else:
+            res.nodes.extend([node.serialize(gRPC.Node) for node in scene.nodes])
+        res.situations.extend([situation.serialize(gRPC.Situation) \
+                                    for situation in timeline.situations.values()])
+        return res
+
+    def _deserialize_world(self, name, snapshot):
+
+        w = World(name, self._mesh_hull)
+        w.revision = snapshot.revision
+
+        w.scene.reroot(snapshot.rootnode)
+        for gRPCNode in snapshot.nodes:
+            w.scene.update(Node.deserialize(gRPCNode))
+
+        w.timeline.origin = snapshot.origin.time
+        for gRPCSit in snapshot.situations:
+            w.timeline.update(Situation.deserialize(gRPCSit))
+
+        return w
+
+    def _journal_append(self, kind, request, timestamp = None):
+        """ Appends a mutation (ie, the request of a mutating RPC) to the
+        journal, if any.
+        """
+        if self._journal is not None:
+            self._journal.append(kind, request.SerializeToString(), timestamp)
+
+    def _replay(self):
+        """ Rebuilds the worlds from the journal, by applying the journaled
+        requests exactly as they have been applied when initially received.
+        """
+
+        def world(name):
+            if name not in self._worlds:
+                self._new_world(name)
+            return self._worlds[name]
+
+        nb_records = 0
+
+        for kind, timestamp, payload in self._journal.replay():
+            nb_records += 1
+            try:
+                if kind == journal.WORLD:
+                    ws = gRPC.WorldSnapshot.FromString(payload)
+                    self._new_world(ws.world)
+                    self._worlds[ws.world] = self._deserialize_world(ws.world, ws.snapshot)
+
+                elif kind in [journal.UPDATE_NODES, journal.DELETE_NODES]:
+                    request = gRPC.NodesInContext.FromString(payload)
+                    w = world(request.context.world)
+                    w.revision += 1
+                    if kind == journal.UPDATE_NODES:
+                        self._update_nodes(w, request.nodes, timestamp)
+                    else:
+                        self._delete_nodes(w, request.nodes)
+
+                elif kind in [journal.UPDATE_SITUATIONS, journal.DELETE_SITUATIONS]:
+                    request = gRPC.SituationsInContext.FromString(payload)
+                    w = world(request.context.world)
+                    w.revision += 1
+                    if kind == journal.UPDATE_SITUATIONS:
+                        self._update_situations(w, request.situations, timestamp)
+                    else:
+                        self._delete_situations(w, request.situations)
+
+                elif kind == journal.FORK_WORLD:
+                    request = gRPC.WorldInContext.FromString(payload)
+                    src = world(request.world)
+                    dst = world(request.context.world)
+                    dst.revision += 1
+                    self._fork_world(src, dst)
+
+                elif kind == journal.RESET:
+                    self._worlds = {}
+                    self._world_locks = {}
+
+                else:
+                    logger.warning("Unknown record of kind %d in the journal. Ignoring it." % kind)
+
+            except Exception as e:
+                # the request has failed the same way when it was received
+                logger.warning("Error while replaying a record of kind %d: %s" % (kind, e))
+
+        # the clients will fetch the whole worlds anyway
+        for w in self._worlds.values():
+            w.clear_history()
+
+        logger.info("Replayed %d records from the journal: %d worlds restored" % \
+                            (nb_records, len(self._worlds)))
+
+    def snapshot(self):
+        """ Writes a compacted snapshot of all the worlds to the journal (if
+        any), so that the journal does not grow unboundedly.
+
+        The worlds are locked only while they are forked (see World.fork):
+        they are serialized and written to the disk afterwards.
+        """
+        if self._journal is None:
+            return
+
+        with self._snapshot_lock:
+            with self._worlds_lock:
+                # (the world locks are always acquired in the same order to
+                # avoid deadlocks)
+                names = sorted(self._worlds.keys())
+                locks = [self._world_locks[name] for name in names]
+                for lock in locks:
+                    lock.acquire_read()
+                try:
+                    worlds = [(name,
+                               self._worlds[name].revision,
+                               self._worlds[name].scene.fork(),
+                               self._worlds[name].timeline.fork()) for name in names]
+                    seq = self._journal.rotate()
+                finally:
+                    for lock in locks:
+                        lock.release_read()
+
+            def records():
+                for name, revision, scene, timeline in worlds:
+                    ws = gRPC.WorldSnapshot(world=name,
+                                            snapshot=self._serialize_world(revision, scene, timeline))
+                    yield journal.WORLD, ws.SerializeToString()
+
+            self._journal.write_snapshot(seq, records())
+
+    def close(self):
+        """ Takes a last snapshot, and closes the journal (if any) and the
+        mesh store.
+        """
+        if self._journal is not None:
+            self.snapshot()
+            self._journal.close()
+
+        self._lod_requests.put(None)
+        self._lod_generator.join()
+
+        self.meshes.close()
+
+    def _generate_lods(self):
+        """ Computes the properties (see MeshStore.info) and generates the
+        levels of detail of the meshes whose IDs are queued in
+        self._lod_requests, until None is queued.
+        """
+        while True:
+            mesh_id = self._lod_requests.get()
+            if mesh_id is None:
+                return
+
+            try:
+                self._store_hull(mesh_id, self.meshes.info(mesh_id))
+            except Exception as e:
+                logger.error("Error while computing the properties of mesh %s: %s" % (mesh_id, e))
+
+            for lod in [LOD_HULL, LOD_LOW, LOD_HIGH]:
+                try:
+                    self.meshes.generate_lod(mesh_id, lod)
+                except Exception as e:
+                    logger.error("Error while generating the %s level of detail of mesh %s: %s" % \
+                                        (LOD_NAMES[lod], mesh_id, e))
+
+    def _nodes_to_push(self, scene, world, node_ids):
+        """ Returns the serialized nodes to push along with the invalidation
+        of `node_ids`, or None if no client in push mode is linked to the
+        world.
+
+        Must be called with the world's lock held.
+        """
+        with self._client_lock:
+            if not any(c.push_nodes and world in c.links for c in self._clients.values()):
+                return None
+
+        nodes = (scene.node(id) for id in OrderedDict.fromkeys(node_ids))
+        # (nodes invalidated then deleted in the same batch are skipped)
+        return [self._serialize_node(scene, node) for node in nodes if node is not None]
+
+    def _emit_invalidation(self, target, world, node_ids, invalidation_type, nodes = None):
+        """ Records the change in the world's history, and informs the clients.
+
+        Must be called with the world's lock held for writing.
+
+        :param world: the world (not its name)
+        """
+
+        world.record(target, node_ids, invalidation_type)
+
+        if self._coalescer is not None:
+            self._coalescer.add(target, world.name, node_ids, invalidation_type, nodes)
+        else:
+            self._send_invalidation(target, world.name, node_ids, invalidation_type, nodes)
+
     @profile
-    def _emit_invalidation(self, target, world, node_ids, invalidation_type):
+    def _send_invalidation(self, target, world, node_ids, invalidation_type, nodes = None):
 
         invalidation = gRPC.Invalidation(target=target,
                                          type=invalidation_type, 
                                          world=world)
         invalidation.ids[:] = node_ids
 
+        # clients in push mode get the nodes as well
+        push_invalidation = invalidation
+        if nodes:
+            push_invalidation = gRPC.Invalidation()
+            push_invalidation.CopyFrom(invalidation)
+            push_invalidation.nodes.extend(nodes)
 
         with self._client_lock:
             for client_id in self._clients:
-                if world in self._clients[client_id].links:
-                    logger.debug("Informing client <%s> that nodes have been invalidated in world <%s>" % (self._clientname(client_id), world))
-                    self._clients[client_id].emit_invalidation(invalidation)
+                client = self._clients[client_id]
+                if world in client.links:
+                    logger.debug("Informing client <%s> that nodes have been invalidated in world <%s>" % (client.name, world))
+                    client.emit_invalidation(push_invalidation if client.push_nodes else invalidation)
+                    self.metrics.count("invalidations.enqueued")
 
 
     #############################################
@@ -199,9 +950,11 @@ class Server(gRPC.BetaUnderworldsServicer):
 
     ############ GENERAL
     @profile
+    @metered
     def helo(self, client, context):
         logger.debug("Got <helo> from %s" % client.name)
-        c = Client(client.name, client.host, client.invalidation_server_port)
+        c = Client(client.name, client.push_nodes, metrics = self.metrics,
+                   packed_meshes = client.packed_meshes)
         with self._client_lock:
             self._clients[c.id] = c
 
@@ -209,18 +962,34 @@ class Server(gRPC.BetaUnderworldsServicer):
         return c.grpc_client
 
     @profile
+    @metered
     def byebye(self, client, context):
         logger.debug("Got <byebye> from %s" % (self._clientname(client.id)))
 
         with self._client_lock:
-            self._clients[client.id].close()
-            del self._clients[client.id]
+            c = self._clients.pop(client.id)
+
+        # flushing the pending invalidations may take a while: do it
+        # without holding the clients lock
+        c.close()
 
         logger.debug("<byebye> completed")
         return gRPC.Empty()
 
 
     @profile
+    @metered
+    def subscribe(self, client, context):
+        logger.debug("Got <subscribe> from %s" % (self._clientname(client.id)))
+
+        with self._client_lock:
+            c = self._clients[client.id]
+
+        logger.debug("<subscribe> completed. Streaming invalidations to %s" % c.name)
+        return c.invalidations(context)
+
+    @profile
+    @metered
     def uptime(self, client, context):
         logger.debug("Got <uptime> from %s" % client.id)
         res = gRPC.Time(time=time.time() - self.starttime)
@@ -228,12 +997,16 @@ class Server(gRPC.BetaUnderworldsServicer):
         return res
 
     @profile
+    @metered
     def topology(self, client, context):
         logger.debug("Got <topology> from %s" % client.id)
     
         topo = gRPC.Topology()
 
-        for w in self._worlds.keys():
+        with self._worlds_lock:
+            worlds = list(self._worlds.keys())
+
+        for w in worlds:
             topo.worlds.append(w)
 
         with self._client_lock:
@@ -258,12 +1031,29 @@ class Server(gRPC.BetaUnderworldsServicer):
         return topo
 
     @profile
+    @metered
     def reset(self, client, context):
         logger.debug("Got <reset> from %s" % client.id)
         logger.warning("Resetting Underworlds upon client <%s> request" % client.id)
         logger.warning("This might break other clients!")
 
-        self._worlds = {}
+        # the writers currently modifying the worlds complete first, so that
+        # their journal records are not appended after the reset. Clients
+        # accessing the worlds afterwards keep a reference on the previous
+        # worlds and locks, and complete their requests normally.
+        with self._worlds_lock:
+            # (the world locks are always acquired in the same order to
+            # avoid deadlocks)
+            locks = [self._world_locks[name] for name in sorted(self._worlds.keys())]
+            for lock in locks:
+                lock.acquire_write()
+            try:
+                self._journal_append(journal.RESET, client)
+                self._worlds = {}
+                self._world_locks = {}
+            finally:
+                for lock in locks:
+                    lock.release_write()
 
         with self._client_lock:
             for cid, c in self._clients.items():
@@ -274,237 +1064,415 @@ class Server(gRPC.BetaUnderworldsServicer):
         return gRPC.Empty()
 
 
+    @profile
+    @metered
+    def stats(self, client, context):
+        logger.debug("Got <stats> from %s" % client.id)
+        res = gRPC.Stats(metrics=json.dumps(self.metrics.snapshot()))
+        logger.debug("<stats> completed")
+        return res
+
+
+    ############ WORLDS
+    @profile
+    @metered
+    def getScene(self, ctxt, context):
+        logger.debug("Got <getScene> from %s" % ctxt.client)
+        self._update_current_links(ctxt.client, ctxt.world, READER)
+
+        w, lock = self._get_world(ctxt)
+
+        with lock.reader():
+            res = self._serialize_world(w.revision, w.scene, w.timeline, world_fields = True)
+
+        logger.debug("<getScene> completed")
+        return res
+
+    @profile
+    @metered
+    def getChangesSince(self, revInCtxt, context):
+        logger.debug("Got <getChangesSince> from %s" % revInCtxt.context.client)
+        self._update_current_links(revInCtxt.context.client, revInCtxt.context.world, READER)
+
+        w, lock = self._get_world(revInCtxt.context)
+
+        with lock.reader():
+            res = gRPC.Changes(revision=w.revision)
+
+            changes = w.changes_since(revInCtxt.revision)
+
+            if changes is None:
+                res.outdated = True
+            else:
+                for changeset, target, size in [(res.nodes, gRPC.Invalidation.SCENE, len(w.scene)),
+                                                (res.situations, gRPC.Invalidation.TIMELINE, len(w.timeline.situations))]:
+                    changeset.new_ids.extend(changes[target].ids(NEW))
+                    changeset.updated_ids.extend(changes[target].ids(UPDATE))
+                    changeset.deleted_ids.extend(changes[target].ids(DELETE))
+                    changeset.size = size
+
+        logger.debug("<getChangesSince> completed")
+        return res
+
+    @profile
+    @metered
+    def forkWorld(self, worldInCtxt, context):
+        logger.debug("Got <forkWorld> from %s" % worldInCtxt.context.client)
+
+        client_id, world = worldInCtxt.context.client, worldInCtxt.context.world
+        self._update_current_links(client_id, worldInCtxt.world, READER)
+        self._update_current_links(client_id, world, PROVIDER)
+
+        if worldInCtxt.world == world:
+            logger.warning("<%s> attempted to fork world <%s> into itself. Ignoring." % \
+                                    (self._clientname(client_id), world))
+            return gRPC.Empty()
+
+        src, src_lock = self._get_world(gRPC.Context(client=client_id,
+                                                     world=worldInCtxt.world))
+        dst, dst_lock = self._get_world(worldInCtxt.context)
+
+        # always acquire the locks in the same order (by world name) to avoid
+        # deadlocks between concurrent forks
+        locks = sorted([(src.name, src_lock.reader), (dst.name, dst_lock.writer)])
+
+        with locks[0][1]():
+            with locks[1][1]():
+                dst.revision += 1
+                self._journal_append(journal.FORK_WORLD, worldInCtxt)
+
+                nodes_changes, situations_changes = self._fork_world(src, dst)
+
+                for invalidation_type in [UPDATE, NEW]:
+                    ids = nodes_changes.ids(invalidation_type)
+                    if ids:
+                        self._emit_invalidation(gRPC.Invalidation.SCENE, dst, ids, invalidation_type,
+                                                self._nodes_to_push(dst.scene, world, ids))
+                if nodes_changes.ids(DELETE):
+                    self._emit_invalidation(gRPC.Invalidation.SCENE, dst, nodes_changes.ids(DELETE), DELETE)
+
+                for invalidation_type in [UPDATE, NEW, DELETE]:
+                    ids = situations_changes.ids(invalidation_type)
+                    if ids:
+                        self._emit_invalidation(gRPC.Invalidation.TIMELINE, dst, ids, invalidation_type)
+
+                nb_nodes, nb_situations = len(dst.scene), len(dst.timeline.situations)
+
+        logger.info("<%s> forked world <%s> into world <%s> (%d nodes, %d situations)" % \
+                                (self._clientname(client_id),
+                                worldInCtxt.world,
+                                world,
+                                nb_nodes,
+                                nb_situations))
+
+        logger.debug("<forkWorld> completed")
+        return gRPC.Empty()
+
     ############ NODES
     @profile
+    @metered
     def getNodesLen(self, ctxt, context):
         logger.debug("Got <getNodesLen> from %s" % ctxt.client)
         self._update_current_links(ctxt.client, ctxt.world, READER)
 
-        scene,_ = self._get_scene_timeline(ctxt)
+        w, lock = self._get_world(ctxt)
 
-        res = gRPC.Size(size=len(scene.nodes))
+        with lock.reader():
+            res = gRPC.Size(size=len(w.scene))
         logger.debug("<getNodesLen> completed")
         return res
 
     @profile
+    @metered
     def getNodesIds(self, ctxt, context):
         logger.debug("Got <getNodesIds> from %s" % ctxt.client)
         self._update_current_links(ctxt.client, ctxt.world, READER)
 
-        scene,_ = self._get_scene_timeline(ctxt)
+        w, lock = self._get_world(ctxt)
 
         nodes = gRPC.Nodes()
-        for n in scene.nodes:
-            nodes.ids.append(n.id)
+        with lock.reader():
+            for n in w.scene.nodes:
+                nodes.ids.append(n.id)
 
         logger.debug("<getNodesIds> completed")
         return nodes
 
     @profile
+    @metered
     def getRootNode(self, ctxt, context):
         logger.debug("Got <getRootNode> from %s" % ctxt.client)
         self._update_current_links(ctxt.client, ctxt.world, READER)
 
-        scene,_ = self._get_scene_timeline(ctxt)
+        w, lock = self._get_world(ctxt)
 
-        res = gRPC.Node(id=scene.rootnode.id)
+        with lock.reader():
+            res = gRPC.Node(id=w.scene.rootnode.id)
         logger.debug("<getRootNode> completed")
         return res
 
     @profile
+    @metered
     def getNode(self, nodeInCtxt, context):
         logger.debug("Got <getNode> from %s" % self._clientname(nodeInCtxt.context.client))
 
         client_id, world = nodeInCtxt.context.client, nodeInCtxt.context.world
 
-        scene,_ = self._get_scene_timeline(nodeInCtxt.context)
+        w, lock = self._get_world(nodeInCtxt.context)
 
         self._update_current_links(client_id, world, READER)
 
         if not nodeInCtxt.node.id:
             logger.warning("%s has required a node without specifying its id!" % (self._clientname(client_id)))
 
-            context.details("No node id provided")
-            context.code(beta_interfaces.StatusCode.NOT_FOUND)
+            context.set_details("No node id provided")
+            context.set_code(grpc.StatusCode.NOT_FOUND)
             return gRPC.Node()
 
-        node = scene.node(nodeInCtxt.node.id)
+        with lock.reader():
+            # (read under the lock: forkWorld may replace the scene)
+            scene = w.scene
+            node = scene.node(nodeInCtxt.node.id)
+            if node:
+                res = self._serialize_node(scene, node)
 
         if not node:
             logger.warning("%s has required an non-existant "
                            "node <%s> in world %s" % (self._clientname(client_id), nodeInCtxt.node.id, world))
 
-            context.details("Node <%s> does not exist in world %s" % (nodeInCtxt.node.id, world))
-            context.code(beta_interfaces.StatusCode.NOT_FOUND)
+            context.set_details("Node <%s> does not exist in world %s" % (nodeInCtxt.node.id, world))
+            context.set_code(grpc.StatusCode.NOT_FOUND)
             return gRPC.Node()
 
 
         else:
-            res = node.serialize(gRPC.Node)
             logger.debug("<getNode> completed")
             return res
 
+    @profile
+    @metered
+    def getNodes(self, nodesInCtxt, context):
+        logger.debug("Got <getNodes> from %s" % self._clientname(nodesInCtxt.context.client))
+
+        client_id, world = nodesInCtxt.context.client, nodesInCtxt.context.world
+
+        w, lock = self._get_world(nodesInCtxt.context)
+
+        self._update_current_links(client_id, world, READER)
+
+        # the nodes are serialized while holding the lock, but streamed
+        # after releasing it
+        with lock.reader():
+            scene = w.scene
+            nodes = [scene.node(n.id) for n in nodesInCtxt.nodes]
+            res = [self._serialize_node(scene, node) for node in nodes if node is not None]
+
+        if len(res) != len(nodesInCtxt.nodes):
+            logger.debug("%s has required %d non-existant nodes in world %s" % \
+                            (self._clientname(client_id), len(nodesInCtxt.nodes) - len(res), world))
+
+        logger.debug("<getNodes> completed")
+        return iter(res)
+
 
     @profile
+    @metered
     def updateNodes(self, nodesInCtxt, context):
         logger.debug("Got <updateNodes> from %s" % nodesInCtxt.context.client)
         self._update_current_links(nodesInCtxt.context.client, nodesInCtxt.context.world, PROVIDER)
 
         client_id, world = nodesInCtxt.context.client, nodesInCtxt.context.world
-        scene,_ = self._get_scene_timeline(nodesInCtxt.context)
+        w, lock = self._get_world(nodesInCtxt.context)
 
-        nodes_to_invalidate_new = []
-        nodes_to_invalidate_update = []
-        for gRPCNode in nodesInCtxt.nodes:
-            node = Node.deserialize(gRPCNode)
+        now = time.time()
 
-            invalidation_type, parent_has_changed = self._update_node(scene, node)
+        # the whole batch is applied atomically wrt the other clients of the world
+        with lock.writer():
+            # (the duration of each step is recorded, to see where the time goes)
+            locked = time.time()
+            scene = w.scene
 
-            logger.info("<%s> %s node <%s> in world <%s>" % \
-                                (self._clientname(client_id), 
-                                "updated" if invalidation_type==UPDATE else "created",
-                                repr(node), 
-                                world))
+            w.revision += 1
+            self._journal_append(journal.UPDATE_NODES, nodesInCtxt, now)
+            journaled = time.time()
 
-            if invalidation_type ==  UPDATE:
-                nodes_to_invalidate_update.append(gRPCNode.id)
-            elif invalidation_type ==  NEW:
-                nodes_to_invalidate_new.append(gRPCNode.id)
-            else:
-                raise RuntimeError("Unexpected invalidation type")
+            nodes_to_invalidate_new, nodes_to_invalidate_update = \
+                    self._update_nodes(w, nodesInCtxt.nodes, now, self._clientname(client_id))
+            applied = time.time()
 
+            if nodes_to_invalidate_update:
+                self._emit_invalidation(gRPC.Invalidation.SCENE, w, nodes_to_invalidate_update, UPDATE,
+                                        self._nodes_to_push(scene, world, nodes_to_invalidate_update))
+            if nodes_to_invalidate_new:
+                self._emit_invalidation(gRPC.Invalidation.SCENE, w, nodes_to_invalidate_new, NEW,
+                                        self._nodes_to_push(scene, world, nodes_to_invalidate_new))
+            invalidated = time.time()
 
-            ## If necessary, update the node hierarchy
-            if parent_has_changed:
-                parent = scene.node(node.parent)
-                if parent is None:
-                    logger.warning("Node %s references a non-exisiting parent" % node)
-                elif node.id not in parent.children:
-                    parent._children.append(node.id)
-                    # tells everyone about the change to the parent
-                    logger.debug("Adding invalidation action [update " + parent.id + "] due to hierarchy update")
-                    nodes_to_invalidate_update.append(parent.id)
-
-                    # As a node has only one parent, if the parent has changed we must
-                    # remove our node from its previous parent
-                    for othernode in scene.nodes:
-                        if othernode.id != parent.id and node.id in othernode.children:
-                            othernode._children.remove(node.id)
-                            # tells everyone about the change to the former parent
-                            logger.debug("Adding invalidation action [update " + othernode.id + "] due to hierarchy update")
-                            nodes_to_invalidate_update.append(othernode.id)
-                            break
-
-        if nodes_to_invalidate_update:
-            self._emit_invalidation(gRPC.Invalidation.SCENE, world, nodes_to_invalidate_update, UPDATE)
-        if nodes_to_invalidate_new:
-            self._emit_invalidation(gRPC.Invalidation.SCENE, world, nodes_to_invalidate_new, NEW)
+        self.metrics.observe("updateNodes.lock_wait", locked - now)
+        self.metrics.observe("updateNodes.journal", journaled - locked)
+        self.metrics.observe("updateNodes.apply", applied - journaled)
+        self.metrics.observe("updateNodes.invalidations", invalidated - applied)
+        self.metrics.count("updateNodes.nodes", len(nodesInCtxt.nodes))
 
 
         logger.debug("<updateNodes> completed")
         return gRPC.Empty()
 
     @profile
+    @metered
     def deleteNodes(self, nodesInCtxt, context):
         logger.debug("Got <deleteNodes> from %s" % nodesInCtxt.context.client)
         self._update_current_links(nodesInCtxt.context.client, nodesInCtxt.context.world, PROVIDER)
 
         client_id, world = nodesInCtxt.context.client, nodesInCtxt.context.world
-        scene,_ = self._get_scene_timeline(nodesInCtxt.context)
+        w, lock = self._get_world(nodesInCtxt.context)
 
-        nodes_to_invalidate_delete = []
-        nodes_to_invalidate_update = []
-        for gRPCNode in nodesInCtxt.nodes:
-            node = scene.node(gRPCNode.id)
-            logger.info("<%s> deleted node <%s> in world <%s>" % \
-                                (self._clientname(client_id), 
-                                repr(node), 
-                                world))
+        # the whole batch is applied atomically wrt the other clients of the world
+        with lock.writer():
+            scene = w.scene
+            w.revision += 1
+            self._journal_append(journal.DELETE_NODES, nodesInCtxt)
 
-            action = self._delete_node(scene, gRPCNode.id)
+            nodes_to_invalidate_update, nodes_to_invalidate_delete = \
+                    self._delete_nodes(w, nodesInCtxt.nodes, self._clientname(client_id))
 
-            # tells everyone about the change
-            logger.debug("Sent invalidation action [delete]")
-            nodes_to_invalidate_delete.append(gRPCNode.id)
+            if nodes_to_invalidate_update:
+                self._emit_invalidation(gRPC.Invalidation.SCENE, w, nodes_to_invalidate_update, UPDATE,
+                                        self._nodes_to_push(scene, world, nodes_to_invalidate_update))
+            if nodes_to_invalidate_delete:
+                self._emit_invalidation(gRPC.Invalidation.SCENE, w, nodes_to_invalidate_delete, DELETE)
 
-            # reparent children to the scene's root node
-            children_to_update = []
-            for child_id in node.children:
-                child = scene.node(child_id)
-                child.parent = scene.rootnode.id
-                logger.debug("Reparenting child " + child_id + " to root node")
-                nodes_to_invalidate_update.append(child_id)
 
-            # Also remove the node from its parent's children
-            parent = scene.node(node.parent)
-            if parent:
-                parent._children.remove(node.id)
-                # tells everyone about the change to the parent
-                logger.debug("Sent invalidation action [update " + parent.id + "] due to hierarchy update")
-                nodes_to_invalidate_update.append(parent.id)
+        logger.debug("<deleteNodes> completed")
+        return gRPC.Empty()
 
-        if nodes_to_invalidate_update:
-            self._emit_invalidation(gRPC.Invalidation.SCENE, world, nodes_to_invalidate_update, UPDATE)
-        if nodes_to_invalidate_delete:
-            self._emit_invalidation(gRPC.Invalidation.SCENE, world, nodes_to_invalidate_delete, DELETE)
+    @profile
+    @metered
+    def findNodes(self, filterInCtxt, context):
+        logger.debug("Got <findNodes> from %s" % filterInCtxt.context.client)
+        self._update_current_links(filterInCtxt.context.client, filterInCtxt.context.world, READER)
 
+        w, lock = self._get_world(filterInCtxt.context)
 
-        logger.debug("<deleteNodes> completed")
-        return gRPC.Empty()
+        f = filterInCtxt.filter
+        properties = {key: json.loads(value) if value else None for key, value in f.properties.items()}
+
+        with lock.reader():
+            ids = w.scene.find(name = f.name or None,
+                               types = list(f.types) or None,
+                               properties = properties)
+
+        logger.debug("<findNodes> completed")
+        return gRPC.Nodes(ids=ids)
+
+    @profile
+    @metered
+    def queryBox(self, boxInCtxt, context):
+        logger.debug("Got <queryBox> from %s" % boxInCtxt.context.client)
+        self._update_current_links(boxInCtxt.context.client, boxInCtxt.context.world, READER)
+
+        w, lock = self._get_world(boxInCtxt.context)
+
+        bb_min = (boxInCtxt.min.x, boxInCtxt.min.y, boxInCtxt.min.z)
+        bb_max = (boxInCtxt.max.x, boxInCtxt.max.y, boxInCtxt.max.z)
+
+        with lock.reader():
+            ids = w.scene.query_box(bb_min, bb_max)
+
+        logger.debug("<queryBox> completed")
+        return gRPC.Nodes(ids=ids)
+
+    @profile
+    @metered
+    def querySphere(self, sphereInCtxt, context):
+        logger.debug("Got <querySphere> from %s" % sphereInCtxt.context.client)
+        self._update_current_links(sphereInCtxt.context.client, sphereInCtxt.context.world, READER)
+
+        w, lock = self._get_world(sphereInCtxt.context)
+
+        center = (sphereInCtxt.center.x, sphereInCtxt.center.y, sphereInCtxt.center.z)
+
+        with lock.reader():
+            ids = w.scene.query_sphere(center, sphereInCtxt.radius)
+
+        logger.debug("<querySphere> completed")
+        return gRPC.Nodes(ids=ids)
+
+    @profile
+    @metered
+    def kNearest(self, nearestInCtxt, context):
+        logger.debug("Got <kNearest> from %s" % nearestInCtxt.context.client)
+        self._update_current_links(nearestInCtxt.context.client, nearestInCtxt.context.world, READER)
+
+        w, lock = self._get_world(nearestInCtxt.context)
+
+        point = (nearestInCtxt.point.x, nearestInCtxt.point.y, nearestInCtxt.point.z)
+
+        with lock.reader():
+            nearest = w.scene.nearest(point, nearestInCtxt.k)
+
+        logger.debug("<kNearest> completed")
+        return gRPC.Nodes(ids=[id for id, distance in nearest])
 
 
     ############ TIMELINES
     @profile
+    @metered
     def getSituationsLen(self, ctxt, context):
         logger.debug("Got <getSituationsLen> from %s" % ctxt.client)
         self._update_current_links(ctxt.client, ctxt.world, READER)
 
-        _,timeline = self._get_scene_timeline(ctxt)
+        w, lock = self._get_world(ctxt)
 
-        res = gRPC.Size(size=len(timeline.situations))
+        with lock.reader():
+            res = gRPC.Size(size=len(w.timeline.situations))
         logger.debug("<getSituationsLen> completed")
         return res
 
     @profile
+    @metered
     def getSituationsIds(self, ctxt, context):
         logger.debug("Got <getSituationsIds> from %s" % ctxt.client)
         self._update_current_links(ctxt.client, ctxt.world, READER)
 
-        _,timeline = self._get_scene_timeline(ctxt)
+        w, lock = self._get_world(ctxt)
 
         situations = gRPC.Situations()
-        for sit_id in timeline.situations.keys():
-            situations.ids.append(sit_id)
+        with lock.reader():
+            for sit_id in w.timeline.situations.keys():
+                situations.ids.append(sit_id)
 
         logger.debug("<getSituationsIds> completed")
         return situations
 
 
     @profile
+    @metered
     def getSituation(self, sitInCtxt, context):
         logger.debug("Got <getSituation> from %s" % sitInCtxt.context.client)
 
         client_id, world = sitInCtxt.context.client, sitInCtxt.context.world
 
-        _,timeline = self._get_scene_timeline(sitInCtxt.context)
+        w, lock = self._get_world(sitInCtxt.context)
 
         self._update_current_links(client_id, world, READER)
 
         if not sitInCtxt.situation.id:
             logger.warning("%s has required a situation without specifying its id!" % (self._clientname(client_id)))
 
-            context.details("No situation id provided")
-            context.code(beta_interfaces.StatusCode.NOT_FOUND)
+            context.set_details("No situation id provided")
+            context.set_code(grpc.StatusCode.NOT_FOUND)
             return gRPC.Node()
 
-        situation = timeline.situation(sitInCtxt.situation.id)
+        with lock.reader():
+            situation = w.timeline.situation(sitInCtxt.situation.id)
 
         if not situation:
             logger.warning("%s has required an non-existant "
                            "situation <%s> in world %s" % (self._clientname(client_id), sitInCtxt.node.id, world))
 
-            context.details("Situation <%s> does not exist in world %s" % (sitInCtxt.node.id, world))
-            context.code(beta_interfaces.StatusCode.NOT_FOUND)
+            context.set_details("Situation <%s> does not exist in world %s" % (sitInCtxt.node.id, world))
+            context.set_code(grpc.StatusCode.NOT_FOUND)
             return gRPC.Situation()
 
 
@@ -514,89 +1482,70 @@ class Server(gRPC.BetaUnderworldsServicer):
             return res
 
     @profile
+    @metered
     def timelineOrigin(self, ctxt, context):
         logger.debug("Got <timelineOrigin> from %s" % ctxt.client)
         self._update_current_links(ctxt.client, ctxt.world, READER)
 
-        _,timeline = self._get_scene_timeline(ctxt)
+        w, lock = self._get_world(ctxt)
 
-        res = gRPC.Time(time=timeline.origin)
+        with lock.reader():
+            res = gRPC.Time(time=w.timeline.origin)
         logger.debug("<timelineOrigin> completed")
         return res
 
     @profile
+    @metered
     def updateSituations(self, sitInCtxt, context):
         logger.debug("Got <updateSituations> from %s" % sitInCtxt.context.client)
         self._update_current_links(sitInCtxt.context.client, sitInCtxt.context.world, PROVIDER)
 
         client_id, world = sitInCtxt.context.client, sitInCtxt.context.world
-        _, timeline = self._get_scene_timeline(sitInCtxt.context)
-
-        situations_to_invalidate_update = []
-        situations_to_invalidate_new = []
-        for gRPCSit in sitInCtxt.situations:
-
+        w, lock = self._get_world(sitInCtxt.context)
 
-            situation = Situation.deserialize(gRPCSit)
+        now = time.time()
 
-            invalidation_type = self._update_situation(timeline, situation)
+        with lock.writer():
+            w.revision += 1
+            self._journal_append(journal.UPDATE_SITUATIONS, sitInCtxt, now)
 
-            logger.info("<%s> updated situation <%s> in world <%s>" % \
-                                (self._clientname(client_id), 
-                                repr(situation), 
-                                world))
+            situations_to_invalidate_new, situations_to_invalidate_update = \
+                    self._update_situations(w, sitInCtxt.situations, now, self._clientname(client_id))
 
-
-            logger.debug("Adding invalidation action [" + str(invalidation_type) + "]")
-
-            if invalidation_type == UPDATE:
-                situations_to_invalidate_update.append(situation.id)
-            elif invalidation_type == NEW:
-                situations_to_invalidate_new.append(situation.id)
-            else:
-                raise RuntimeError("Unexpected invalidation type")
-
-        if situations_to_invalidate_update:
-            self._emit_invalidation(gRPC.Invalidation.TIMELINE, world, situations_to_invalidate_update, UPDATE)
-        if situations_to_invalidate_new:
-            self._emit_invalidation(gRPC.Invalidation.TIMELINE, world, situations_to_invalidate_new, NEW)
+            if situations_to_invalidate_update:
+                self._emit_invalidation(gRPC.Invalidation.TIMELINE, w, situations_to_invalidate_update, UPDATE)
+            if situations_to_invalidate_new:
+                self._emit_invalidation(gRPC.Invalidation.TIMELINE, w, situations_to_invalidate_new, NEW)
 
 
         logger.debug("<updateSituations> completed")
         return gRPC.Empty()
 
     @profile
+    @metered
     def deleteSituations(self, sitInCtxt, context):
         logger.debug("Got <deleteSituations> from %s" % sitInCtxt.context.client)
         self._update_current_links(sitInCtxt.context.client, sitInCtxt.context.world, PROVIDER)
 
         client_id, world = sitInCtxt.context.client, sitInCtxt.context.world
-        _, timeline = self._get_scene_timeline(sitInCtxt.context)
+        w, lock = self._get_world(sitInCtxt.context)
 
-        situations_to_invalidate_delete = []
-        for gRPCSit in sitInCtxt.situations:
+        with lock.writer():
+            w.revision += 1
+            self._journal_append(journal.DELETE_SITUATIONS, sitInCtxt)
 
-            situation = Situation.deserialize(gRPCSit)
-
-            timeline.remove(situation)
+            situations_to_invalidate_delete = \
+                    self._delete_situations(w, sitInCtxt.situations, self._clientname(client_id))
 
-            logger.info("<%s> deleted situation <%s> in world <%s>" % \
-                                (self._clientname(client_id), 
-                                repr(situation), 
-                                world))
-
-            # tells everyone about the change
-            logger.debug("Sent invalidation action [delete]")
-            situations_to_invalidate_delete.append(situation.id)
-
-        if situations_to_invalidate_delete:
-            self._emit_invalidation(gRPC.Invalidation.TIMELINE, world, situations_to_invalidate_delete, DELETE)
+            if situations_to_invalidate_delete:
+                self._emit_invalidation(gRPC.Invalidation.TIMELINE, w, situations_to_invalidate_delete, DELETE)
 
         logger.debug("<deleteSituations> completed")
         return gRPC.Empty()
 
     ############ MESHES
     @profile
+    @metered
     def hasMesh(self, meshInCtxt, context):
         logger.debug("Got <hasMesh> from %s" % meshInCtxt.client.id)
         res = gRPC.Bool(value=(meshInCtxt.mesh.id in self.meshes))
@@ -604,40 +1553,138 @@ class Server(gRPC.BetaUnderworldsServicer):
         return res
 
     @profile
+    @metered
     def getMesh(self, meshInCtxt, context):
         logger.debug("Got <getMesh> from %s" % meshInCtxt.client.id)
+
+        mesh = self.meshes.lod(meshInCtxt.mesh.id, meshInCtxt.lod)
+        if not self._packed_meshes(meshInCtxt.client.id):
+            mesh = _unpacked(mesh)
+
+        size = mesh.ByteSize()
+        if size > _MESH_STREAMING_THRESHOLD:
+            context.set_details("Mesh <%s> is too large (%d bytes) to be sent at once: use getMeshStream instead" % (mesh.id, size))
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            return gRPC.Mesh()
+
         logger.debug("<getMesh> completed")
-        return self.meshes[meshInCtxt.mesh.id]
+        return mesh
+
+    @profile
+    @metered
+    def getMeshInfo(self, meshInCtxt, context):
+        logger.debug("Got <getMeshInfo> from %s" % meshInCtxt.client.id)
+
+        mesh_id = meshInCtxt.mesh.id
+
+        # the properties are never computed here (it may take a while for
+        # large meshes), but by the LOD generator
+        try:
+            info = self.meshes.info(mesh_id, compute = False)
+        except KeyError:
+            if mesh_id not in self.meshes:
+                context.set_details("Mesh <%s> does not exist" % mesh_id)
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+            else:
+                self._lod_requests.put(mesh_id)
+                context.set_details("The properties of mesh <%s> are not computed yet" % mesh_id)
+                context.set_code(grpc.StatusCode.UNAVAILABLE)
+            return gRPC.MeshInfo()
+
+        logger.debug("<getMeshInfo> completed")
+        return info
 
     @profile
+    @metered
     def pushMesh(self, meshInCtxt, context):
         logger.debug("Got <pushMesh> from %s" % meshInCtxt.client.id)
 
-        mesh_id = meshInCtxt.mesh.id
-        self.meshes[mesh_id] = meshInCtxt.mesh
+        self._add_mesh(meshInCtxt.client.id, meshInCtxt.mesh.id, meshInCtxt.mesh)
+
+        logger.debug("<pushMesh> completed")
+        return gRPC.Empty()
+
+    def _add_mesh(self, client_id, mesh_id, mesh):
+
+        self.meshes[mesh_id] = mesh
+        self._lod_requests.put(mesh_id)
 
         logger.info("<%s> added a new mesh ID %s (%d faces)" % \
-                                (self._clientname(meshInCtxt.client.id),
+                                (self._clientname(client_id),
                                 mesh_id, 
-                                len(self.meshes[mesh_id].faces)))
+                                len(MeshData.arrays(mesh)[1])))
 
-        logger.debug("<pushMesh> completed")
-        return gRPC.Empty()
+    @profile
+    @metered
+    def getMeshStream(self, chunk, context):
+        logger.debug("Got <getMeshStream> from %s" % chunk.client.id)
 
+        try:
+            mesh = self.meshes.lod(chunk.id, chunk.lod)
+        except KeyError:
+            context.set_details("Mesh <%s> does not exist" % chunk.id)
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            return iter([])
+
+        if not self._packed_meshes(chunk.client.id):
+            mesh = _unpacked(mesh)
+        data = mesh.SerializeToString()
+
+        logger.debug("<getMeshStream> completed. Streaming %d bytes from offset %d" % \
+                                (len(data), chunk.offset))
+        return _mesh_chunks(chunk.id, data, chunk.offset)
+
+    @profile
+    @metered
+    def pushMeshStream(self, chunks, context):
+
+        res = gRPC.MeshChunk()
+
+        for chunk in chunks:
+
+            if not res.id:
+                logger.debug("Got <pushMeshStream> from %s" % chunk.client.id)
+                with self._client_lock:
+                    c = self._clients[chunk.client.id]
+                uploads, activity = c.uploads, c.uploads_activity
+
+            res.id = chunk.id
+
+            # an upload starting at 0 (re)starts from scratch. Otherwise, the
+            # chunk must directly follow the ones already received.
+            data = uploads.get(chunk.id)
+            if chunk.offset == 0:
+                data = uploads[chunk.id] = bytearray()
+            elif data is None or chunk.offset != len(data):
+                context.set_details("Unexpected offset %d for mesh <%s>: %d bytes received so far" % \
+                                    (chunk.offset, chunk.id, len(data or b"")))
+                context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+                return res
+
+            data += chunk.data
+            res.offset = len(data)
+            activity[chunk.id] = time.time()
+
+            if len(data) >= chunk.size:
+                uploads.pop(chunk.id, None)
+                activity.pop(chunk.id, None)
+                self._add_mesh(chunk.client.id, chunk.id, gRPC.Mesh.FromString(bytes(data)))
+
+        logger.debug("<pushMeshStream> completed")
+        return res
+
+    @profile
+    @metered
+    def getPushedMeshOffset(self, chunk, context):
+        logger.debug("Got <getPushedMeshOffset> from %s" % chunk.client.id)
+
+        with self._client_lock:
+            data = self._clients[chunk.client.id].uploads.get(chunk.id)
+
+        res = gRPC.MeshChunk(id=chunk.id, offset=len(data) if data else 0)
+        logger.debug("<getPushedMeshOffset> completed")
+        return res
 
-#
-#                ###########################################################################
-#                # SCENES
-#                ###########################################################################
-#                if cmd == "deepcopy":
-#                    self.update_current_links(client, world, PROVIDER)
-#                    logger.info("<%s> made a deep copy of world %s "
-#                                "into world %s" % (clientname, arg, world))
-#                    self._worlds[world].deepcopy(self._worlds[arg])
-#                    rpc.send(b"ack")
-#
-#
-#
 
 #                ###########################################################################
 #                # TIMELINES
@@ -653,43 +1700,184 @@ class Server(gRPC.BetaUnderworldsServicer):
 #                    pass #TODO
 #
 
-def start(port=50051, signaling_queue=None):
+def _mesh_chunks(id, data, offset = 0):
+    """ Yields a serialized mesh as a sequence of gRPC.MeshChunk, starting at
+    the given offset.
+    """
+    data = memoryview(data)
+
+    for start in range(offset, len(data), _MESH_CHUNK_SIZE):
+        yield gRPC.MeshChunk(id=id,
+                             offset=start,
+                             size=len(data),
+                             data=data[start:start + _MESH_CHUNK_SIZE].tobytes())
+
+def _unpacked(mesh):
+    """ Returns a copy of a packed mesh (as stored by the MeshStore) whose
+    vertices, faces and normals are in the repeated fields instead, for the
+    clients which do not support packed meshes (see Client.packed_meshes).
+    """
+    res = gRPC.Mesh(id=mesh.id, colors=mesh.colors)
+    res.diffuse.CopyFrom(mesh.diffuse)
+
+    vertices, faces, normals = MeshData.arrays(mesh)
+    for points, array in [(res.vertices, vertices), (res.faces, faces), (res.normals, normals)]:
+        for x, y, z in array.tolist():
+            points.add(x=x, y=y, z=z)
+
+    return res
+
+class RunningServer:
+    """ An underworlds server started with start(): the gRPC server and the
+    servicer (see Server) it serves.
+    """
+
+    def __init__(self, server, servicer):
+        self.server = server
+        self.servicer = servicer
+        self._closed = False
+
+    def stop(self, grace=None):
+        """ Stops serving the RPCs (see grpc.Server.stop), then closes the
+        servicer: takes a last snapshot of the worlds, closes the journal and
+        stops the generation of the levels of detail.
+
+        Blocks until the server is stopped, and returns a (set)
+        threading.Event, like grpc.Server.stop.
+        """
+        stopped = self.server.stop(grace)
+        stopped.wait()
+
+        if not self._closed:
+            self._closed = True
+            self.servicer.close()
+            logger.info("uwds server closed.")
+
+        return stopped
+
+    def wait_for_termination(self, timeout=None):
+        return self.server.wait_for_termination(timeout)
+
+def _server_options(max_message_length=None, keepalive_time=None, keepalive_timeout=None):
+    """ Returns the gRPC channel arguments of the server.
+    """
+    options = []
+
+    if max_message_length is not None:
+        options += [("grpc.max_send_message_length", max_message_length),
+                    ("grpc.max_receive_message_length", max_message_length)]
+
+    if keepalive_time is not None:
+        options += [("grpc.keepalive_time_ms", int(keepalive_time * 1000)),
+                    ("grpc.keepalive_permit_without_calls", 1),
+                    # accept the pings of clients using the same keepalive
+                    ("grpc.http2.min_ping_interval_without_data_ms", int(keepalive_time * 1000)),
+                    ("grpc.http2.max_pings_without_data", 0)]
+
+    if keepalive_timeout is not None:
+        options.append(("grpc.keepalive_timeout_ms", int(keepalive_timeout * 1000)))
+
+    return options
+
+def start(port=50051, signaling_queue=None, coalescing_window=_COALESCING_WINDOW,
+          journal_path=None, sync_interval=journal._SYNC_INTERVAL, meshes_path=None,
+          max_workers=_THREAD_POOL_SIZE, max_concurrent_rpcs=None,
+          max_message_length=None, keepalive_time=None, keepalive_timeout=None):
     """Starts the underworlds server in a thread on the given port and returns
-    the resulting gRPC server.
+    the resulting RunningServer. Its stop() method must be called to properly
+    close the server (in particular, to take the last snapshot of the worlds).
 
     If signaling_queue is provided, the behaviour is blocking:
     it creates and start an underworlds server, then blocks until something is pushed onto the queue.
     It then properly closes the server and returns None.
+
+    coalescing_window is the duration (in seconds) during which the
+    invalidations emitted on a world are merged before being sent to the
+    clients. Set it to 0 to send each invalidation immediately.
+
+    If journal_path is provided, the worlds and meshes are persisted in this
+    directory (see underworlds.journal), and restored from it upon startup.
+    sync_interval is the maximum delay (in seconds) before a mutation is
+    fsync'ed to the disk. Set it to 0 to sync each mutation before replying
+    to the client.
+
+    meshes_path is the directory where the meshes are stored (see
+    underworlds.meshstore). It defaults to the 'meshes' subdirectory of
+    journal_path if provided, or to a temporary directory otherwise.
+
+    max_workers is the number of threads serving the RPCs. Since each
+    connected client holds one of them for its invalidation stream, it must
+    be larger than the expected number of clients. If max_concurrent_rpcs is
+    provided, the RPCs received while this many RPCs (invalidation streams
+    included) are already running are rejected with RESOURCE_EXHAUSTED.
+
+    max_message_length is the maximum size (in bytes) of the messages sent
+    and received by the server (4MB by default).
+
+    If keepalive_time is provided, the server pings the clients every
+    keepalive_time seconds of inactivity, and closes the connection if no
+    acknowledgement is received within keepalive_timeout seconds (20 by
+    default). This detects the clients that vanished without closing their
+    invalidation stream.
     """
 
     desired_port=str(port)
 
-    server = gRPC.beta_create_Underworlds_server(Server())
-    port = server.add_insecure_port('[::]:%s' % desired_port)
+    if meshes_path is None and journal_path:
+        meshes_path = os.path.join(journal_path, "meshes")
+
+    servicer = Server(coalescing_window,
+                      journal.Journal(journal_path, sync_interval) if journal_path else None,
+                      MeshStore(meshes_path))
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                    thread_name_prefix="uwds-rpc"),
+                         maximum_concurrent_rpcs=max_concurrent_rpcs,
+                         options=_server_options(max_message_length,
+                                                 keepalive_time,
+                                                 keepalive_timeout))
+    gRPC.add_UnderworldsServicer_to_server(servicer, server)
+
+    try:
+        port = server.add_insecure_port('[::]:%s' % desired_port)
+    except RuntimeError: # recent gRPC versions raise instead of returning 0
+        port = 0
 
     if port == 0:
+        servicer.close()
         raise RuntimeError("The port %s is already in use! Underworlds server already running? "
                      "I can not start the server." % desired_port)
 
+    # tracing (see helpers.profile) can be switched on and off with SIGUSR2
+    toggle_on_signal()
+
     logger.info("Starting the server...")
     server.start()
     time.sleep(0.2) # leave some time to the server to start
     logger.info("Server started.")
 
+    server = RunningServer(server, servicer)
+
     if signaling_queue is None:
         return server
     else:
         # block on the queue
         signaling_queue.get()
         logger.info("uwds server exiting. Closing connections...")
-        server.stop(1).wait()
-        logger.info("uwds server closed.")
+        server.stop(1)
 
-def start_process(port=50051):
+def start_process(port=50051, coalescing_window=_COALESCING_WINDOW,
+                  journal_path=None, sync_interval=journal._SYNC_INTERVAL, meshes_path=None,
+                  **options):
+    """ Starts the underworlds server in a new process. `options` are the
+    gRPC options of start (max_workers, max_concurrent_rpcs, ...).
+    """
     import multiprocessing
 
     q = multiprocessing.Queue()
-    p = multiprocessing.Process(target=start, args=(port, q,))
+    p = multiprocessing.Process(target=start, args=(port, q, coalescing_window,
+                                                    journal_path, sync_interval, meshes_path),
+                                kwargs=options)
     p.start()
 
     return p, q
@@ -35,17 +35,17 @@ class ModelLoader:
         Be careful: this is the *untransformed* bounding box,
         ie, the bounding box of the mesh in the node frame.
         """
-        x_min, y_min, z_min = 1e10, 1e10, 1e10
-        x_max, y_max, z_max = -1e10, -1e10, -1e10
+        bb_min = numpy.full(3, 1e10)
+        bb_max = numpy.full(3, -1e10)
         for mesh in node.meshes:
-            for v in mesh.vertices:
-                x_min = round(min(x_min, v[0]), 5)
-                y_min = round(min(y_min, v[1]), 5)
-                z_min = round(min(z_min, v[2]), 5)
-                x_max = round(max(x_max, v[0]), 5)
-                y_max = round(max(y_max, v[1]), 5)
-                z_max = round(max(z_max, v[2]), 5)
-        return float(x_min), float(y_min), float(z_min), float(x_max), float(y_max), float(z_max)
+            vertices = numpy.asarray(mesh.vertices).reshape(-1, 3)
+            if len(vertices):
+                bb_min = numpy.minimum(bb_min, vertices.min(axis=0))
+                bb_max = numpy.maximum(bb_max, vertices.max(axis=0))
+
+        x_min, y_min, z_min = [round(float(v), 5) for v in bb_min]
+        x_max, y_max, z_max = [round(float(v), 5) for v in bb_max]
+        return x_min, y_min, z_min, x_max, y_max, z_max
 
 
     def fill_node_details(self, 
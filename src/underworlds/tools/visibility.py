@@ -141,7 +141,9 @@ class VisibilityMonitor:
 
             logger.info("Mesh ID %s is now available. Getting it..." % id)
 
-        mesh = self.ctx.mesh(id) # retrieve the mesh from the server
+        # retrieve the mesh from the server. The visibility is computed on
+        # small images: a simplified version of the mesh is enough.
+        mesh = self.ctx.mesh(id, LOD_LOW)
 
         # Fill the buffer for vertex
         v = numpy.array(mesh.vertices, 'f')
@@ -2,6 +2,11 @@ import uuid
 import copy
 import json
 import time
+import struct
+import hashlib
+import threading
+
+from collections import OrderedDict, deque
 
 import logging
 logger = logging.getLogger("underworlds.core")
@@ -11,6 +16,7 @@ import numpy
 import underworlds.underworlds_pb2 as gRPC
 
 from underworlds.errors import *
+from underworlds.helpers.aabbtree import AABBTree
 
 # Clients types
 READER = gRPC.ClientInteraction.READER
@@ -51,12 +57,26 @@ SITUATIONTYPE_NAMES = {GENERIC: "generic situation",
 NEW = gRPC.Invalidation.NEW
 UPDATE = gRPC.Invalidation.UPDATE
 DELETE = gRPC.Invalidation.DELETE
+RESYNC = gRPC.Invalidation.RESYNC
 
 INVALIDATIONTYPE_NAMES = {NEW: "new",
                           UPDATE: "update",
-                          DELETE: "delete"
+                          DELETE: "delete",
+                          RESYNC: "resync"
                          }
 
+# Meshes levels of detail
+LOD_FULL = gRPC.MeshInContext.FULL
+LOD_HIGH = gRPC.MeshInContext.HIGH # ~50% of the faces
+LOD_LOW = gRPC.MeshInContext.LOW # ~10% of the faces
+LOD_HULL = gRPC.MeshInContext.HULL # convex hull
+
+LOD_NAMES = {LOD_FULL: "full",
+             LOD_HIGH: "high",
+             LOD_LOW: "low",
+             LOD_HULL: "hull"
+            }
+
 class Node(object):
     def __init__(self, name = "", type = UNDEFINED):
 
@@ -86,6 +106,16 @@ class Node(object):
         # might define their own required properties
         self.properties = {}
 
+        # 4x4 transformation matrix, relative to the world, and world
+        # axis-aligned bounding box ((xmin, ymin, zmin), (xmax, ymax, zmax))
+        # of the node's geometry, as computed by the server when the node was
+        # fetched (see Scene.world_transform and Scene.world_aabb). None if
+        # unknown, eg if one of its ancestors has moved since (or, for the
+        # AABB, if the node has no geometry).
+        # READ-ONLY
+        self._world_transformation = None
+        self._world_aabb = None
+
         ################################################################
         ##                     END OF THE API                         ##
         ################################################################
@@ -97,6 +127,12 @@ class Node(object):
     @property
     def type(self):
         return self._type
+    @property
+    def world_transformation(self):
+        return self._world_transformation
+    @property
+    def world_aabb(self):
+        return self._world_aabb
 
 
     def __repr__(self):
@@ -216,6 +252,11 @@ class Node(object):
             if k == "facing":
                 node.properties[k] = numpy.array(node.properties[k], dtype=numpy.float32).reshape(4,4)
 
+        if data.world_transformation:
+            node._world_transformation = numpy.array(data.world_transformation, dtype=numpy.float32).reshape(4,4)
+        if data.world_aabb:
+            node._world_aabb = (tuple(data.world_aabb[:3]), tuple(data.world_aabb[3:]))
+
         return node
 
 class Entity(Node):
@@ -249,6 +290,10 @@ class Camera(Node):
                 "horizontalfov": None,
             }
 
+# types of the packed mesh arrays (see MeshData.serialize)
+MESH_FLOAT = numpy.dtype("<f4")
+MESH_INDEX = numpy.dtype("<u4")
+
 class MeshData(object):
 
     def __init__(self, vertices, faces, normals, diffuse=(1,1,1,1)):
@@ -260,18 +305,37 @@ class MeshData(object):
         self.diffuse = tuple(diffuse) # diffuse color, white by default
         if len(self.diffuse) == 3: self.diffuse += (1,)
 
-        self.id = str(hash(str(self.serialize(gRPC.Mesh))))
+        self.id = self.digest()
 
     def __hash__(self):
-        m = (self.vertices, \
-             self.faces, \
-             self.normals, \
-             self.diffuse)
-        return hash(str(m))
+        return hash(self.digest())
+
+    def _pack(self):
+        """Returns the vertices, faces and normals as packed arrays (bytes).
+        """
+        return (numpy.asarray(self.vertices, dtype=MESH_FLOAT).tobytes(),
+                numpy.asarray(self.faces, dtype=MESH_INDEX).tobytes(),
+                numpy.asarray(self.normals, dtype=MESH_FLOAT).tobytes())
+
+    def digest(self):
+        """Returns a digest (BLAKE2) of the content of the mesh.
+
+        It only depends on the packed vertices, faces and normals and on the
+        diffuse color: identical meshes get the same digest, in any process.
+        """
+        h = hashlib.blake2b(digest_size=20)
+        for packed in self._pack():
+            h.update(struct.pack("<Q", len(packed)))
+            h.update(packed)
+        h.update(struct.pack("<4f", *self.diffuse))
+        return h.hexdigest()
 
     def serialize(self, MeshType):
         """Outputs a protobuf encoding of the mesh
 
+        The vertices, faces and normals are encoded in the packed fields of
+        the message (see underworlds.proto).
+
         The MeshType (underworlds_pb2.Mesh) needs to be passed as parameter
         to prevent the creation of a 2nd instance of the underworlds_pb2 that
         crashes the gRPC. Not sure why...
@@ -282,17 +346,7 @@ class MeshData(object):
         mesh = MeshType()
         mesh.id = self.id
 
-        for vertex in self.vertices:
-            point = mesh.vertices.add()
-            point.x, point.y, point.z = vertex
-
-        for f in self.faces:
-            face = mesh.faces.add()
-            face.x, face.y, face.z = f
-
-        for normal in self.normals:
-            point = mesh.normals.add()
-            point.x, point.y, point.z = normal
+        mesh.packed_vertices, mesh.packed_faces, mesh.packed_normals = self._pack()
 
         mesh.diffuse.r, mesh.diffuse.g, mesh.diffuse.b, mesh.diffuse.a = self.diffuse
 
@@ -303,11 +357,16 @@ class MeshData(object):
     @staticmethod
     def deserialize(data):
         """Creates a Python mesh object from a protobuf encoding.
+
+        The vertices, faces and normals of the mesh are read-only (n, 3) numpy
+        arrays (see MeshData.arrays).
         """
 
-        mesh = MeshData(vertices=[(p.x,p.y,p.z) for p in data.vertices],
-                    faces = [(f.x,f.y,f.z) for f in data.faces],
-                    normals = [(n.x,n.y,n.z) for n in data.normals],
+        vertices, faces, normals = MeshData.arrays(data)
+
+        mesh = MeshData(vertices=vertices,
+                    faces = faces,
+                    normals = normals,
                     diffuse = (data.diffuse.r, data.diffuse.g, data.diffuse.b, data.diffuse.a))
 
         #if mesh.id != data.id:
@@ -315,18 +374,232 @@ class MeshData(object):
 
         return mesh
 
+    @staticmethod
+    def arrays(data):
+        """Returns the vertices, faces and normals of a protobuf-encoded mesh,
+        as (n, 3) numpy arrays of MESH_FLOAT, MESH_INDEX and MESH_FLOAT.
+
+        When the mesh is packed, the arrays are read-only views on the
+        message's data. Otherwise, they are built from the repeated fields.
+        """
+        arrays = []
+        for packed, points, dtype in [(data.packed_vertices, data.vertices, MESH_FLOAT),
+                                      (data.packed_faces, data.faces, MESH_INDEX),
+                                      (data.packed_normals, data.normals, MESH_FLOAT)]:
+            if packed:
+                array = numpy.frombuffer(packed, dtype=dtype)
+            else:
+                array = numpy.array([(p.x, p.y, p.z) for p in points], dtype=dtype)
+            arrays.append(array.reshape(-1, 3))
+
+        return arrays
+
+class MeshInfo(object):
+    """Geometric properties of a mesh, as precomputed by the server (see
+    MeshStore.info): number of vertices and faces, axis-aligned bounding box
+    (`aabb`: ((xmin, ymin, zmin), (xmax, ymax, zmax))), bounding sphere
+    (`sphere`: ((x, y, z), radius)) and the vertices of the convex hull of
+    the mesh (`hull`: a read-only (n, 3) numpy array).
+    """
+
+    def __init__(self, id, nb_vertices, nb_faces, aabb, sphere, hull):
+
+        self.id = id
+        self.nb_vertices = nb_vertices
+        self.nb_faces = nb_faces
+        self.aabb = aabb
+        self.sphere = sphere
+        self.hull = hull
+
+    @staticmethod
+    def deserialize(data):
+        """Creates a Python mesh info object from a protobuf encoding.
+        """
+        point = lambda p: (p.x, p.y, p.z)
+
+        return MeshInfo(data.id,
+                        data.nb_vertices,
+                        data.nb_faces,
+                        aabb = (point(data.aabb_min), point(data.aabb_max)),
+                        sphere = (point(data.sphere_center), data.sphere_radius),
+                        hull = numpy.frombuffer(data.packed_hull_vertices, dtype=MESH_FLOAT).reshape(-1, 3))
+
+def _property_key(value):
+    """ Returns the canonical (JSON) representation of a property value.
+    """
+    if isinstance(value, numpy.ndarray):
+        value = value.tolist()
+    return json.dumps(value, sort_keys = True)
+
+def _property_keys(value):
+    """ Returns the keys under which a property value is indexed: the value
+    itself, and its items if the value is a list.
+    """
+    keys = {_property_key(value)}
+    if isinstance(value, (list, tuple)):
+        keys.update(_property_key(item) for item in value)
+    return keys
+
 class Scene(object):
     """An Underworlds scene
+
+    Nodes are stored in an ordered mapping indexed by node ID: lookup,
+    insertion, replacement and deletion are all O(1), while iterating over
+    the nodes follows their insertion order.
+
+    The scene also maintains the node hierarchy: each node's `children` is
+    kept up-to-date by the scene when nodes are added, re-parented or
+    removed, again in O(1) per change.
+
+    Scenes can be forked (see Scene.fork): the nodes are then shared between
+    the scenes, and copied only when their hierarchy is modified in one of
+    them (copy-on-write).
+
+    Finally, the scene caches the world transformation and world AABB of the
+    nodes (see Scene.world_transform and Scene.world_aabb). Moving a node
+    only invalidates the cached values of its subtree. The nodes are also
+    indexed by their world AABB, for fast spatial queries (see
+    Scene.query_box, Scene.query_sphere and Scene.nearest), and by their
+    name, type and some of their properties (see Scene.find). The name, type
+    and property indices are updated along with the scene, while the
+    spatial index is updated lazily, by the next spatial query: a change
+    only costs marking the moved nodes, and the first query after a batch
+    of changes pays for re-indexing them.
+
+    :param hulls: optional callable returning the vertices of the convex
+    hull of a mesh from its ID (or raising KeyError if unknown), used to
+    compute the world AABB of the mesh nodes. If None (or if a mesh is
+    unknown), the `aabb` property of the nodes is used instead.
     """
 
-    def __init__(self):
+    # properties whose values are indexed (see Scene.find)
+    INDEXED_PROPERTIES = ("mesh_ids", "physics")
+
+    def __init__(self, hulls = None):
 
         self.rootnode = Entity("root")
         self.rootnode.transformation = numpy.identity(4, dtype=numpy.float32)
 
-        self.nodes = []
+        self._nodes = OrderedDict() # node store, indexed by node ID
+
+        # hierarchy indices:
+        # - _parents: node ID -> parent ID, as currently indexed
+        # - _children: parent ID -> ordered set (OrderedDict with None
+        #   values) of children IDs. These sets are shared with the nodes'
+        #   `_children` attribute.
+        self._parents = {}
+        self._children = {}
+
+        # IDs of the nodes whose children set (and thus, node object) can be
+        # modified in place. None means all of them (the scene has never been
+        # forked).
+        self._owned = None
+
+        # caches: node ID -> world transformation (read-only numpy 4x4
+        # matrix), and node ID -> world AABB (or None, if the node has no
+        # geometry)
+        self._world_transforms = {}
+        self._world_aabbs = {}
+        self.hulls = hulls
+
+        # spatial index of the nodes (built upon the first query), and IDs of
+        # the nodes to re-index before the next query. The index is updated
+        # lazily, by the queries (see _refreshed_index): changing the scene
+        # only marks the nodes to re-index.
+        #
+        # The queries, as the world transformations and AABBs above, may be
+        # called concurrently by several readers of the scene, which then
+        # all update the index and the caches: every modification of them
+        # is made with _index_lock held.
+        self._index = None
+        self._index_dirty = set()
+        self._index_lock = threading.RLock()
+
+        # secondary indices: name -> node IDs, type -> node IDs and property
+        # -> value (see _property_keys) -> node IDs. The sets of node IDs
+        # are dicts with None values, to keep the nodes' order. _keys holds
+        # the indexed keys of each node.
+        self._by_name = {}
+        self._by_type = {}
+        self._by_property = {name: {} for name in self.INDEXED_PROPERTIES}
+        self._keys = {}
+
+        self.append(self.rootnode)
+
+    def fork(self):
+        """ Returns a copy of the scene.
+
+        The copy is copy-on-write: the nodes are not copied, but shared by
+        both scenes until the scenes modify them. The scene indices (node
+        map, hierarchy, caches and secondary indices) are copied, though:
+        the fork is O(n) in the number of nodes, only with a small constant
+        (about 1ms for 5000 nodes). The spatial index is not copied, but
+        built again upon the first query of the fork.
+
+        Note that nodes must never be modified in place once they are part of
+        a forked scene: update the scene with modified copies instead.
+        """
+        scene = Scene.__new__(Scene)
+
+        scene.rootnode = self.rootnode
+        scene._nodes = OrderedDict(self._nodes)
+        scene._parents = dict(self._parents)
+        scene._children = dict(self._children)
+
+        with self._index_lock:
+            scene._world_transforms = dict(self._world_transforms)
+            scene._world_aabbs = dict(self._world_aabbs)
+        scene.hulls = self.hulls
+
+        # (the index of the fork is built upon its first query)
+        scene._index = None
+        scene._index_dirty = set()
+        scene._index_lock = threading.RLock()
+
+        scene._by_name = {name: dict(ids) for name, ids in self._by_name.items()}
+        scene._by_type = {type: dict(ids) for type, ids in self._by_type.items()}
+        scene._by_property = {name: {value: dict(ids) for value, ids in values.items()} \
+                                    for name, values in self._by_property.items()}
+        scene._keys = dict(self._keys)
+
+        # from now on, the nodes and their children sets are shared
+        scene._owned = set()
+        self._owned = set()
+
+        return scene
+
+    def reroot(self, id):
+        """ Changes the ID of the root node of the scene. The children of the
+        root node are re-parented accordingly.
+        """
+        rootnode = copy.copy(self.rootnode)
+        rootnode.id = id
+
+        children = list(self._children.get(self.rootnode.id, ()))
+
+        self.remove(self.rootnode)
+        self.update(rootnode)
+        self._nodes.move_to_end(id, last=False)
+        self.rootnode = rootnode
 
-        self.nodes.append(self.rootnode)
+        for child_id in children:
+            child = copy.copy(self._nodes[child_id])
+            child.parent = id
+            self.update(child)
+
+    @property
+    def nodes(self):
+        """ A read-only view on the nodes of the scene, in insertion order.
+
+        Use Scene.append, Scene.update and Scene.remove to modify the scene.
+        """
+        return self._nodes.values()
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, node):
+        return hasattr(node, "id") and node.id in self._nodes
 
     def list_entities(self):
         """ Returns the list of entities contained in the scene.
@@ -336,18 +609,386 @@ class Scene(object):
     def node(self, id):
         """ Returns a node from its ID (or None if the node does not exist)
         """
-        for n in self.nodes:
-            if n.id == id:
-                return n
+        return self._nodes.get(id)
+
+    def append(self, node):
+        """ Adds the given node to the scene.
+
+        If a node with the same ID already exists, it replaces it.
+
+        :returns: True if the node has been added, False if it has simply updated an existing node
+        """
+        return not self.update(node)
+
+    def update(self, node):
+        """ Update (ie, replace) an existing node with the given one.
+
+        If the node does not exist, simply add it at the end of the scene. A
+        replaced node keeps its position.
+
+        The hierarchy is updated if the parent of the node has changed. This
+        includes nodes that have been re-parented in place (ie, by directly
+        setting `node.parent` on a node already in the scene).
+
+        :returns: True if the node has been updated, False if it has been simply added (new node)
+        """
+        exists = node.id in self._nodes
+
+        if not exists or self._nodes[node.id] is node or \
+           self._parents[node.id] != node.parent or \
+           not numpy.array_equal(self._nodes[node.id].transformation, node.transformation):
+            self._invalidate_world(node.id)
+        else:
+            # (the geometry of the node may have changed)
+            with self._index_lock:
+                self._world_aabbs.pop(node.id, None)
+                if self._index is not None:
+                    self._index_dirty.add(node.id)
+
+        if not exists:
+            self._link(node.id, node.parent)
+        elif self._parents[node.id] != node.parent:
+            self._unlink(node.id, self._parents[node.id])
+            self._link(node.id, node.parent)
+
+        # the children of a node are maintained by the scene, whatever the
+        # node object says
+        node._children = self._writable_children(node.id, copy_node=False)
+
+        self._unindex(node.id)
+        self._nodes[node.id] = node
+        self._index_keys(node)
+        if node.id == self.rootnode.id:
+            self.rootnode = node
+
+        return exists
+
+    def remove(self, node):
+        """ Deletes an existing node.
+
+        The node is removed from its parent's children. Its own children (if
+        any) are left untouched, and still reference the deleted node as
+        their parent until they are re-parented.
+        """
+        self._invalidate_world(node.id)
+        self._unindex(node.id)
+
+        del self._nodes[node.id]
+        self._unlink(node.id, self._parents.pop(node.id))
+
+        if not self._children.get(node.id):
+            self._children.pop(node.id, None)
+            if self._owned is not None:
+                self._owned.discard(node.id)
+
+    def parent(self, id):
+        """ Returns the ID of the parent of a node, as currently known by the
+        scene (or None if the node does not exist or has no parent).
+        """
+        return self._parents.get(id)
+
+    def descendants(self, id):
+        """ Returns the IDs of all the descendants of a node (children,
+        grand-children, etc.), parents first.
+        """
+        descendants = []
+        queue = deque([id])
+        while queue:
+            children = self._children.get(queue.popleft(), ())
+            descendants.extend(children)
+            queue.extend(children)
+        return descendants
+
+    def world_transform(self, id):
+        """ Returns the transformation of a node relative to the world (ie,
+        the product of the transformations of its ancestors and of its own),
+        as a read-only 4x4 numpy array, or None if the node does not exist.
+
+        The transformations are cached until the node or one of its ancestors
+        is moved or re-parented.
+        """
+        transform = self._world_transforms.get(id)
+        if transform is not None:
+            return transform
+
+        with self._index_lock:
+            # walks up the hierarchy, until an ancestor whose transformation
+            # is known
+            chain = []
+            parent = id
+            while parent not in self._world_transforms:
+                node = self._nodes.get(parent)
+                if node is None or len(chain) > len(self._nodes): # (cycle!)
+                    break
+                chain.append(node)
+                parent = self._parents.get(parent)
+
+            if not chain:
+                return self._world_transforms.get(id)
+
+            transform = self._world_transforms.get(parent)
+            if transform is None:
+                transform = numpy.identity(4)
+
+            for node in reversed(chain):
+                transform = numpy.dot(transform, node.transformation)
+                transform.flags.writeable = False
+                self._world_transforms[node.id] = transform
+
+            return transform
+
+    def world_aabb(self, id):
+        """ Returns the axis-aligned bounding box, in the world frame, of the
+        geometry of a node (the transformed convex hulls of its meshes), as a
+        ((xmin, ymin, zmin), (xmax, ymax, zmax)) tuple of numpy arrays.
+
+        Returns None if the node does not exist or has no geometry (eg,
+        entities or cameras). The children of the node are not taken into
+        account.
+        """
+        if id in self._world_aabbs:
+            return self._world_aabbs[id]
+
+        node = self._nodes.get(id)
+        if node is None:
+            return None
+
+        points, complete = self._local_geometry(node)
+
+        with self._index_lock:
+            if points is None:
+                aabb = None
+            else:
+                transform = self.world_transform(id)
+                points = numpy.dot(points, transform[:3, :3].T) + transform[:3, 3]
+                aabb = (points.min(axis=0), points.max(axis=0))
+
+            # (if some meshes are not known yet, the AABB is computed again next time)
+            if complete:
+                self._world_aabbs[id] = aabb
+
+            return aabb
+
+    def _local_geometry(self, node):
+        """ Returns the points, in the node frame, bounding the geometry of a
+        node (or None if the node has no geometry), and whether they are
+        final (ie, whether all the meshes of the node are known).
+        """
+        if node.type != MESH:
+            return None, True
+
+        complete = True
+        if self.hulls is not None:
+            try:
+                hulls = [self.hulls(mesh_id) for mesh_id in node.properties.get("mesh_ids") or []]
+            except KeyError:
+                complete = False
+            else:
+                hulls = [hull for hull in hulls if len(hull)]
+                if hulls:
+                    return numpy.concatenate(hulls), True
+
+        aabb = node.properties.get("aabb")
+        if not aabb:
+            return None, complete
+
+        x1, y1, z1, x2, y2, z2 = aabb
+        points = numpy.array([(x, y, z) for x in (x1, x2) for y in (y1, y2) for z in (z1, z2)])
+        return points, complete
+
+    def _invalidate_world(self, id):
+        """ Discards the cached world transformations and AABBs of a node and
+        of its descendants.
+        """
+        with self._index_lock:
+            for id in [id] + self.descendants(id):
+                self._world_transforms.pop(id, None)
+                self._world_aabbs.pop(id, None)
+                if self._index is not None:
+                    self._index_dirty.add(id)
+
+    def query_box(self, bb_min, bb_max):
+        """ Returns the IDs of the nodes whose world AABB intersects the given
+        box (in the world frame).
+
+        The nodes without geometry are indexed by the origin of their frame.
+        The root node is never returned.
+        """
+        with self._index_lock:
+            return self._refreshed_index().query_box(bb_min, bb_max)
+
+    def query_sphere(self, center, radius):
+        """ Returns the IDs of the nodes whose world AABB intersects the given
+        sphere (in the world frame).
+
+        See Scene.query_box.
+        """
+        with self._index_lock:
+            return self._refreshed_index().query_sphere(center, radius)
+
+    def nearest(self, point, k = 1):
+        """ Returns the IDs of the k nodes whose world AABB is the nearest to
+        a point (in the world frame), nearest first, as a list of (ID,
+        distance) pairs.
+
+        See Scene.query_box.
+        """
+        with self._index_lock:
+            return self._refreshed_index().nearest(point, k)
+
+    def _refreshed_index(self):
+        """ Returns the spatial index of the scene, after having re-indexed
+        the nodes which have changed since the last query.
+
+        Must be called with the index lock held.
+        """
+        if self._index is None:
+            self._index = AABBTree()
+            self._index_dirty = set(self._nodes.keys())
+
+        dirty = self._index_dirty
+        self._index_dirty = set()
+
+        for id in dirty:
+            if id not in self._nodes or id == self.rootnode.id:
+                self._index.remove(id)
+                continue
+
+            aabb = self.world_aabb(id)
+            if aabb is None:
+                origin = self.world_transform(id)[:3, 3]
+                aabb = (origin, origin)
+
+            self._index.update(id, *aabb)
+
+            if id not in self._world_aabbs:
+                # some of the meshes of the node are not known yet
+                self._index_dirty.add(id)
+
+        return self._index
+
+    def _writable_children(self, id, copy_node=True):
+        """ Returns the set of children of a node, ready to be modified.
+
+        If the set is shared with a forked scene, it is copied first, as well
+        as the node object (if `copy_node` is true) since it references its
+        children set.
+        """
+        children = self._children.get(id)
+
+        if self._owned is None or id in self._owned:
+            if children is None:
+                children = self._children[id] = OrderedDict()
+            return children
+
+        children = self._children[id] = OrderedDict(children or ())
+        self._owned.add(id)
+
+        node = self._nodes.get(id)
+        if copy_node and node is not None:
+            node = copy.copy(node)
+            node._children = children
+            self._nodes[id] = node
+            if id == self.rootnode.id:
+                self.rootnode = node
+
+        return children
+
+    def _link(self, id, parent):
+        self._parents[id] = parent
+        if parent is not None:
+            self._writable_children(parent)[id] = None
+
+    def _unlink(self, id, parent):
+        if self._children.get(parent) is None:
+            return
+        children = self._writable_children(parent)
+        children.pop(id, None)
+        # forget about non-existing parents once they have no children anymore
+        if not children and parent not in self._nodes:
+            del self._children[parent]
+
+    def find(self, name = None, types = None, properties = None):
+        """ Returns the IDs of the nodes matching all the given criteria.
+
+        :param name: the name of the nodes
+        :param types: a list of accepted node types
+        :param properties: a dictionary of properties the nodes must have.
+        A node matches a property if its value is the given one, or contains
+        it (if the property is a list). None matches any value.
+
+        The nodes are looked up in the scene's indices: only the properties
+        which are not in Scene.INDEXED_PROPERTIES (or whose value is None)
+        require to check the candidate nodes one by one.
+        """
+        properties = properties or {}
+
+        candidates = []
+        if name is not None:
+            candidates.append(self._by_name.get(name, {}))
+        if types is not None:
+            ids = {}
+            for type in types:
+                ids.update(self._by_type.get(type, {}))
+            candidates.append(ids)
+        for key, value in properties.items():
+            if key in self._by_property and value is not None:
+                candidates.append(self._by_property[key].get(_property_key(value), {}))
+
+        if candidates:
+            candidates.sort(key = len)
+            ids = [id for id in candidates[0] if all(id in c for c in candidates[1:])]
+        else:
+            ids = list(self._nodes.keys())
+
+        # the remaining properties are checked node by node
+        others = [(key, value) for key, value in properties.items() \
+                                    if key not in self._by_property or value is None]
+        if others:
+            ids = [id for id in ids if all(self._matches(self._nodes[id], key, value) \
+                                                for key, value in others)]
+
+        return ids
+
+    @staticmethod
+    def _matches(node, key, value):
+        if key not in node.properties:
+            return False
+        return value is None or _property_key(value) in _property_keys(node.properties[key])
+
+    def _index_keys(self, node):
+
+        properties = {}
+        for key in self.INDEXED_PROPERTIES:
+            if node.properties.get(key) is not None:
+                properties[key] = _property_keys(node.properties[key])
+
+        self._keys[node.id] = (node.name, node.type, properties)
+
+        self._by_name.setdefault(node.name, {})[node.id] = None
+        self._by_type.setdefault(node.type, {})[node.id] = None
+        for key, values in properties.items():
+            for value in values:
+                self._by_property[key].setdefault(value, {})[node.id] = None
+
+    def _unindex(self, id):
+
+        if id not in self._keys:
+            return
+
+        name, type, properties = self._keys.pop(id)
+
+        for index, key in [(self._by_name, name), (self._by_type, type)] + \
+                          [(self._by_property[k], v) for k, values in properties.items() for v in values]:
+            ids = index[key]
+            del ids[id]
+            if not ids:
+                del index[key]
 
     def nodebyname(self, name):
         """ Returns a list of node that have the given name (or [] if no node has this name)
         """
-        nodes = []
-        for n in self.nodes:
-            if n.name == name:
-                nodes.append(n)
-        return nodes
+        return [self._nodes[id] for id in self.find(name = name)]
 
 class Timeline(object):
     """ Stores 'situations' (ie, either events -- temporal objects
@@ -443,6 +1084,14 @@ class Timeline(object):
         """
         del self.situations[situation.id]
 
+    def fork(self):
+        """ Returns a copy of the timeline. The situations themselves are not
+        copied, but shared by both timelines.
+        """
+        timeline = copy.copy(self)
+        timeline.situations = dict(self.situations)
+        return timeline
+
     def situation(self, id):
         if id in self.situations:
             return self.situations[id]
@@ -466,20 +1115,126 @@ class EventMonitor(object):
         """
         raise NotImplementedError
 
+class ChangeSet(object):
+    """ The compacted sets of new, updated and deleted IDs resulting from a
+    sequence of changes.
+
+    An ID updated after being created remains 'new', an ID created then
+    deleted disappears, and an ID deleted then re-created is 'updated'.
+    """
+
+    def __init__(self):
+        # ordered dictionaries are used as ordered sets
+        self.new = OrderedDict()
+        self.updated = OrderedDict()
+        self.deleted = OrderedDict()
+
+    def add(self, ids, type):
+        """ Merges a change (of type NEW, UPDATE or DELETE) of the given IDs.
+        """
+        for id in ids:
+            if type == NEW:
+                if id in self.deleted:
+                    del self.deleted[id]
+                    self.updated[id] = None
+                else:
+                    self.new[id] = None
+
+            elif type == UPDATE:
+                if id not in self.new:
+                    self.updated[id] = None
+
+            elif type == DELETE:
+                if id in self.new:
+                    del self.new[id]
+                else:
+                    self.updated.pop(id, None)
+                    self.deleted[id] = None
+
+    def ids(self, type):
+        """ Returns the list of IDs for the given type of change.
+        """
+        return list({NEW: self.new,
+                     UPDATE: self.updated,
+                     DELETE: self.deleted}[type].keys())
+
+    def __len__(self):
+        return len(self.new) + len(self.updated) + len(self.deleted)
+
+
 class World(object):
 
-    def __init__(self, name):
+    # number of changes kept in the history of the world (see changes_since)
+    HISTORY_LENGTH = 1000
+
+    def __init__(self, name, hulls = None):
 
         self.name = name
-        self.scene = Scene()
+        self.scene = Scene(hulls)
         self.timeline = Timeline()
 
+        # revision of the world, incremented upon each change to its scene or
+        # timeline
+        self.revision = 0
+
+        # the latest changes, as (revision, target, ids, type) tuples. target
+        # is either gRPC.Invalidation.SCENE or gRPC.Invalidation.TIMELINE
+        self._history = deque()
+        # the changes of this revision and older are not in the history anymore
+        self._forgotten_revision = 0
+
     def __repr__(self):
         return "world " + self.name
 
-    def deepcopy(self, world):
-        self.scene = copy.copy(world.scene)
-        self.timeline = copy.copy(world.timeline)
+    def fork(self, world):
+        """ Replaces the content (scene and timeline) of this world with a
+        copy-on-write copy of the content of `world` (see Scene.fork). The
+        nodes and situations are shared, but the fork is still O(n) in their
+        number.
+
+        The root node of this world and the origin of its timeline are kept,
+        with the content of the other world's root node.
+        """
+        scene = world.scene.fork()
+        scene.reroot(self.scene.rootnode.id)
+
+        timeline = world.timeline.fork()
+        timeline.origin = self.timeline.origin
+
+        self.scene = scene
+        self.timeline = timeline
+
+    def record(self, target, ids, type):
+        """ Adds a change of the scene or the timeline (`target`) to the world
+        history, for the current revision.
+        """
+        self._history.append((self.revision, target, ids, type))
+
+        if len(self._history) > self.HISTORY_LENGTH:
+            self._forgotten_revision = self._history.popleft()[0]
+
+    def clear_history(self):
+        """ Forgets all the changes up to the current revision.
+        """
+        self._history.clear()
+        self._forgotten_revision = self.revision
+
+    def changes_since(self, revision):
+        """ Returns the changes since the given revision (excluded) as a
+        dictionary {target: ChangeSet}, or None if these changes are not in
+        the world history anymore.
+        """
+        if revision < self._forgotten_revision:
+            return None
+
+        changes = {gRPC.Invalidation.SCENE: ChangeSet(),
+                   gRPC.Invalidation.TIMELINE: ChangeSet()}
+
+        for rev, target, ids, type in self._history:
+            if rev > revision:
+                changes[target].add(ids, type)
+
+        return changes
 
 
 class Situation(object):
@@ -19,7 +19,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   name='underworlds.proto',
   package='underworlds',
   syntax='proto3',
-  serialized_pb=_b('\n\x11underworlds.proto\x12\x0bunderworlds\"\x07\n\x05\x45mpty\"\x15\n\x04\x42ool\x12\r\n\x05value\x18\x01 \x01(\x08\"\x14\n\x04Time\x12\x0c\n\x04time\x18\x01 \x01(\x01\"G\n\x07Welcome\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04host\x18\x02 \x01(\t\x12 \n\x18invalidation_server_port\x18\x03 \x01(\x05\"\x14\n\x04Size\x12\x0c\n\x04size\x18\x01 \x01(\x05\")\n\x06Pointf\x12\t\n\x01x\x18\x01 \x01(\x02\x12\t\n\x01y\x18\x02 \x01(\x02\x12\t\n\x01z\x18\x03 \x01(\x02\"(\n\x05Point\x12\t\n\x01x\x18\x01 \x01(\x11\x12\t\n\x01y\x18\x02 \x01(\x11\x12\t\n\x01z\x18\x03 \x01(\x11\"3\n\x05\x43olor\x12\t\n\x01r\x18\x01 \x01(\x02\x12\t\n\x01g\x18\x02 \x01(\x02\x12\t\n\x01\x62\x18\x03 \x01(\x02\x12\t\n\x01\x61\x18\x04 \x01(\x02\"Q\n\x06\x43lient\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12-\n\x05links\x18\x03 \x03(\x0b\x32\x1e.underworlds.ClientInteraction\"\xd0\x01\n\x11\x43lientInteraction\x12\r\n\x05world\x18\x01 \x01(\t\x12<\n\x04type\x18\x02 \x01(\x0e\x32..underworlds.ClientInteraction.InteractionType\x12(\n\rlast_activity\x18\x03 \x01(\x0b\x32\x11.underworlds.Time\"D\n\x0fInteractionType\x12\n\n\x06READER\x10\x00\x12\x0c\n\x08PROVIDER\x10\x01\x12\x0b\n\x07MONITOR\x10\x02\x12\n\n\x06\x46ILTER\x10\x03\"(\n\x07\x43ontext\x12\x0e\n\x06\x63lient\x18\x01 \x01(\t\x12\r\n\x05world\x18\x02 \x01(\t\"\xee\x01\n\x0cInvalidation\x12\x30\n\x06target\x18\x01 \x01(\x0e\x32 .underworlds.Invalidation.Target\x12\x38\n\x04type\x18\x02 \x01(\x0e\x32*.underworlds.Invalidation.InvalidationType\x12\r\n\x05world\x18\x03 \x01(\t\x12\x0b\n\x03ids\x18\x04 \x03(\t\"!\n\x06Target\x12\t\n\x05SCENE\x10\x00\x12\x0c\n\x08TIMELINE\x10\x01\"3\n\x10InvalidationType\x12\x07\n\x03NEW\x10\x00\x12\n\n\x06UPDATE\x10\x01\x12\n\n\x06\x44\x45LETE\x10\x02\"@\n\x08Topology\x12\x0e\n\x06worlds\x18\x01 \x03(\t\x12$\n\x07\x63lients\x18\x02 \x03(\x0b\x32\x13.underworlds.Client\"\xc0\x02\n\x04Node\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12(\n\x04type\x18\x03 \x01(\x0e\x32\x1a.underworlds.Node.NodeType\x12\x0e\n\x06parent\x18\x04 \x01(\t\x12\x10\n\x08\x63hildren\x18\x05 \x03(\t\x12\x16\n\x0etransformation\x18\x06 \x03(\x02\x12\x13\n\x0blast_update\x18\x08 \x01(\x01\x12\x35\n\nproperties\x18\t \x03(\x0b\x32!.underworlds.Node.PropertiesEntry\x1a\x31\n\x0fPropertiesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\";\n\x08NodeType\x12\r\n\tUNDEFINED\x10\x00\x12\n\n\x06\x45NTITY\x10\x01\x12\x08\n\x04MESH\x10\x02\x12\n\n\x06\x43\x41MERA\x10\x03\"\x14\n\x05Nodes\x12\x0b\n\x03ids\x18\x01 \x03(\t\"W\n\rNodeInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12\x1f\n\x04node\x18\x02 \x01(\x0b\x32\x11.underworlds.Node\"Y\n\x0eNodesInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12 \n\x05nodes\x18\x02 \x03(\x0b\x32\x11.underworlds.Node\"\xf4\x01\n\tSituation\x12\n\n\x02id\x18\x01 \x01(\t\x12\x32\n\x04type\x18\x02 \x01(\x0e\x32$.underworlds.Situation.SituationType\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x13\n\x0blast_update\x18\x04 \x01(\x01\x12 \n\x05start\x18\x05 \x01(\x0b\x32\x11.underworlds.Time\x12\x1e\n\x03\x65nd\x18\x06 \x01(\x0b\x32\x11.underworlds.Time\";\n\rSituationType\x12\x0b\n\x07GENERIC\x10\x00\x12\n\n\x06MOTION\x10\x01\x12\x11\n\rEVT_MODELLOAD\x10\x02\"\x19\n\nSituations\x12\x0b\n\x03ids\x18\x01 \x03(\t\"f\n\x12SituationInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12)\n\tsituation\x18\x02 \x01(\x0b\x32\x16.underworlds.Situation\"h\n\x13SituationsInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12*\n\nsituations\x18\x02 \x03(\x0b\x32\x16.underworlds.Situation\"\xb7\x01\n\x04Mesh\x12\n\n\x02id\x18\x01 \x01(\t\x12%\n\x08vertices\x18\x02 \x03(\x0b\x32\x13.underworlds.Pointf\x12!\n\x05\x66\x61\x63\x65s\x18\x03 \x03(\x0b\x32\x12.underworlds.Point\x12$\n\x07normals\x18\x04 \x03(\x0b\x32\x13.underworlds.Pointf\x12\x0e\n\x06\x63olors\x18\x05 \x03(\r\x12#\n\x07\x64iffuse\x18\x06 \x01(\x0b\x32\x12.underworlds.Color\"U\n\rMeshInContext\x12#\n\x06\x63lient\x18\x01 \x01(\x0b\x32\x13.underworlds.Client\x12\x1f\n\x04mesh\x18\x02 \x01(\x0b\x32\x11.underworlds.Mesh2\xe2\t\n\x0bUnderworlds\x12\x33\n\x04helo\x12\x14.underworlds.Welcome\x1a\x13.underworlds.Client\"\x00\x12\x33\n\x06\x62yebye\x12\x13.underworlds.Client\x1a\x12.underworlds.Empty\"\x00\x12\x32\n\x06uptime\x12\x13.underworlds.Client\x1a\x11.underworlds.Time\"\x00\x12\x38\n\x08topology\x12\x13.underworlds.Client\x1a\x15.underworlds.Topology\"\x00\x12\x32\n\x05reset\x12\x13.underworlds.Client\x1a\x12.underworlds.Empty\"\x00\x12\x38\n\x0bgetNodesLen\x12\x14.underworlds.Context\x1a\x11.underworlds.Size\"\x00\x12\x39\n\x0bgetNodesIds\x12\x14.underworlds.Context\x1a\x12.underworlds.Nodes\"\x00\x12\x38\n\x0bgetRootNode\x12\x14.underworlds.Context\x1a\x11.underworlds.Node\"\x00\x12:\n\x07getNode\x12\x1a.underworlds.NodeInContext\x1a\x11.underworlds.Node\"\x00\x12@\n\x0bupdateNodes\x12\x1b.underworlds.NodesInContext\x1a\x12.underworlds.Empty\"\x00\x12@\n\x0b\x64\x65leteNodes\x12\x1b.underworlds.NodesInContext\x1a\x12.underworlds.Empty\"\x00\x12=\n\x10getSituationsLen\x12\x14.underworlds.Context\x1a\x11.underworlds.Size\"\x00\x12\x43\n\x10getSituationsIds\x12\x14.underworlds.Context\x1a\x17.underworlds.Situations\"\x00\x12I\n\x0cgetSituation\x12\x1f.underworlds.SituationInContext\x1a\x16.underworlds.Situation\"\x00\x12;\n\x0etimelineOrigin\x12\x14.underworlds.Context\x1a\x11.underworlds.Time\"\x00\x12J\n\x10updateSituations\x12 .underworlds.SituationsInContext\x1a\x12.underworlds.Empty\"\x00\x12J\n\x10\x64\x65leteSituations\x12 .underworlds.SituationsInContext\x1a\x12.underworlds.Empty\"\x00\x12:\n\x07hasMesh\x12\x1a.underworlds.MeshInContext\x1a\x11.underworlds.Bool\"\x00\x12:\n\x07getMesh\x12\x1a.underworlds.MeshInContext\x1a\x11.underworlds.Mesh\"\x00\x12<\n\x08pushMesh\x12\x1a.underworlds.MeshInContext\x1a\x12.underworlds.Empty\"\x00\x32^\n\x17UnderworldsInvalidation\x12\x43\n\x10\x65mitInvalidation\x12\x19.underworlds.Invalidation\x1a\x12.underworlds.Empty\"\x00\x62\x06proto3')
+  serialized_pb=_b('\n\x11underworlds.proto\x12\x0bunderworlds\"\x07\n\x05\x45mpty\"\x15\n\x04\x42ool\x12\r\n\x05value\x18\x01 \x01(\x08\"\x14\n\x04Time\x12\x0c\n\x04time\x18\x01 \x01(\x01\"N\n\x07Welcome\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x12\n\npush_nodes\x18\x04 \x01(\x08\x12\x15\n\rpacked_meshes\x18\x05 \x01(\x08J\x04\x08\x02\x10\x03J\x04\x08\x03\x10\x04\"\x14\n\x04Size\x12\x0c\n\x04size\x18\x01 \x01(\x05\"\x18\n\x05Stats\x12\x0f\n\x07metrics\x18\x01 \x01(\t\")\n\x06Pointf\x12\t\n\x01x\x18\x01 \x01(\x02\x12\t\n\x01y\x18\x02 \x01(\x02\x12\t\n\x01z\x18\x03 \x01(\x02\"(\n\x05Point\x12\t\n\x01x\x18\x01 \x01(\x11\x12\t\n\x01y\x18\x02 \x01(\x11\x12\t\n\x01z\x18\x03 \x01(\x11\"3\n\x05\x43olor\x12\t\n\x01r\x18\x01 \x01(\x02\x12\t\n\x01g\x18\x02 \x01(\x02\x12\t\n\x01\x62\x18\x03 \x01(\x02\x12\t\n\x01\x61\x18\x04 \x01(\x02\"Q\n\x06\x43lient\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12-\n\x05links\x18\x03 \x03(\x0b\x32\x1e.underworlds.ClientInteraction\"\xd0\x01\n\x11\x43lientInteraction\x12\r\n\x05world\x18\x01 \x01(\t\x12<\n\x04type\x18\x02 \x01(\x0e\x32..underworlds.ClientInteraction.InteractionType\x12(\n\rlast_activity\x18\x03 \x01(\x0b\x32\x11.underworlds.Time\"D\n\x0fInteractionType\x12\n\n\x06READER\x10\x00\x12\x0c\n\x08PROVIDER\x10\x01\x12\x0b\n\x07MONITOR\x10\x02\x12\n\n\x06\x46ILTER\x10\x03\"(\n\x07\x43ontext\x12\x0e\n\x06\x63lient\x18\x01 \x01(\t\x12\r\n\x05world\x18\x02 \x01(\t\"\x9c\x02\n\x0cInvalidation\x12\x30\n\x06target\x18\x01 \x01(\x0e\x32 .underworlds.Invalidation.Target\x12\x38\n\x04type\x18\x02 \x01(\x0e\x32*.underworlds.Invalidation.InvalidationType\x12\r\n\x05world\x18\x03 \x01(\t\x12\x0b\n\x03ids\x18\x04 \x03(\t\x12 \n\x05nodes\x18\x05 \x03(\x0b\x32\x11.underworlds.Node\"!\n\x06Target\x12\t\n\x05SCENE\x10\x00\x12\x0c\n\x08TIMELINE\x10\x01\"?\n\x10InvalidationType\x12\x07\n\x03NEW\x10\x00\x12\n\n\x06UPDATE\x10\x01\x12\n\n\x06\x44\x45LETE\x10\x02\x12\n\n\x06RESYNC\x10\x03\"@\n\x08Topology\x12\x0e\n\x06worlds\x18\x01 \x03(\t\x12$\n\x07\x63lients\x18\x02 \x03(\x0b\x32\x13.underworlds.Client\"\xf2\x02\n\x04Node\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12(\n\x04type\x18\x03 \x01(\x0e\x32\x1a.underworlds.Node.NodeType\x12\x0e\n\x06parent\x18\x04 \x01(\t\x12\x10\n\x08\x63hildren\x18\x05 \x03(\t\x12\x16\n\x0etransformation\x18\x06 \x03(\x02\x12\x13\n\x0blast_update\x18\x08 \x01(\x01\x12\x35\n\nproperties\x18\t \x03(\x0b\x32!.underworlds.Node.PropertiesEntry\x12\x1c\n\x14world_transformation\x18\n \x03(\x02\x12\x12\n\nworld_aabb\x18\x0b \x03(\x02\x1a\x31\n\x0fPropertiesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\";\n\x08NodeType\x12\r\n\tUNDEFINED\x10\x00\x12\n\n\x06\x45NTITY\x10\x01\x12\x08\n\x04MESH\x10\x02\x12\n\n\x06\x43\x41MERA\x10\x03\"\x14\n\x05Nodes\x12\x0b\n\x03ids\x18\x01 \x03(\t\"W\n\rNodeInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12\x1f\n\x04node\x18\x02 \x01(\x0b\x32\x11.underworlds.Node\"Y\n\x0eNodesInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12 \n\x05nodes\x18\x02 \x03(\x0b\x32\x11.underworlds.Node\"\xb5\x01\n\nNodeFilter\x12\x0c\n\x04name\x18\x01 \x01(\t\x12)\n\x05types\x18\x02 \x03(\x0e\x32\x1a.underworlds.Node.NodeType\x12;\n\nproperties\x18\x03 \x03(\x0b\x32\'.underworlds.NodeFilter.PropertiesEntry\x1a\x31\n\x0fPropertiesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"e\n\x13NodeFilterInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12\'\n\x06\x66ilter\x18\x02 \x01(\x0b\x32\x17.underworlds.NodeFilter\"y\n\x0c\x42oxInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12 \n\x03min\x18\x02 \x01(\x0b\x32\x13.underworlds.Pointf\x12 \n\x03max\x18\x03 \x01(\x0b\x32\x13.underworlds.Pointf\"m\n\x0fSphereInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12#\n\x06\x63\x65nter\x18\x02 \x01(\x0b\x32\x13.underworlds.Pointf\x12\x0e\n\x06radius\x18\x03 \x01(\x02\"h\n\x10NearestInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12\"\n\x05point\x18\x02 \x01(\x0b\x32\x13.underworlds.Pointf\x12\t\n\x01k\x18\x03 \x01(\r\"\xf4\x01\n\tSituation\x12\n\n\x02id\x18\x01 \x01(\t\x12\x32\n\x04type\x18\x02 \x01(\x0e\x32$.underworlds.Situation.SituationType\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x13\n\x0blast_update\x18\x04 \x01(\x01\x12 \n\x05start\x18\x05 \x01(\x0b\x32\x11.underworlds.Time\x12\x1e\n\x03\x65nd\x18\x06 \x01(\x0b\x32\x11.underworlds.Time\";\n\rSituationType\x12\x0b\n\x07GENERIC\x10\x00\x12\n\n\x06MOTION\x10\x01\x12\x11\n\rEVT_MODELLOAD\x10\x02\"\x19\n\nSituations\x12\x0b\n\x03ids\x18\x01 \x03(\t\"f\n\x12SituationInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12)\n\tsituation\x18\x02 \x01(\x0b\x32\x16.underworlds.Situation\"h\n\x13SituationsInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12*\n\nsituations\x18\x02 \x03(\x0b\x32\x16.underworlds.Situation\"\x9f\x01\n\x08Snapshot\x12\x10\n\x08revision\x18\x01 \x01(\x04\x12\x10\n\x08rootnode\x18\x02 \x01(\t\x12 \n\x05nodes\x18\x03 \x03(\x0b\x32\x11.underworlds.Node\x12!\n\x06origin\x18\x04 \x01(\x0b\x32\x11.underworlds.Time\x12*\n\nsituations\x18\x05 \x03(\x0b\x32\x16.underworlds.Situation\"G\n\rWorldSnapshot\x12\r\n\x05world\x18\x01 \x01(\t\x12\'\n\x08snapshot\x18\x02 \x01(\x0b\x32\x15.underworlds.Snapshot\"L\n\x11RevisionInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12\x10\n\x08revision\x18\x02 \x01(\x04\"F\n\x0eWorldInContext\x12%\n\x07\x63ontext\x18\x01 \x01(\x0b\x32\x14.underworlds.Context\x12\r\n\x05world\x18\x02 \x01(\t\"T\n\tChangeSet\x12\x0f\n\x07new_ids\x18\x01 \x03(\t\x12\x13\n\x0bupdated_ids\x18\x02 \x03(\t\x12\x13\n\x0b\x64\x65leted_ids\x18\x03 \x03(\t\x12\x0c\n\x04size\x18\x04 \x01(\x05\"\x80\x01\n\x07\x43hanges\x12\x10\n\x08revision\x18\x01 \x01(\x04\x12\x10\n\x08outdated\x18\x02 \x01(\x08\x12%\n\x05nodes\x18\x03 \x01(\x0b\x32\x16.underworlds.ChangeSet\x12*\n\nsituations\x18\x04 \x01(\x0b\x32\x16.underworlds.ChangeSet\"\xfe\x01\n\x04Mesh\x12\n\n\x02id\x18\x01 \x01(\t\x12%\n\x08vertices\x18\x02 \x03(\x0b\x32\x13.underworlds.Pointf\x12!\n\x05\x66\x61\x63\x65s\x18\x03 \x03(\x0b\x32\x12.underworlds.Point\x12$\n\x07normals\x18\x04 \x03(\x0b\x32\x13.underworlds.Pointf\x12\x0e\n\x06\x63olors\x18\x05 \x03(\r\x12#\n\x07\x64iffuse\x18\x06 \x01(\x0b\x32\x12.underworlds.Color\x12\x17\n\x0fpacked_vertices\x18\x07 \x01(\x0c\x12\x14\n\x0cpacked_faces\x18\x08 \x01(\x0c\x12\x16\n\x0epacked_normals\x18\t \x01(\x0c\"\xc4\x01\n\rMeshInContext\x12#\n\x06\x63lient\x18\x01 \x01(\x0b\x32\x13.underworlds.Client\x12\x1f\n\x04mesh\x18\x02 \x01(\x0b\x32\x11.underworlds.Mesh\x12\x35\n\x03lod\x18\x03 \x01(\x0e\x32(.underworlds.MeshInContext.LevelOfDetail\"6\n\rLevelOfDetail\x12\x08\n\x04\x46ULL\x10\x00\x12\x08\n\x04HIGH\x10\x01\x12\x07\n\x03LOW\x10\x02\x12\x08\n\x04HULL\x10\x03\"\xec\x01\n\x08MeshInfo\x12\n\n\x02id\x18\x01 \x01(\t\x12\x13\n\x0bnb_vertices\x18\x02 \x01(\r\x12\x10\n\x08nb_faces\x18\x03 \x01(\r\x12%\n\x08\x61\x61\x62\x62_min\x18\x04 \x01(\x0b\x32\x13.underworlds.Pointf\x12%\n\x08\x61\x61\x62\x62_max\x18\x05 \x01(\x0b\x32\x13.underworlds.Pointf\x12*\n\rsphere_center\x18\x06 \x01(\x0b\x32\x13.underworlds.Pointf\x12\x15\n\rsphere_radius\x18\x07 \x01(\x02\x12\x1c\n\x14packed_hull_vertices\x18\x08 \x01(\x0c\"\x9f\x01\n\tMeshChunk\x12#\n\x06\x63lient\x18\x01 \x01(\x0b\x32\x13.underworlds.Client\x12\n\n\x02id\x18\x02 \x01(\t\x12\x0e\n\x06offset\x18\x03 \x01(\x04\x12\x0c\n\x04size\x18\x04 \x01(\x04\x12\x0c\n\x04\x64\x61ta\x18\x05 \x01(\x0c\x12\x35\n\x03lod\x18\x06 \x01(\x0e\x32(.underworlds.MeshInContext.LevelOfDetail2\xfb\x10\n\x0bUnderworlds\x12\x33\n\x04helo\x12\x14.underworlds.Welcome\x1a\x13.underworlds.Client\"\x00\x12\x33\n\x06\x62yebye\x12\x13.underworlds.Client\x1a\x12.underworlds.Empty\"\x00\x12?\n\tsubscribe\x12\x13.underworlds.Client\x1a\x19.underworlds.Invalidation\"\x00\x30\x01\x12\x32\n\x06uptime\x12\x13.underworlds.Client\x1a\x11.underworlds.Time\"\x00\x12\x38\n\x08topology\x12\x13.underworlds.Client\x1a\x15.underworlds.Topology\"\x00\x12\x32\n\x05reset\x12\x13.underworlds.Client\x1a\x12.underworlds.Empty\"\x00\x12\x32\n\x05stats\x12\x13.underworlds.Client\x1a\x12.underworlds.Stats\"\x00\x12\x39\n\x08getScene\x12\x14.underworlds.Context\x1a\x15.underworlds.Snapshot\"\x00\x12I\n\x0fgetChangesSince\x12\x1e.underworlds.RevisionInContext\x1a\x14.underworlds.Changes\"\x00\x12>\n\tforkWorld\x12\x1b.underworlds.WorldInContext\x1a\x12.underworlds.Empty\"\x00\x12\x38\n\x0bgetNodesLen\x12\x14.underworlds.Context\x1a\x11.underworlds.Size\"\x00\x12\x39\n\x0bgetNodesIds\x12\x14.underworlds.Context\x1a\x12.underworlds.Nodes\"\x00\x12\x38\n\x0bgetRootNode\x12\x14.underworlds.Context\x1a\x11.underworlds.Node\"\x00\x12:\n\x07getNode\x12\x1a.underworlds.NodeInContext\x1a\x11.underworlds.Node\"\x00\x12>\n\x08getNodes\x12\x1b.underworlds.NodesInContext\x1a\x11.underworlds.Node\"\x00\x30\x01\x12\x43\n\tfindNodes\x12 .underworlds.NodeFilterInContext\x1a\x12.underworlds.Nodes\"\x00\x12@\n\x0bupdateNodes\x12\x1b.underworlds.NodesInContext\x1a\x12.underworlds.Empty\"\x00\x12@\n\x0b\x64\x65leteNodes\x12\x1b.underworlds.NodesInContext\x1a\x12.underworlds.Empty\"\x00\x12;\n\x08queryBox\x12\x19.underworlds.BoxInContext\x1a\x12.underworlds.Nodes\"\x00\x12\x41\n\x0bquerySphere\x12\x1c.underworlds.SphereInContext\x1a\x12.underworlds.Nodes\"\x00\x12?\n\x08kNearest\x12\x1d.underworlds.NearestInContext\x1a\x12.underworlds.Nodes\"\x00\x12=\n\x10getSituationsLen\x12\x14.underworlds.Context\x1a\x11.underworlds.Size\"\x00\x12\x43\n\x10getSituationsIds\x12\x14.underworlds.Context\x1a\x17.underworlds.Situations\"\x00\x12I\n\x0cgetSituation\x12\x1f.underworlds.SituationInContext\x1a\x16.underworlds.Situation\"\x00\x12;\n\x0etimelineOrigin\x12\x14.underworlds.Context\x1a\x11.underworlds.Time\"\x00\x12J\n\x10updateSituations\x12 .underworlds.SituationsInContext\x1a\x12.underworlds.Empty\"\x00\x12J\n\x10\x64\x65leteSituations\x12 .underworlds.SituationsInContext\x1a\x12.underworlds.Empty\"\x00\x12:\n\x07hasMesh\x12\x1a.underworlds.MeshInContext\x1a\x11.underworlds.Bool\"\x00\x12:\n\x07getMesh\x12\x1a.underworlds.MeshInContext\x1a\x11.underworlds.Mesh\"\x00\x12\x42\n\x0bgetMeshInfo\x12\x1a.underworlds.MeshInContext\x1a\x15.underworlds.MeshInfo\"\x00\x12<\n\x08pushMesh\x12\x1a.underworlds.MeshInContext\x1a\x12.underworlds.Empty\"\x00\x12\x43\n\rgetMeshStream\x12\x16.underworlds.MeshChunk\x1a\x16.underworlds.MeshChunk\"\x00\x30\x01\x12\x44\n\x0epushMeshStream\x12\x16.underworlds.MeshChunk\x1a\x16.underworlds.MeshChunk\"\x00(\x01\x12G\n\x13getPushedMeshOffset\x12\x16.underworlds.MeshChunk\x1a\x16.underworlds.MeshChunk\"\x00\x62\x06proto3')
 )
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
@@ -50,8 +50,8 @@ _CLIENTINTERACTION_INTERACTIONTYPE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   options=None,
-  serialized_start=545,
-  serialized_end=613,
+  serialized_start=578,
+  serialized_end=646,
 )
 _sym_db.RegisterEnumDescriptor(_CLIENTINTERACTION_INTERACTIONTYPE)
 
@@ -72,8 +72,8 @@ _INVALIDATION_TARGET = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   options=None,
-  serialized_start=810,
-  serialized_end=843,
+  serialized_start=877,
+  serialized_end=910,
 )
 _sym_db.RegisterEnumDescriptor(_INVALIDATION_TARGET)
 
@@ -95,11 +95,15 @@ _INVALIDATION_INVALIDATIONTYPE = _descriptor.EnumDescriptor(
       name='DELETE', index=2, number=2,
       options=None,
       type=None),
+    _descriptor.EnumValueDescriptor(
+      name='RESYNC', index=3, number=3,
+      options=None,
+      type=None),
   ],
   containing_type=None,
   options=None,
-  serialized_start=845,
-  serialized_end=896,
+  serialized_start=912,
+  serialized_end=975,
 )
 _sym_db.RegisterEnumDescriptor(_INVALIDATION_INVALIDATIONTYPE)
 
@@ -128,8 +132,8 @@ _NODE_NODETYPE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   options=None,
-  serialized_start=1226,
-  serialized_end=1285,
+  serialized_start=1355,
+  serialized_end=1414,
 )
 _sym_db.RegisterEnumDescriptor(_NODE_NODETYPE)
 
@@ -154,11 +158,41 @@ _SITUATION_SITUATIONTYPE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   options=None,
-  serialized_start=1675,
-  serialized_end=1734,
+  serialized_start=2431,
+  serialized_end=2490,
 )
 _sym_db.RegisterEnumDescriptor(_SITUATION_SITUATIONTYPE)
 
+_MESHINCONTEXT_LEVELOFDETAIL = _descriptor.EnumDescriptor(
+  name='LevelOfDetail',
+  full_name='underworlds.MeshInContext.LevelOfDetail',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='FULL', index=0, number=0,
+      options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='HIGH', index=1, number=1,
+      options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='LOW', index=2, number=2,
+      options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='HULL', index=3, number=3,
+      options=None,
+      type=None),
+  ],
+  containing_type=None,
+  options=None,
+  serialized_start=3731,
+  serialized_end=3785,
+)
+_sym_db.RegisterEnumDescriptor(_MESHINCONTEXT_LEVELOFDETAIL)
+
 
 _EMPTY = _descriptor.Descriptor(
   name='Empty',
@@ -261,16 +295,16 @@ _WELCOME = _descriptor.Descriptor(
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='host', full_name='underworlds.Welcome.host', index=1,
-      number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
+      name='push_nodes', full_name='underworlds.Welcome.push_nodes', index=1,
+      number=4, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='invalidation_server_port', full_name='underworlds.Welcome.invalidation_server_port', index=2,
-      number=3, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
+      name='packed_meshes', full_name='underworlds.Welcome.packed_meshes', index=2,
+      number=5, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
@@ -287,7 +321,7 @@ _WELCOME = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=88,
-  serialized_end=159,
+  serialized_end=166,
 )
 
 
@@ -317,8 +351,39 @@ _SIZE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=161,
-  serialized_end=181,
+  serialized_start=168,
+  serialized_end=188,
+)
+
+
+_STATS = _descriptor.Descriptor(
+  name='Stats',
+  full_name='underworlds.Stats',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='metrics', full_name='underworlds.Stats.metrics', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=190,
+  serialized_end=214,
 )
 
 
@@ -362,8 +427,8 @@ _POINTF = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=183,
-  serialized_end=224,
+  serialized_start=216,
+  serialized_end=257,
 )
 
 
@@ -407,8 +472,8 @@ _POINT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=226,
-  serialized_end=266,
+  serialized_start=259,
+  serialized_end=299,
 )
 
 
@@ -459,8 +524,8 @@ _COLOR = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=268,
-  serialized_end=319,
+  serialized_start=301,
+  serialized_end=352,
 )
 
 
@@ -504,8 +569,8 @@ _CLIENT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=321,
-  serialized_end=402,
+  serialized_start=354,
+  serialized_end=435,
 )
 
 
@@ -550,8 +615,8 @@ _CLIENTINTERACTION = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=405,
-  serialized_end=613,
+  serialized_start=438,
+  serialized_end=646,
 )
 
 
@@ -588,8 +653,8 @@ _CONTEXT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=615,
-  serialized_end=655,
+  serialized_start=648,
+  serialized_end=688,
 )
 
 
@@ -628,6 +693,13 @@ _INVALIDATION = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='nodes', full_name='underworlds.Invalidation.nodes', index=4,
+      number=5, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
@@ -642,8 +714,8 @@ _INVALIDATION = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=658,
-  serialized_end=896,
+  serialized_start=691,
+  serialized_end=975,
 )
 
 
@@ -680,8 +752,8 @@ _TOPOLOGY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=898,
-  serialized_end=962,
+  serialized_start=977,
+  serialized_end=1041,
 )
 
 
@@ -718,8 +790,8 @@ _NODE_PROPERTIESENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1175,
-  serialized_end=1224,
+  serialized_start=1304,
+  serialized_end=1353,
 )
 
 _NODE = _descriptor.Descriptor(
@@ -785,6 +857,20 @@ _NODE = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='world_transformation', full_name='underworlds.Node.world_transformation', index=8,
+      number=10, type=2, cpp_type=6, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='world_aabb', full_name='underworlds.Node.world_aabb', index=9,
+      number=11, type=2, cpp_type=6, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
@@ -798,8 +884,8 @@ _NODE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=965,
-  serialized_end=1285,
+  serialized_start=1044,
+  serialized_end=1414,
 )
 
 
@@ -829,8 +915,8 @@ _NODES = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1287,
-  serialized_end=1307,
+  serialized_start=1416,
+  serialized_end=1436,
 )
 
 
@@ -867,8 +953,8 @@ _NODEINCONTEXT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1309,
-  serialized_end=1396,
+  serialized_start=1438,
+  serialized_end=1525,
 )
 
 
@@ -905,56 +991,110 @@ _NODESINCONTEXT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1398,
-  serialized_end=1487,
+  serialized_start=1527,
+  serialized_end=1616,
 )
 
 
-_SITUATION = _descriptor.Descriptor(
-  name='Situation',
-  full_name='underworlds.Situation',
+_NODEFILTER_PROPERTIESENTRY = _descriptor.Descriptor(
+  name='PropertiesEntry',
+  full_name='underworlds.NodeFilter.PropertiesEntry',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='id', full_name='underworlds.Situation.id', index=0,
+      name='key', full_name='underworlds.NodeFilter.PropertiesEntry.key', index=0,
       number=1, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='type', full_name='underworlds.Situation.type', index=1,
-      number=2, type=14, cpp_type=8, label=1,
-      has_default_value=False, default_value=0,
+      name='value', full_name='underworlds.NodeFilter.PropertiesEntry.value', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=_descriptor._ParseOptions(descriptor_pb2.MessageOptions(), _b('8\001')),
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1751,
+  serialized_end=1800,
+)
+
+_NODEFILTER = _descriptor.Descriptor(
+  name='NodeFilter',
+  full_name='underworlds.NodeFilter',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
     _descriptor.FieldDescriptor(
-      name='description', full_name='underworlds.Situation.description', index=2,
-      number=3, type=9, cpp_type=9, label=1,
+      name='name', full_name='underworlds.NodeFilter.name', index=0,
+      number=1, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='last_update', full_name='underworlds.Situation.last_update', index=3,
-      number=4, type=1, cpp_type=5, label=1,
-      has_default_value=False, default_value=float(0),
+      name='types', full_name='underworlds.NodeFilter.types', index=1,
+      number=2, type=14, cpp_type=8, label=3,
+      has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='start', full_name='underworlds.Situation.start', index=4,
-      number=5, type=11, cpp_type=10, label=1,
+      name='properties', full_name='underworlds.NodeFilter.properties', index=2,
+      number=3, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[_NODEFILTER_PROPERTIESENTRY, ],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1619,
+  serialized_end=1800,
+)
+
+
+_NODEFILTERINCONTEXT = _descriptor.Descriptor(
+  name='NodeFilterInContext',
+  full_name='underworlds.NodeFilterInContext',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='context', full_name='underworlds.NodeFilterInContext.context', index=0,
+      number=1, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='end', full_name='underworlds.Situation.end', index=5,
-      number=6, type=11, cpp_type=10, label=1,
+      name='filter', full_name='underworlds.NodeFilterInContext.filter', index=1,
+      number=2, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
@@ -964,7 +1104,6 @@ _SITUATION = _descriptor.Descriptor(
   ],
   nested_types=[],
   enum_types=[
-    _SITUATION_SITUATIONTYPE,
   ],
   options=None,
   is_extendable=False,
@@ -972,22 +1111,36 @@ _SITUATION = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1490,
-  serialized_end=1734,
+  serialized_start=1802,
+  serialized_end=1903,
 )
 
 
-_SITUATIONS = _descriptor.Descriptor(
-  name='Situations',
-  full_name='underworlds.Situations',
+_BOXINCONTEXT = _descriptor.Descriptor(
+  name='BoxInContext',
+  full_name='underworlds.BoxInContext',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='ids', full_name='underworlds.Situations.ids', index=0,
-      number=1, type=9, cpp_type=9, label=3,
-      has_default_value=False, default_value=[],
+      name='context', full_name='underworlds.BoxInContext.context', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='min', full_name='underworlds.BoxInContext.min', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='max', full_name='underworlds.BoxInContext.max', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
@@ -1003,32 +1156,39 @@ _SITUATIONS = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1736,
-  serialized_end=1761,
+  serialized_start=1905,
+  serialized_end=2026,
 )
 
 
-_SITUATIONINCONTEXT = _descriptor.Descriptor(
-  name='SituationInContext',
-  full_name='underworlds.SituationInContext',
+_SPHEREINCONTEXT = _descriptor.Descriptor(
+  name='SphereInContext',
+  full_name='underworlds.SphereInContext',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='context', full_name='underworlds.SituationInContext.context', index=0,
+      name='context', full_name='underworlds.SphereInContext.context', index=0,
       number=1, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='situation', full_name='underworlds.SituationInContext.situation', index=1,
+      name='center', full_name='underworlds.SphereInContext.center', index=1,
       number=2, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='radius', full_name='underworlds.SphereInContext.radius', index=2,
+      number=3, type=2, cpp_type=6, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
@@ -1041,29 +1201,36 @@ _SITUATIONINCONTEXT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1763,
-  serialized_end=1865,
+  serialized_start=2028,
+  serialized_end=2137,
 )
 
 
-_SITUATIONSINCONTEXT = _descriptor.Descriptor(
-  name='SituationsInContext',
-  full_name='underworlds.SituationsInContext',
+_NEARESTINCONTEXT = _descriptor.Descriptor(
+  name='NearestInContext',
+  full_name='underworlds.NearestInContext',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='context', full_name='underworlds.SituationsInContext.context', index=0,
+      name='context', full_name='underworlds.NearestInContext.context', index=0,
       number=1, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='situations', full_name='underworlds.SituationsInContext.situations', index=1,
-      number=2, type=11, cpp_type=10, label=3,
-      has_default_value=False, default_value=[],
+      name='point', full_name='underworlds.NearestInContext.point', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='k', full_name='underworlds.NearestInContext.k', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
@@ -1079,55 +1246,55 @@ _SITUATIONSINCONTEXT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1867,
-  serialized_end=1971,
+  serialized_start=2139,
+  serialized_end=2243,
 )
 
 
-_MESH = _descriptor.Descriptor(
-  name='Mesh',
-  full_name='underworlds.Mesh',
+_SITUATION = _descriptor.Descriptor(
+  name='Situation',
+  full_name='underworlds.Situation',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='id', full_name='underworlds.Mesh.id', index=0,
+      name='id', full_name='underworlds.Situation.id', index=0,
       number=1, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='vertices', full_name='underworlds.Mesh.vertices', index=1,
-      number=2, type=11, cpp_type=10, label=3,
-      has_default_value=False, default_value=[],
+      name='type', full_name='underworlds.Situation.type', index=1,
+      number=2, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='faces', full_name='underworlds.Mesh.faces', index=2,
-      number=3, type=11, cpp_type=10, label=3,
-      has_default_value=False, default_value=[],
+      name='description', full_name='underworlds.Situation.description', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='normals', full_name='underworlds.Mesh.normals', index=3,
-      number=4, type=11, cpp_type=10, label=3,
-      has_default_value=False, default_value=[],
+      name='last_update', full_name='underworlds.Situation.last_update', index=3,
+      number=4, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='colors', full_name='underworlds.Mesh.colors', index=4,
-      number=5, type=13, cpp_type=3, label=3,
-      has_default_value=False, default_value=[],
+      name='start', full_name='underworlds.Situation.start', index=4,
+      number=5, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='diffuse', full_name='underworlds.Mesh.diffuse', index=5,
+      name='end', full_name='underworlds.Situation.end', index=5,
       number=6, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
@@ -1138,6 +1305,7 @@ _MESH = _descriptor.Descriptor(
   ],
   nested_types=[],
   enum_types=[
+    _SITUATION_SITUATIONTYPE,
   ],
   options=None,
   is_extendable=False,
@@ -1145,27 +1313,58 @@ _MESH = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1974,
-  serialized_end=2157,
+  serialized_start=2246,
+  serialized_end=2490,
 )
 
 
-_MESHINCONTEXT = _descriptor.Descriptor(
-  name='MeshInContext',
-  full_name='underworlds.MeshInContext',
+_SITUATIONS = _descriptor.Descriptor(
+  name='Situations',
+  full_name='underworlds.Situations',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='client', full_name='underworlds.MeshInContext.client', index=0,
+      name='ids', full_name='underworlds.Situations.ids', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=2492,
+  serialized_end=2517,
+)
+
+
+_SITUATIONINCONTEXT = _descriptor.Descriptor(
+  name='SituationInContext',
+  full_name='underworlds.SituationInContext',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='context', full_name='underworlds.SituationInContext.context', index=0,
       number=1, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
     _descriptor.FieldDescriptor(
-      name='mesh', full_name='underworlds.MeshInContext.mesh', index=1,
+      name='situation', full_name='underworlds.SituationInContext.situation', index=1,
       number=2, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
@@ -1183,16 +1382,611 @@ _MESHINCONTEXT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2159,
-  serialized_end=2244,
+  serialized_start=2519,
+  serialized_end=2621,
 )
 
-_CLIENT.fields_by_name['links'].message_type = _CLIENTINTERACTION
-_CLIENTINTERACTION.fields_by_name['type'].enum_type = _CLIENTINTERACTION_INTERACTIONTYPE
-_CLIENTINTERACTION.fields_by_name['last_activity'].message_type = _TIME
+
+_SITUATIONSINCONTEXT = _descriptor.Descriptor(
+  name='SituationsInContext',
+  full_name='underworlds.SituationsInContext',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='context', full_name='underworlds.SituationsInContext.context', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='situations', full_name='underworlds.SituationsInContext.situations', index=1,
+      number=2, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=2623,
+  serialized_end=2727,
+)
+
+
+_SNAPSHOT = _descriptor.Descriptor(
+  name='Snapshot',
+  full_name='underworlds.Snapshot',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='revision', full_name='underworlds.Snapshot.revision', index=0,
+      number=1, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='rootnode', full_name='underworlds.Snapshot.rootnode', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='nodes', full_name='underworlds.Snapshot.nodes', index=2,
+      number=3, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='origin', full_name='underworlds.Snapshot.origin', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='situations', full_name='underworlds.Snapshot.situations', index=4,
+      number=5, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=2730,
+  serialized_end=2889,
+)
+
+
+_WORLDSNAPSHOT = _descriptor.Descriptor(
+  name='WorldSnapshot',
+  full_name='underworlds.WorldSnapshot',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='world', full_name='underworlds.WorldSnapshot.world', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='snapshot', full_name='underworlds.WorldSnapshot.snapshot', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=2891,
+  serialized_end=2962,
+)
+
+
+_REVISIONINCONTEXT = _descriptor.Descriptor(
+  name='RevisionInContext',
+  full_name='underworlds.RevisionInContext',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='context', full_name='underworlds.RevisionInContext.context', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='revision', full_name='underworlds.RevisionInContext.revision', index=1,
+      number=2, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=2964,
+  serialized_end=3040,
+)
+
+
+_WORLDINCONTEXT = _descriptor.Descriptor(
+  name='WorldInContext',
+  full_name='underworlds.WorldInContext',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='context', full_name='underworlds.WorldInContext.context', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='world', full_name='underworlds.WorldInContext.world', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=3042,
+  serialized_end=3112,
+)
+
+
+_CHANGESET = _descriptor.Descriptor(
+  name='ChangeSet',
+  full_name='underworlds.ChangeSet',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='new_ids', full_name='underworlds.ChangeSet.new_ids', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='updated_ids', full_name='underworlds.ChangeSet.updated_ids', index=1,
+      number=2, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='deleted_ids', full_name='underworlds.ChangeSet.deleted_ids', index=2,
+      number=3, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='size', full_name='underworlds.ChangeSet.size', index=3,
+      number=4, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=3114,
+  serialized_end=3198,
+)
+
+
+_CHANGES = _descriptor.Descriptor(
+  name='Changes',
+  full_name='underworlds.Changes',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='revision', full_name='underworlds.Changes.revision', index=0,
+      number=1, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='outdated', full_name='underworlds.Changes.outdated', index=1,
+      number=2, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='nodes', full_name='underworlds.Changes.nodes', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='situations', full_name='underworlds.Changes.situations', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=3201,
+  serialized_end=3329,
+)
+
+
+_MESH = _descriptor.Descriptor(
+  name='Mesh',
+  full_name='underworlds.Mesh',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='id', full_name='underworlds.Mesh.id', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='vertices', full_name='underworlds.Mesh.vertices', index=1,
+      number=2, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='faces', full_name='underworlds.Mesh.faces', index=2,
+      number=3, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='normals', full_name='underworlds.Mesh.normals', index=3,
+      number=4, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='colors', full_name='underworlds.Mesh.colors', index=4,
+      number=5, type=13, cpp_type=3, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='diffuse', full_name='underworlds.Mesh.diffuse', index=5,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='packed_vertices', full_name='underworlds.Mesh.packed_vertices', index=6,
+      number=7, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='packed_faces', full_name='underworlds.Mesh.packed_faces', index=7,
+      number=8, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='packed_normals', full_name='underworlds.Mesh.packed_normals', index=8,
+      number=9, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=3332,
+  serialized_end=3586,
+)
+
+
+_MESHINCONTEXT = _descriptor.Descriptor(
+  name='MeshInContext',
+  full_name='underworlds.MeshInContext',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='client', full_name='underworlds.MeshInContext.client', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='mesh', full_name='underworlds.MeshInContext.mesh', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='lod', full_name='underworlds.MeshInContext.lod', index=2,
+      number=3, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+    _MESHINCONTEXT_LEVELOFDETAIL,
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=3589,
+  serialized_end=3785,
+)
+
+
+_MESHINFO = _descriptor.Descriptor(
+  name='MeshInfo',
+  full_name='underworlds.MeshInfo',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='id', full_name='underworlds.MeshInfo.id', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='nb_vertices', full_name='underworlds.MeshInfo.nb_vertices', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='nb_faces', full_name='underworlds.MeshInfo.nb_faces', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='aabb_min', full_name='underworlds.MeshInfo.aabb_min', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='aabb_max', full_name='underworlds.MeshInfo.aabb_max', index=4,
+      number=5, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='sphere_center', full_name='underworlds.MeshInfo.sphere_center', index=5,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='sphere_radius', full_name='underworlds.MeshInfo.sphere_radius', index=6,
+      number=7, type=2, cpp_type=6, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='packed_hull_vertices', full_name='underworlds.MeshInfo.packed_hull_vertices', index=7,
+      number=8, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=3788,
+  serialized_end=4024,
+)
+
+
+_MESHCHUNK = _descriptor.Descriptor(
+  name='MeshChunk',
+  full_name='underworlds.MeshChunk',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='client', full_name='underworlds.MeshChunk.client', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='id', full_name='underworlds.MeshChunk.id', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='offset', full_name='underworlds.MeshChunk.offset', index=2,
+      number=3, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='size', full_name='underworlds.MeshChunk.size', index=3,
+      number=4, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='data', full_name='underworlds.MeshChunk.data', index=4,
+      number=5, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='lod', full_name='underworlds.MeshChunk.lod', index=5,
+      number=6, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=4027,
+  serialized_end=4186,
+)
+
+_CLIENT.fields_by_name['links'].message_type = _CLIENTINTERACTION
+_CLIENTINTERACTION.fields_by_name['type'].enum_type = _CLIENTINTERACTION_INTERACTIONTYPE
+_CLIENTINTERACTION.fields_by_name['last_activity'].message_type = _TIME
 _CLIENTINTERACTION_INTERACTIONTYPE.containing_type = _CLIENTINTERACTION
 _INVALIDATION.fields_by_name['target'].enum_type = _INVALIDATION_TARGET
 _INVALIDATION.fields_by_name['type'].enum_type = _INVALIDATION_INVALIDATIONTYPE
+_INVALIDATION.fields_by_name['nodes'].message_type = _NODE
 _INVALIDATION_TARGET.containing_type = _INVALIDATION
 _INVALIDATION_INVALIDATIONTYPE.containing_type = _INVALIDATION
 _TOPOLOGY.fields_by_name['clients'].message_type = _CLIENT
@@ -1204,6 +1998,18 @@ _NODEINCONTEXT.fields_by_name['context'].message_type = _CONTEXT
 _NODEINCONTEXT.fields_by_name['node'].message_type = _NODE
 _NODESINCONTEXT.fields_by_name['context'].message_type = _CONTEXT
 _NODESINCONTEXT.fields_by_name['nodes'].message_type = _NODE
+_NODEFILTER_PROPERTIESENTRY.containing_type = _NODEFILTER
+_NODEFILTER.fields_by_name['types'].enum_type = _NODE_NODETYPE
+_NODEFILTER.fields_by_name['properties'].message_type = _NODEFILTER_PROPERTIESENTRY
+_NODEFILTERINCONTEXT.fields_by_name['context'].message_type = _CONTEXT
+_NODEFILTERINCONTEXT.fields_by_name['filter'].message_type = _NODEFILTER
+_BOXINCONTEXT.fields_by_name['context'].message_type = _CONTEXT
+_BOXINCONTEXT.fields_by_name['min'].message_type = _POINTF
+_BOXINCONTEXT.fields_by_name['max'].message_type = _POINTF
+_SPHEREINCONTEXT.fields_by_name['context'].message_type = _CONTEXT
+_SPHEREINCONTEXT.fields_by_name['center'].message_type = _POINTF
+_NEARESTINCONTEXT.fields_by_name['context'].message_type = _CONTEXT
+_NEARESTINCONTEXT.fields_by_name['point'].message_type = _POINTF
 _SITUATION.fields_by_name['type'].enum_type = _SITUATION_SITUATIONTYPE
 _SITUATION.fields_by_name['start'].message_type = _TIME
 _SITUATION.fields_by_name['end'].message_type = _TIME
@@ -1212,17 +2018,33 @@ _SITUATIONINCONTEXT.fields_by_name['context'].message_type = _CONTEXT
 _SITUATIONINCONTEXT.fields_by_name['situation'].message_type = _SITUATION
 _SITUATIONSINCONTEXT.fields_by_name['context'].message_type = _CONTEXT
 _SITUATIONSINCONTEXT.fields_by_name['situations'].message_type = _SITUATION
+_SNAPSHOT.fields_by_name['nodes'].message_type = _NODE
+_SNAPSHOT.fields_by_name['origin'].message_type = _TIME
+_SNAPSHOT.fields_by_name['situations'].message_type = _SITUATION
+_WORLDSNAPSHOT.fields_by_name['snapshot'].message_type = _SNAPSHOT
+_REVISIONINCONTEXT.fields_by_name['context'].message_type = _CONTEXT
+_WORLDINCONTEXT.fields_by_name['context'].message_type = _CONTEXT
+_CHANGES.fields_by_name['nodes'].message_type = _CHANGESET
+_CHANGES.fields_by_name['situations'].message_type = _CHANGESET
 _MESH.fields_by_name['vertices'].message_type = _POINTF
 _MESH.fields_by_name['faces'].message_type = _POINT
 _MESH.fields_by_name['normals'].message_type = _POINTF
 _MESH.fields_by_name['diffuse'].message_type = _COLOR
 _MESHINCONTEXT.fields_by_name['client'].message_type = _CLIENT
 _MESHINCONTEXT.fields_by_name['mesh'].message_type = _MESH
+_MESHINCONTEXT.fields_by_name['lod'].enum_type = _MESHINCONTEXT_LEVELOFDETAIL
+_MESHINCONTEXT_LEVELOFDETAIL.containing_type = _MESHINCONTEXT
+_MESHINFO.fields_by_name['aabb_min'].message_type = _POINTF
+_MESHINFO.fields_by_name['aabb_max'].message_type = _POINTF
+_MESHINFO.fields_by_name['sphere_center'].message_type = _POINTF
+_MESHCHUNK.fields_by_name['client'].message_type = _CLIENT
+_MESHCHUNK.fields_by_name['lod'].enum_type = _MESHINCONTEXT_LEVELOFDETAIL
 DESCRIPTOR.message_types_by_name['Empty'] = _EMPTY
 DESCRIPTOR.message_types_by_name['Bool'] = _BOOL
 DESCRIPTOR.message_types_by_name['Time'] = _TIME
 DESCRIPTOR.message_types_by_name['Welcome'] = _WELCOME
 DESCRIPTOR.message_types_by_name['Size'] = _SIZE
+DESCRIPTOR.message_types_by_name['Stats'] = _STATS
 DESCRIPTOR.message_types_by_name['Pointf'] = _POINTF
 DESCRIPTOR.message_types_by_name['Point'] = _POINT
 DESCRIPTOR.message_types_by_name['Color'] = _COLOR
@@ -1235,12 +2057,25 @@ DESCRIPTOR.message_types_by_name['Node'] = _NODE
 DESCRIPTOR.message_types_by_name['Nodes'] = _NODES
 DESCRIPTOR.message_types_by_name['NodeInContext'] = _NODEINCONTEXT
 DESCRIPTOR.message_types_by_name['NodesInContext'] = _NODESINCONTEXT
+DESCRIPTOR.message_types_by_name['NodeFilter'] = _NODEFILTER
+DESCRIPTOR.message_types_by_name['NodeFilterInContext'] = _NODEFILTERINCONTEXT
+DESCRIPTOR.message_types_by_name['BoxInContext'] = _BOXINCONTEXT
+DESCRIPTOR.message_types_by_name['SphereInContext'] = _SPHEREINCONTEXT
+DESCRIPTOR.message_types_by_name['NearestInContext'] = _NEARESTINCONTEXT
 DESCRIPTOR.message_types_by_name['Situation'] = _SITUATION
 DESCRIPTOR.message_types_by_name['Situations'] = _SITUATIONS
 DESCRIPTOR.message_types_by_name['SituationInContext'] = _SITUATIONINCONTEXT
 DESCRIPTOR.message_types_by_name['SituationsInContext'] = _SITUATIONSINCONTEXT
+DESCRIPTOR.message_types_by_name['Snapshot'] = _SNAPSHOT
+DESCRIPTOR.message_types_by_name['WorldSnapshot'] = _WORLDSNAPSHOT
+DESCRIPTOR.message_types_by_name['RevisionInContext'] = _REVISIONINCONTEXT
+DESCRIPTOR.message_types_by_name['WorldInContext'] = _WORLDINCONTEXT
+DESCRIPTOR.message_types_by_name['ChangeSet'] = _CHANGESET
+DESCRIPTOR.message_types_by_name['Changes'] = _CHANGES
 DESCRIPTOR.message_types_by_name['Mesh'] = _MESH
 DESCRIPTOR.message_types_by_name['MeshInContext'] = _MESHINCONTEXT
+DESCRIPTOR.message_types_by_name['MeshInfo'] = _MESHINFO
+DESCRIPTOR.message_types_by_name['MeshChunk'] = _MESHCHUNK
 
 Empty = _reflection.GeneratedProtocolMessageType('Empty', (_message.Message,), dict(
   DESCRIPTOR = _EMPTY,
@@ -1277,6 +2112,13 @@ Size = _reflection.GeneratedProtocolMessageType('Size', (_message.Message,), dic
   ))
 _sym_db.RegisterMessage(Size)
 
+Stats = _reflection.GeneratedProtocolMessageType('Stats', (_message.Message,), dict(
+  DESCRIPTOR = _STATS,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.Stats)
+  ))
+_sym_db.RegisterMessage(Stats)
+
 Pointf = _reflection.GeneratedProtocolMessageType('Pointf', (_message.Message,), dict(
   DESCRIPTOR = _POINTF,
   __module__ = 'underworlds_pb2'
@@ -1369,33 +2211,118 @@ NodesInContext = _reflection.GeneratedProtocolMessageType('NodesInContext', (_me
   ))
 _sym_db.RegisterMessage(NodesInContext)
 
+NodeFilter = _reflection.GeneratedProtocolMessageType('NodeFilter', (_message.Message,), dict(
+
+  PropertiesEntry = _reflection.GeneratedProtocolMessageType('PropertiesEntry', (_message.Message,), dict(
+    DESCRIPTOR = _NODEFILTER_PROPERTIESENTRY,
+    __module__ = 'underworlds_pb2'
+    # @@protoc_insertion_point(class_scope:underworlds.NodeFilter.PropertiesEntry)
+    ))
+  ,
+  DESCRIPTOR = _NODEFILTER,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.NodeFilter)
+  ))
+_sym_db.RegisterMessage(NodeFilter)
+_sym_db.RegisterMessage(NodeFilter.PropertiesEntry)
+
+NodeFilterInContext = _reflection.GeneratedProtocolMessageType('NodeFilterInContext', (_message.Message,), dict(
+  DESCRIPTOR = _NODEFILTERINCONTEXT,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.NodeFilterInContext)
+  ))
+_sym_db.RegisterMessage(NodeFilterInContext)
+
+BoxInContext = _reflection.GeneratedProtocolMessageType('BoxInContext', (_message.Message,), dict(
+  DESCRIPTOR = _BOXINCONTEXT,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.BoxInContext)
+  ))
+_sym_db.RegisterMessage(BoxInContext)
+
+SphereInContext = _reflection.GeneratedProtocolMessageType('SphereInContext', (_message.Message,), dict(
+  DESCRIPTOR = _SPHEREINCONTEXT,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.SphereInContext)
+  ))
+_sym_db.RegisterMessage(SphereInContext)
+
+NearestInContext = _reflection.GeneratedProtocolMessageType('NearestInContext', (_message.Message,), dict(
+  DESCRIPTOR = _NEARESTINCONTEXT,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.NearestInContext)
+  ))
+_sym_db.RegisterMessage(NearestInContext)
+
 Situation = _reflection.GeneratedProtocolMessageType('Situation', (_message.Message,), dict(
   DESCRIPTOR = _SITUATION,
   __module__ = 'underworlds_pb2'
-  # @@protoc_insertion_point(class_scope:underworlds.Situation)
+  # @@protoc_insertion_point(class_scope:underworlds.Situation)
+  ))
+_sym_db.RegisterMessage(Situation)
+
+Situations = _reflection.GeneratedProtocolMessageType('Situations', (_message.Message,), dict(
+  DESCRIPTOR = _SITUATIONS,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.Situations)
+  ))
+_sym_db.RegisterMessage(Situations)
+
+SituationInContext = _reflection.GeneratedProtocolMessageType('SituationInContext', (_message.Message,), dict(
+  DESCRIPTOR = _SITUATIONINCONTEXT,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.SituationInContext)
+  ))
+_sym_db.RegisterMessage(SituationInContext)
+
+SituationsInContext = _reflection.GeneratedProtocolMessageType('SituationsInContext', (_message.Message,), dict(
+  DESCRIPTOR = _SITUATIONSINCONTEXT,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.SituationsInContext)
+  ))
+_sym_db.RegisterMessage(SituationsInContext)
+
+Snapshot = _reflection.GeneratedProtocolMessageType('Snapshot', (_message.Message,), dict(
+  DESCRIPTOR = _SNAPSHOT,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.Snapshot)
+  ))
+_sym_db.RegisterMessage(Snapshot)
+
+WorldSnapshot = _reflection.GeneratedProtocolMessageType('WorldSnapshot', (_message.Message,), dict(
+  DESCRIPTOR = _WORLDSNAPSHOT,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.WorldSnapshot)
+  ))
+_sym_db.RegisterMessage(WorldSnapshot)
+
+RevisionInContext = _reflection.GeneratedProtocolMessageType('RevisionInContext', (_message.Message,), dict(
+  DESCRIPTOR = _REVISIONINCONTEXT,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.RevisionInContext)
   ))
-_sym_db.RegisterMessage(Situation)
+_sym_db.RegisterMessage(RevisionInContext)
 
-Situations = _reflection.GeneratedProtocolMessageType('Situations', (_message.Message,), dict(
-  DESCRIPTOR = _SITUATIONS,
+WorldInContext = _reflection.GeneratedProtocolMessageType('WorldInContext', (_message.Message,), dict(
+  DESCRIPTOR = _WORLDINCONTEXT,
   __module__ = 'underworlds_pb2'
-  # @@protoc_insertion_point(class_scope:underworlds.Situations)
+  # @@protoc_insertion_point(class_scope:underworlds.WorldInContext)
   ))
-_sym_db.RegisterMessage(Situations)
+_sym_db.RegisterMessage(WorldInContext)
 
-SituationInContext = _reflection.GeneratedProtocolMessageType('SituationInContext', (_message.Message,), dict(
-  DESCRIPTOR = _SITUATIONINCONTEXT,
+ChangeSet = _reflection.GeneratedProtocolMessageType('ChangeSet', (_message.Message,), dict(
+  DESCRIPTOR = _CHANGESET,
   __module__ = 'underworlds_pb2'
-  # @@protoc_insertion_point(class_scope:underworlds.SituationInContext)
+  # @@protoc_insertion_point(class_scope:underworlds.ChangeSet)
   ))
-_sym_db.RegisterMessage(SituationInContext)
+_sym_db.RegisterMessage(ChangeSet)
 
-SituationsInContext = _reflection.GeneratedProtocolMessageType('SituationsInContext', (_message.Message,), dict(
-  DESCRIPTOR = _SITUATIONSINCONTEXT,
+Changes = _reflection.GeneratedProtocolMessageType('Changes', (_message.Message,), dict(
+  DESCRIPTOR = _CHANGES,
   __module__ = 'underworlds_pb2'
-  # @@protoc_insertion_point(class_scope:underworlds.SituationsInContext)
+  # @@protoc_insertion_point(class_scope:underworlds.Changes)
   ))
-_sym_db.RegisterMessage(SituationsInContext)
+_sym_db.RegisterMessage(Changes)
 
 Mesh = _reflection.GeneratedProtocolMessageType('Mesh', (_message.Message,), dict(
   DESCRIPTOR = _MESH,
@@ -1411,9 +2338,25 @@ MeshInContext = _reflection.GeneratedProtocolMessageType('MeshInContext', (_mess
   ))
 _sym_db.RegisterMessage(MeshInContext)
 
+MeshInfo = _reflection.GeneratedProtocolMessageType('MeshInfo', (_message.Message,), dict(
+  DESCRIPTOR = _MESHINFO,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.MeshInfo)
+  ))
+_sym_db.RegisterMessage(MeshInfo)
+
+MeshChunk = _reflection.GeneratedProtocolMessageType('MeshChunk', (_message.Message,), dict(
+  DESCRIPTOR = _MESHCHUNK,
+  __module__ = 'underworlds_pb2'
+  # @@protoc_insertion_point(class_scope:underworlds.MeshChunk)
+  ))
+_sym_db.RegisterMessage(MeshChunk)
+
 
 _NODE_PROPERTIESENTRY.has_options = True
 _NODE_PROPERTIESENTRY._options = _descriptor._ParseOptions(descriptor_pb2.MessageOptions(), _b('8\001'))
+_NODEFILTER_PROPERTIESENTRY.has_options = True
+_NODEFILTER_PROPERTIESENTRY._options = _descriptor._ParseOptions(descriptor_pb2.MessageOptions(), _b('8\001'))
 import grpc
 from grpc.beta import implementations as beta_implementations
 from grpc.beta import interfaces as beta_interfaces
@@ -1439,6 +2382,11 @@ class UnderworldsStub(object):
         request_serializer=Client.SerializeToString,
         response_deserializer=Empty.FromString,
         )
+    self.subscribe = channel.unary_stream(
+        '/underworlds.Underworlds/subscribe',
+        request_serializer=Client.SerializeToString,
+        response_deserializer=Invalidation.FromString,
+        )
     self.uptime = channel.unary_unary(
         '/underworlds.Underworlds/uptime',
         request_serializer=Client.SerializeToString,
@@ -1454,6 +2402,26 @@ class UnderworldsStub(object):
         request_serializer=Client.SerializeToString,
         response_deserializer=Empty.FromString,
         )
+    self.stats = channel.unary_unary(
+        '/underworlds.Underworlds/stats',
+        request_serializer=Client.SerializeToString,
+        response_deserializer=Stats.FromString,
+        )
+    self.getScene = channel.unary_unary(
+        '/underworlds.Underworlds/getScene',
+        request_serializer=Context.SerializeToString,
+        response_deserializer=Snapshot.FromString,
+        )
+    self.getChangesSince = channel.unary_unary(
+        '/underworlds.Underworlds/getChangesSince',
+        request_serializer=RevisionInContext.SerializeToString,
+        response_deserializer=Changes.FromString,
+        )
+    self.forkWorld = channel.unary_unary(
+        '/underworlds.Underworlds/forkWorld',
+        request_serializer=WorldInContext.SerializeToString,
+        response_deserializer=Empty.FromString,
+        )
     self.getNodesLen = channel.unary_unary(
         '/underworlds.Underworlds/getNodesLen',
         request_serializer=Context.SerializeToString,
@@ -1474,6 +2442,16 @@ class UnderworldsStub(object):
         request_serializer=NodeInContext.SerializeToString,
         response_deserializer=Node.FromString,
         )
+    self.getNodes = channel.unary_stream(
+        '/underworlds.Underworlds/getNodes',
+        request_serializer=NodesInContext.SerializeToString,
+        response_deserializer=Node.FromString,
+        )
+    self.findNodes = channel.unary_unary(
+        '/underworlds.Underworlds/findNodes',
+        request_serializer=NodeFilterInContext.SerializeToString,
+        response_deserializer=Nodes.FromString,
+        )
     self.updateNodes = channel.unary_unary(
         '/underworlds.Underworlds/updateNodes',
         request_serializer=NodesInContext.SerializeToString,
@@ -1484,6 +2462,21 @@ class UnderworldsStub(object):
         request_serializer=NodesInContext.SerializeToString,
         response_deserializer=Empty.FromString,
         )
+    self.queryBox = channel.unary_unary(
+        '/underworlds.Underworlds/queryBox',
+        request_serializer=BoxInContext.SerializeToString,
+        response_deserializer=Nodes.FromString,
+        )
+    self.querySphere = channel.unary_unary(
+        '/underworlds.Underworlds/querySphere',
+        request_serializer=SphereInContext.SerializeToString,
+        response_deserializer=Nodes.FromString,
+        )
+    self.kNearest = channel.unary_unary(
+        '/underworlds.Underworlds/kNearest',
+        request_serializer=NearestInContext.SerializeToString,
+        response_deserializer=Nodes.FromString,
+        )
     self.getSituationsLen = channel.unary_unary(
         '/underworlds.Underworlds/getSituationsLen',
         request_serializer=Context.SerializeToString,
@@ -1524,11 +2517,31 @@ class UnderworldsStub(object):
         request_serializer=MeshInContext.SerializeToString,
         response_deserializer=Mesh.FromString,
         )
+    self.getMeshInfo = channel.unary_unary(
+        '/underworlds.Underworlds/getMeshInfo',
+        request_serializer=MeshInContext.SerializeToString,
+        response_deserializer=MeshInfo.FromString,
+        )
     self.pushMesh = channel.unary_unary(
         '/underworlds.Underworlds/pushMesh',
         request_serializer=MeshInContext.SerializeToString,
         response_deserializer=Empty.FromString,
         )
+    self.getMeshStream = channel.unary_stream(
+        '/underworlds.Underworlds/getMeshStream',
+        request_serializer=MeshChunk.SerializeToString,
+        response_deserializer=MeshChunk.FromString,
+        )
+    self.pushMeshStream = channel.stream_unary(
+        '/underworlds.Underworlds/pushMeshStream',
+        request_serializer=MeshChunk.SerializeToString,
+        response_deserializer=MeshChunk.FromString,
+        )
+    self.getPushedMeshOffset = channel.unary_unary(
+        '/underworlds.Underworlds/getPushedMeshOffset',
+        request_serializer=MeshChunk.SerializeToString,
+        response_deserializer=MeshChunk.FromString,
+        )
 
 
 class UnderworldsServicer(object):
@@ -1547,10 +2560,20 @@ class UnderworldsServicer(object):
 
   def byebye(self, request, context):
     """Inform the server that the client is disconnecting.
-    Before completing this call, the client must keep its invalidation
-    server open and listening.
-    After completing this call, the server should not attempt to connect to
-    the client's invalidation server.
+    The pending invalidations are sent to the client, and its invalidation
+    stream (see subscribe) is then closed.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def subscribe(self, request, context):
+    """Opens the stream of 'invalidated' nodes/situations that need to be
+    updated, for all the worlds the client interacts with.
+    Invalidated nodes/situations can be new nodes/situations,
+    nodes/situations that have changed, or nodes/situations that have been
+    removed (see Invalidation.type).
+    The stream remains open until the client calls byebye.
     """
     context.set_code(grpc.StatusCode.UNIMPLEMENTED)
     context.set_details('Method not implemented!')
@@ -1581,6 +2604,47 @@ class UnderworldsServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def stats(self, request, context):
+    """Returns the metrics of the server: latencies of the RPCs, sizes of the
+    requests and responses, number of nodes of each world, state of the
+    invalidation queue of each client...
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def getScene(self, request, context):
+    """WORLDS
+
+    Returns a snapshot of the whole world: all its nodes and situations, at
+    a given revision of the world.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def getChangesSince(self, request, context):
+    """Returns the compacted sets of new, updated and deleted nodes and
+    situations since the given revision of the world. If the changes since
+    this revision are not known anymore, Changes.outdated is set and the
+    whole world must be fetched again (see getScene).
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def forkWorld(self, request, context):
+    """Replaces the content of the context's world with a copy of the content
+    of another world. The copy is copy-on-write on the server: the nodes
+    and situations are shared by both worlds until modified, but the
+    indices of the world are copied (O(n) in the number of nodes, with a
+    small constant). The clients of the world are notified of all its
+    nodes and situations.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
   def getNodesLen(self, request, context):
     """NODES
 
@@ -1613,6 +2677,22 @@ class UnderworldsServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def getNodes(self, request, context):
+    """Returns several nodes at once from their IDs in the given world, as a
+    stream. Only the nodes IDs are used. Non-existing nodes are skipped.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def findNodes(self, request, context):
+    """Returns the IDs of the nodes of the given world matching a filter (see
+    NodeFilter). The lookup relies on indices maintained by the server.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
   def updateNodes(self, request, context):
     """Updates (and broadcasts to all client) nodes in a given world
     """
@@ -1627,6 +2707,31 @@ class UnderworldsServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def queryBox(self, request, context):
+    """Returns the IDs of the nodes of the given world whose world AABB (see
+    Node.world_aabb) intersects a box. The nodes without geometry are
+    represented by the origin of their frame.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def querySphere(self, request, context):
+    """Returns the IDs of the nodes of the given world whose world AABB
+    intersects a sphere (see queryBox).
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def kNearest(self, request, context):
+    """Returns the IDs of the k nodes of the given world whose world AABB is
+    the nearest to a point, nearest first (see queryBox).
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
   def getSituationsLen(self, request, context):
     """TIMELINE
 
@@ -1685,7 +2790,15 @@ class UnderworldsServicer(object):
     raise NotImplementedError('Method not implemented!')
 
   def getMesh(self, request, context):
-    """Returns a 3D mesh.
+    """Returns a 3D mesh, or one of its levels of detail.
+    Note that only the ID of the input mesh is used.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def getMeshInfo(self, request, context):
+    """Returns the geometric properties (bounds, convex hull) of a mesh.
     Note that only the ID of the input mesh is used.
     """
     context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -1699,6 +2812,35 @@ class UnderworldsServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def getMeshStream(self, request, context):
+    """Returns a 3D mesh as a stream of chunks of its serialized gRPC.Mesh,
+    starting at the offset of the input chunk (to resume an interrupted
+    download). Only the client, ID and offset of the input chunk are used.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def pushMeshStream(self, request_iterator, context):
+    """Sends a 3D mesh to the server, as a stream of chunks of its serialized
+    gRPC.Mesh. Returns an empty chunk whose offset is the number of bytes
+    of the mesh received so far: the chunks of an interrupted upload are
+    kept by the server (until the client disconnects), and the upload can
+    be resumed from this offset.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def getPushedMeshOffset(self, request, context):
+    """Returns an empty chunk whose offset is the number of bytes of a mesh
+    already received by pushMeshStream from this client.
+    Only the client and ID of the input chunk are used.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_UnderworldsServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -1712,6 +2854,11 @@ def add_UnderworldsServicer_to_server(servicer, server):
           request_deserializer=Client.FromString,
           response_serializer=Empty.SerializeToString,
       ),
+      'subscribe': grpc.unary_stream_rpc_method_handler(
+          servicer.subscribe,
+          request_deserializer=Client.FromString,
+          response_serializer=Invalidation.SerializeToString,
+      ),
       'uptime': grpc.unary_unary_rpc_method_handler(
           servicer.uptime,
           request_deserializer=Client.FromString,
@@ -1727,6 +2874,26 @@ def add_UnderworldsServicer_to_server(servicer, server):
           request_deserializer=Client.FromString,
           response_serializer=Empty.SerializeToString,
       ),
+      'stats': grpc.unary_unary_rpc_method_handler(
+          servicer.stats,
+          request_deserializer=Client.FromString,
+          response_serializer=Stats.SerializeToString,
+      ),
+      'getScene': grpc.unary_unary_rpc_method_handler(
+          servicer.getScene,
+          request_deserializer=Context.FromString,
+          response_serializer=Snapshot.SerializeToString,
+      ),
+      'getChangesSince': grpc.unary_unary_rpc_method_handler(
+          servicer.getChangesSince,
+          request_deserializer=RevisionInContext.FromString,
+          response_serializer=Changes.SerializeToString,
+      ),
+      'forkWorld': grpc.unary_unary_rpc_method_handler(
+          servicer.forkWorld,
+          request_deserializer=WorldInContext.FromString,
+          response_serializer=Empty.SerializeToString,
+      ),
       'getNodesLen': grpc.unary_unary_rpc_method_handler(
           servicer.getNodesLen,
           request_deserializer=Context.FromString,
@@ -1747,6 +2914,16 @@ def add_UnderworldsServicer_to_server(servicer, server):
           request_deserializer=NodeInContext.FromString,
           response_serializer=Node.SerializeToString,
       ),
+      'getNodes': grpc.unary_stream_rpc_method_handler(
+          servicer.getNodes,
+          request_deserializer=NodesInContext.FromString,
+          response_serializer=Node.SerializeToString,
+      ),
+      'findNodes': grpc.unary_unary_rpc_method_handler(
+          servicer.findNodes,
+          request_deserializer=NodeFilterInContext.FromString,
+          response_serializer=Nodes.SerializeToString,
+      ),
       'updateNodes': grpc.unary_unary_rpc_method_handler(
           servicer.updateNodes,
           request_deserializer=NodesInContext.FromString,
@@ -1757,6 +2934,21 @@ def add_UnderworldsServicer_to_server(servicer, server):
           request_deserializer=NodesInContext.FromString,
           response_serializer=Empty.SerializeToString,
       ),
+      'queryBox': grpc.unary_unary_rpc_method_handler(
+          servicer.queryBox,
+          request_deserializer=BoxInContext.FromString,
+          response_serializer=Nodes.SerializeToString,
+      ),
+      'querySphere': grpc.unary_unary_rpc_method_handler(
+          servicer.querySphere,
+          request_deserializer=SphereInContext.FromString,
+          response_serializer=Nodes.SerializeToString,
+      ),
+      'kNearest': grpc.unary_unary_rpc_method_handler(
+          servicer.kNearest,
+          request_deserializer=NearestInContext.FromString,
+          response_serializer=Nodes.SerializeToString,
+      ),
       'getSituationsLen': grpc.unary_unary_rpc_method_handler(
           servicer.getSituationsLen,
           request_deserializer=Context.FromString,
@@ -1797,11 +2989,31 @@ def add_UnderworldsServicer_to_server(servicer, server):
           request_deserializer=MeshInContext.FromString,
           response_serializer=Mesh.SerializeToString,
       ),
+      'getMeshInfo': grpc.unary_unary_rpc_method_handler(
+          servicer.getMeshInfo,
+          request_deserializer=MeshInContext.FromString,
+          response_serializer=MeshInfo.SerializeToString,
+      ),
       'pushMesh': grpc.unary_unary_rpc_method_handler(
           servicer.pushMesh,
           request_deserializer=MeshInContext.FromString,
           response_serializer=Empty.SerializeToString,
       ),
+      'getMeshStream': grpc.unary_stream_rpc_method_handler(
+          servicer.getMeshStream,
+          request_deserializer=MeshChunk.FromString,
+          response_serializer=MeshChunk.SerializeToString,
+      ),
+      'pushMeshStream': grpc.stream_unary_rpc_method_handler(
+          servicer.pushMeshStream,
+          request_deserializer=MeshChunk.FromString,
+          response_serializer=MeshChunk.SerializeToString,
+      ),
+      'getPushedMeshOffset': grpc.unary_unary_rpc_method_handler(
+          servicer.getPushedMeshOffset,
+          request_deserializer=MeshChunk.FromString,
+          response_serializer=MeshChunk.SerializeToString,
+      ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
       'underworlds.Underworlds', rpc_method_handlers)
@@ -1820,10 +3032,17 @@ class BetaUnderworldsServicer(object):
     context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
   def byebye(self, request, context):
     """Inform the server that the client is disconnecting.
-    Before completing this call, the client must keep its invalidation
-    server open and listening.
-    After completing this call, the server should not attempt to connect to
-    the client's invalidation server.
+    The pending invalidations are sent to the client, and its invalidation
+    stream (see subscribe) is then closed.
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def subscribe(self, request, context):
+    """Opens the stream of 'invalidated' nodes/situations that need to be
+    updated, for all the worlds the client interacts with.
+    Invalidated nodes/situations can be new nodes/situations,
+    nodes/situations that have changed, or nodes/situations that have been
+    removed (see Invalidation.type).
+    The stream remains open until the client calls byebye.
     """
     context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
   def uptime(self, request, context):
@@ -1842,6 +3061,35 @@ class BetaUnderworldsServicer(object):
     call 'helo' again).
     """
     context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def stats(self, request, context):
+    """Returns the metrics of the server: latencies of the RPCs, sizes of the
+    requests and responses, number of nodes of each world, state of the
+    invalidation queue of each client...
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def getScene(self, request, context):
+    """WORLDS
+
+    Returns a snapshot of the whole world: all its nodes and situations, at
+    a given revision of the world.
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def getChangesSince(self, request, context):
+    """Returns the compacted sets of new, updated and deleted nodes and
+    situations since the given revision of the world. If the changes since
+    this revision are not known anymore, Changes.outdated is set and the
+    whole world must be fetched again (see getScene).
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def forkWorld(self, request, context):
+    """Replaces the content of the context's world with a copy of the content
+    of another world. The copy is copy-on-write on the server: the nodes
+    and situations are shared by both worlds until modified, but the
+    indices of the world are copied (O(n) in the number of nodes, with a
+    small constant). The clients of the world are notified of all its
+    nodes and situations.
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
   def getNodesLen(self, request, context):
     """NODES
 
@@ -1862,6 +3110,16 @@ class BetaUnderworldsServicer(object):
     Note that only the node ID is used (and thus, required).
     """
     context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def getNodes(self, request, context):
+    """Returns several nodes at once from their IDs in the given world, as a
+    stream. Only the nodes IDs are used. Non-existing nodes are skipped.
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def findNodes(self, request, context):
+    """Returns the IDs of the nodes of the given world matching a filter (see
+    NodeFilter). The lookup relies on indices maintained by the server.
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
   def updateNodes(self, request, context):
     """Updates (and broadcasts to all client) nodes in a given world
     """
@@ -1870,6 +3128,22 @@ class BetaUnderworldsServicer(object):
     """Deletes (and broadcasts to all client) nodes in a given world
     """
     context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def queryBox(self, request, context):
+    """Returns the IDs of the nodes of the given world whose world AABB (see
+    Node.world_aabb) intersects a box. The nodes without geometry are
+    represented by the origin of their frame.
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def querySphere(self, request, context):
+    """Returns the IDs of the nodes of the given world whose world AABB
+    intersects a sphere (see queryBox).
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def kNearest(self, request, context):
+    """Returns the IDs of the k nodes of the given world whose world AABB is
+    the nearest to a point, nearest first (see queryBox).
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
   def getSituationsLen(self, request, context):
     """TIMELINE
 
@@ -1907,7 +3181,12 @@ class BetaUnderworldsServicer(object):
     """
     context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
   def getMesh(self, request, context):
-    """Returns a 3D mesh.
+    """Returns a 3D mesh, or one of its levels of detail.
+    Note that only the ID of the input mesh is used.
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def getMeshInfo(self, request, context):
+    """Returns the geometric properties (bounds, convex hull) of a mesh.
     Note that only the ID of the input mesh is used.
     """
     context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
@@ -1915,6 +3194,26 @@ class BetaUnderworldsServicer(object):
     """Sends a 3D mesh to the server.
     """
     context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def getMeshStream(self, request, context):
+    """Returns a 3D mesh as a stream of chunks of its serialized gRPC.Mesh,
+    starting at the offset of the input chunk (to resume an interrupted
+    download). Only the client, ID and offset of the input chunk are used.
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def pushMeshStream(self, request_iterator, context):
+    """Sends a 3D mesh to the server, as a stream of chunks of its serialized
+    gRPC.Mesh. Returns an empty chunk whose offset is the number of bytes
+    of the mesh received so far: the chunks of an interrupted upload are
+    kept by the server (until the client disconnects), and the upload can
+    be resumed from this offset.
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+  def getPushedMeshOffset(self, request, context):
+    """Returns an empty chunk whose offset is the number of bytes of a mesh
+    already received by pushMeshStream from this client.
+    Only the client and ID of the input chunk are used.
+    """
+    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
 
 
 class BetaUnderworldsStub(object):
@@ -1930,13 +3229,20 @@ class BetaUnderworldsStub(object):
   helo.future = None
   def byebye(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
     """Inform the server that the client is disconnecting.
-    Before completing this call, the client must keep its invalidation
-    server open and listening.
-    After completing this call, the server should not attempt to connect to
-    the client's invalidation server.
+    The pending invalidations are sent to the client, and its invalidation
+    stream (see subscribe) is then closed.
     """
     raise NotImplementedError()
   byebye.future = None
+  def subscribe(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Opens the stream of 'invalidated' nodes/situations that need to be
+    updated, for all the worlds the client interacts with.
+    Invalidated nodes/situations can be new nodes/situations,
+    nodes/situations that have changed, or nodes/situations that have been
+    removed (see Invalidation.type).
+    The stream remains open until the client calls byebye.
+    """
+    raise NotImplementedError()
   def uptime(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
     """Returns the uptime of the server, in seconds
     """
@@ -1956,6 +3262,39 @@ class BetaUnderworldsStub(object):
     """
     raise NotImplementedError()
   reset.future = None
+  def stats(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Returns the metrics of the server: latencies of the RPCs, sizes of the
+    requests and responses, number of nodes of each world, state of the
+    invalidation queue of each client...
+    """
+    raise NotImplementedError()
+  stats.future = None
+  def getScene(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """WORLDS
+
+    Returns a snapshot of the whole world: all its nodes and situations, at
+    a given revision of the world.
+    """
+    raise NotImplementedError()
+  getScene.future = None
+  def getChangesSince(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Returns the compacted sets of new, updated and deleted nodes and
+    situations since the given revision of the world. If the changes since
+    this revision are not known anymore, Changes.outdated is set and the
+    whole world must be fetched again (see getScene).
+    """
+    raise NotImplementedError()
+  getChangesSince.future = None
+  def forkWorld(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Replaces the content of the context's world with a copy of the content
+    of another world. The copy is copy-on-write on the server: the nodes
+    and situations are shared by both worlds until modified, but the
+    indices of the world are copied (O(n) in the number of nodes, with a
+    small constant). The clients of the world are notified of all its
+    nodes and situations.
+    """
+    raise NotImplementedError()
+  forkWorld.future = None
   def getNodesLen(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
     """NODES
 
@@ -1980,6 +3319,17 @@ class BetaUnderworldsStub(object):
     """
     raise NotImplementedError()
   getNode.future = None
+  def getNodes(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Returns several nodes at once from their IDs in the given world, as a
+    stream. Only the nodes IDs are used. Non-existing nodes are skipped.
+    """
+    raise NotImplementedError()
+  def findNodes(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Returns the IDs of the nodes of the given world matching a filter (see
+    NodeFilter). The lookup relies on indices maintained by the server.
+    """
+    raise NotImplementedError()
+  findNodes.future = None
   def updateNodes(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
     """Updates (and broadcasts to all client) nodes in a given world
     """
@@ -1990,6 +3340,25 @@ class BetaUnderworldsStub(object):
     """
     raise NotImplementedError()
   deleteNodes.future = None
+  def queryBox(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Returns the IDs of the nodes of the given world whose world AABB (see
+    Node.world_aabb) intersects a box. The nodes without geometry are
+    represented by the origin of their frame.
+    """
+    raise NotImplementedError()
+  queryBox.future = None
+  def querySphere(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Returns the IDs of the nodes of the given world whose world AABB
+    intersects a sphere (see queryBox).
+    """
+    raise NotImplementedError()
+  querySphere.future = None
+  def kNearest(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Returns the IDs of the k nodes of the given world whose world AABB is
+    the nearest to a point, nearest first (see queryBox).
+    """
+    raise NotImplementedError()
+  kNearest.future = None
   def getSituationsLen(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
     """TIMELINE
 
@@ -2034,16 +3403,44 @@ class BetaUnderworldsStub(object):
     raise NotImplementedError()
   hasMesh.future = None
   def getMesh(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
-    """Returns a 3D mesh.
+    """Returns a 3D mesh, or one of its levels of detail.
     Note that only the ID of the input mesh is used.
     """
     raise NotImplementedError()
   getMesh.future = None
+  def getMeshInfo(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Returns the geometric properties (bounds, convex hull) of a mesh.
+    Note that only the ID of the input mesh is used.
+    """
+    raise NotImplementedError()
+  getMeshInfo.future = None
   def pushMesh(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
     """Sends a 3D mesh to the server.
     """
     raise NotImplementedError()
   pushMesh.future = None
+  def getMeshStream(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Returns a 3D mesh as a stream of chunks of its serialized gRPC.Mesh,
+    starting at the offset of the input chunk (to resume an interrupted
+    download). Only the client, ID and offset of the input chunk are used.
+    """
+    raise NotImplementedError()
+  def pushMeshStream(self, request_iterator, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Sends a 3D mesh to the server, as a stream of chunks of its serialized
+    gRPC.Mesh. Returns an empty chunk whose offset is the number of bytes
+    of the mesh received so far: the chunks of an interrupted upload are
+    kept by the server (until the client disconnects), and the upload can
+    be resumed from this offset.
+    """
+    raise NotImplementedError()
+  pushMeshStream.future = None
+  def getPushedMeshOffset(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+    """Returns an empty chunk whose offset is the number of bytes of a mesh
+    already received by pushMeshStream from this client.
+    Only the client and ID of the input chunk are used.
+    """
+    raise NotImplementedError()
+  getPushedMeshOffset.future = None
 
 
 def beta_create_Underworlds_server(servicer, pool=None, pool_size=None, default_timeout=None, maximum_timeout=None):
@@ -2051,18 +3448,32 @@ def beta_create_Underworlds_server(servicer, pool=None, pool_size=None, default_
     ('underworlds.Underworlds', 'byebye'): Client.FromString,
     ('underworlds.Underworlds', 'deleteNodes'): NodesInContext.FromString,
     ('underworlds.Underworlds', 'deleteSituations'): SituationsInContext.FromString,
+    ('underworlds.Underworlds', 'findNodes'): NodeFilterInContext.FromString,
+    ('underworlds.Underworlds', 'forkWorld'): WorldInContext.FromString,
+    ('underworlds.Underworlds', 'getChangesSince'): RevisionInContext.FromString,
     ('underworlds.Underworlds', 'getMesh'): MeshInContext.FromString,
+    ('underworlds.Underworlds', 'getMeshInfo'): MeshInContext.FromString,
+    ('underworlds.Underworlds', 'getMeshStream'): MeshChunk.FromString,
     ('underworlds.Underworlds', 'getNode'): NodeInContext.FromString,
+    ('underworlds.Underworlds', 'getNodes'): NodesInContext.FromString,
     ('underworlds.Underworlds', 'getNodesIds'): Context.FromString,
     ('underworlds.Underworlds', 'getNodesLen'): Context.FromString,
+    ('underworlds.Underworlds', 'getPushedMeshOffset'): MeshChunk.FromString,
     ('underworlds.Underworlds', 'getRootNode'): Context.FromString,
+    ('underworlds.Underworlds', 'getScene'): Context.FromString,
     ('underworlds.Underworlds', 'getSituation'): SituationInContext.FromString,
     ('underworlds.Underworlds', 'getSituationsIds'): Context.FromString,
     ('underworlds.Underworlds', 'getSituationsLen'): Context.FromString,
     ('underworlds.Underworlds', 'hasMesh'): MeshInContext.FromString,
     ('underworlds.Underworlds', 'helo'): Welcome.FromString,
+    ('underworlds.Underworlds', 'kNearest'): NearestInContext.FromString,
     ('underworlds.Underworlds', 'pushMesh'): MeshInContext.FromString,
+    ('underworlds.Underworlds', 'pushMeshStream'): MeshChunk.FromString,
+    ('underworlds.Underworlds', 'queryBox'): BoxInContext.FromString,
+    ('underworlds.Underworlds', 'querySphere'): SphereInContext.FromString,
     ('underworlds.Underworlds', 'reset'): Client.FromString,
+    ('underworlds.Underworlds', 'stats'): Client.FromString,
+    ('underworlds.Underworlds', 'subscribe'): Client.FromString,
     ('underworlds.Underworlds', 'timelineOrigin'): Context.FromString,
     ('underworlds.Underworlds', 'topology'): Client.FromString,
     ('underworlds.Underworlds', 'updateNodes'): NodesInContext.FromString,
@@ -2073,18 +3484,32 @@ def beta_create_Underworlds_server(servicer, pool=None, pool_size=None, default_
     ('underworlds.Underworlds', 'byebye'): Empty.SerializeToString,
     ('underworlds.Underworlds', 'deleteNodes'): Empty.SerializeToString,
     ('underworlds.Underworlds', 'deleteSituations'): Empty.SerializeToString,
+    ('underworlds.Underworlds', 'findNodes'): Nodes.SerializeToString,
+    ('underworlds.Underworlds', 'forkWorld'): Empty.SerializeToString,
+    ('underworlds.Underworlds', 'getChangesSince'): Changes.SerializeToString,
     ('underworlds.Underworlds', 'getMesh'): Mesh.SerializeToString,
+    ('underworlds.Underworlds', 'getMeshInfo'): MeshInfo.SerializeToString,
+    ('underworlds.Underworlds', 'getMeshStream'): MeshChunk.SerializeToString,
     ('underworlds.Underworlds', 'getNode'): Node.SerializeToString,
+    ('underworlds.Underworlds', 'getNodes'): Node.SerializeToString,
     ('underworlds.Underworlds', 'getNodesIds'): Nodes.SerializeToString,
     ('underworlds.Underworlds', 'getNodesLen'): Size.SerializeToString,
+    ('underworlds.Underworlds', 'getPushedMeshOffset'): MeshChunk.SerializeToString,
     ('underworlds.Underworlds', 'getRootNode'): Node.SerializeToString,
+    ('underworlds.Underworlds', 'getScene'): Snapshot.SerializeToString,
     ('underworlds.Underworlds', 'getSituation'): Situation.SerializeToString,
     ('underworlds.Underworlds', 'getSituationsIds'): Situations.SerializeToString,
     ('underworlds.Underworlds', 'getSituationsLen'): Size.SerializeToString,
     ('underworlds.Underworlds', 'hasMesh'): Bool.SerializeToString,
     ('underworlds.Underworlds', 'helo'): Client.SerializeToString,
+    ('underworlds.Underworlds', 'kNearest'): Nodes.SerializeToString,
     ('underworlds.Underworlds', 'pushMesh'): Empty.SerializeToString,
+    ('underworlds.Underworlds', 'pushMeshStream'): MeshChunk.SerializeToString,
+    ('underworlds.Underworlds', 'queryBox'): Nodes.SerializeToString,
+    ('underworlds.Underworlds', 'querySphere'): Nodes.SerializeToString,
     ('underworlds.Underworlds', 'reset'): Empty.SerializeToString,
+    ('underworlds.Underworlds', 'stats'): Stats.SerializeToString,
+    ('underworlds.Underworlds', 'subscribe'): Invalidation.SerializeToString,
     ('underworlds.Underworlds', 'timelineOrigin'): Time.SerializeToString,
     ('underworlds.Underworlds', 'topology'): Topology.SerializeToString,
     ('underworlds.Underworlds', 'updateNodes'): Empty.SerializeToString,
@@ -2095,18 +3520,32 @@ def beta_create_Underworlds_server(servicer, pool=None, pool_size=None, default_
     ('underworlds.Underworlds', 'byebye'): face_utilities.unary_unary_inline(servicer.byebye),
     ('underworlds.Underworlds', 'deleteNodes'): face_utilities.unary_unary_inline(servicer.deleteNodes),
     ('underworlds.Underworlds', 'deleteSituations'): face_utilities.unary_unary_inline(servicer.deleteSituations),
+    ('underworlds.Underworlds', 'findNodes'): face_utilities.unary_unary_inline(servicer.findNodes),
+    ('underworlds.Underworlds', 'forkWorld'): face_utilities.unary_unary_inline(servicer.forkWorld),
+    ('underworlds.Underworlds', 'getChangesSince'): face_utilities.unary_unary_inline(servicer.getChangesSince),
     ('underworlds.Underworlds', 'getMesh'): face_utilities.unary_unary_inline(servicer.getMesh),
+    ('underworlds.Underworlds', 'getMeshInfo'): face_utilities.unary_unary_inline(servicer.getMeshInfo),
+    ('underworlds.Underworlds', 'getMeshStream'): face_utilities.unary_stream_inline(servicer.getMeshStream),
     ('underworlds.Underworlds', 'getNode'): face_utilities.unary_unary_inline(servicer.getNode),
+    ('underworlds.Underworlds', 'getNodes'): face_utilities.unary_stream_inline(servicer.getNodes),
     ('underworlds.Underworlds', 'getNodesIds'): face_utilities.unary_unary_inline(servicer.getNodesIds),
     ('underworlds.Underworlds', 'getNodesLen'): face_utilities.unary_unary_inline(servicer.getNodesLen),
+    ('underworlds.Underworlds', 'getPushedMeshOffset'): face_utilities.unary_unary_inline(servicer.getPushedMeshOffset),
     ('underworlds.Underworlds', 'getRootNode'): face_utilities.unary_unary_inline(servicer.getRootNode),
+    ('underworlds.Underworlds', 'getScene'): face_utilities.unary_unary_inline(servicer.getScene),
     ('underworlds.Underworlds', 'getSituation'): face_utilities.unary_unary_inline(servicer.getSituation),
     ('underworlds.Underworlds', 'getSituationsIds'): face_utilities.unary_unary_inline(servicer.getSituationsIds),
     ('underworlds.Underworlds', 'getSituationsLen'): face_utilities.unary_unary_inline(servicer.getSituationsLen),
     ('underworlds.Underworlds', 'hasMesh'): face_utilities.unary_unary_inline(servicer.hasMesh),
     ('underworlds.Underworlds', 'helo'): face_utilities.unary_unary_inline(servicer.helo),
+    ('underworlds.Underworlds', 'kNearest'): face_utilities.unary_unary_inline(servicer.kNearest),
     ('underworlds.Underworlds', 'pushMesh'): face_utilities.unary_unary_inline(servicer.pushMesh),
+    ('underworlds.Underworlds', 'pushMeshStream'): face_utilities.stream_unary_inline(servicer.pushMeshStream),
+    ('underworlds.Underworlds', 'queryBox'): face_utilities.unary_unary_inline(servicer.queryBox),
+    ('underworlds.Underworlds', 'querySphere'): face_utilities.unary_unary_inline(servicer.querySphere),
     ('underworlds.Underworlds', 'reset'): face_utilities.unary_unary_inline(servicer.reset),
+    ('underworlds.Underworlds', 'stats'): face_utilities.unary_unary_inline(servicer.stats),
+    ('underworlds.Underworlds', 'subscribe'): face_utilities.unary_stream_inline(servicer.subscribe),
     ('underworlds.Underworlds', 'timelineOrigin'): face_utilities.unary_unary_inline(servicer.timelineOrigin),
     ('underworlds.Underworlds', 'topology'): face_utilities.unary_unary_inline(servicer.topology),
     ('underworlds.Underworlds', 'updateNodes'): face_utilities.unary_unary_inline(servicer.updateNodes),
@@ -2122,18 +3561,32 @@ def beta_create_Underworlds_stub(channel, host=None, metadata_transformer=None,
     ('underworlds.Underworlds', 'byebye'): Client.SerializeToString,
     ('underworlds.Underworlds', 'deleteNodes'): NodesInContext.SerializeToString,
     ('underworlds.Underworlds', 'deleteSituations'): SituationsInContext.SerializeToString,
+    ('underworlds.Underworlds', 'findNodes'): NodeFilterInContext.SerializeToString,
+    ('underworlds.Underworlds', 'forkWorld'): WorldInContext.SerializeToString,
+    ('underworlds.Underworlds', 'getChangesSince'): RevisionInContext.SerializeToString,
     ('underworlds.Underworlds', 'getMesh'): MeshInContext.SerializeToString,
+    ('underworlds.Underworlds', 'getMeshInfo'): MeshInContext.SerializeToString,
+    ('underworlds.Underworlds', 'getMeshStream'): MeshChunk.SerializeToString,
     ('underworlds.Underworlds', 'getNode'): NodeInContext.SerializeToString,
+    ('underworlds.Underworlds', 'getNodes'): NodesInContext.SerializeToString,
     ('underworlds.Underworlds', 'getNodesIds'): Context.SerializeToString,
     ('underworlds.Underworlds', 'getNodesLen'): Context.SerializeToString,
+    ('underworlds.Underworlds', 'getPushedMeshOffset'): MeshChunk.SerializeToString,
     ('underworlds.Underworlds', 'getRootNode'): Context.SerializeToString,
+    ('underworlds.Underworlds', 'getScene'): Context.SerializeToString,
     ('underworlds.Underworlds', 'getSituation'): SituationInContext.SerializeToString,
     ('underworlds.Underworlds', 'getSituationsIds'): Context.SerializeToString,
     ('underworlds.Underworlds', 'getSituationsLen'): Context.SerializeToString,
     ('underworlds.Underworlds', 'hasMesh'): MeshInContext.SerializeToString,
     ('underworlds.Underworlds', 'helo'): Welcome.SerializeToString,
+    ('underworlds.Underworlds', 'kNearest'): NearestInContext.SerializeToString,
     ('underworlds.Underworlds', 'pushMesh'): MeshInContext.SerializeToString,
+    ('underworlds.Underworlds', 'pushMeshStream'): MeshChunk.SerializeToString,
+    ('underworlds.Underworlds', 'queryBox'): BoxInContext.SerializeToString,
+    ('underworlds.Underworlds', 'querySphere'): SphereInContext.SerializeToString,
     ('underworlds.Underworlds', 'reset'): Client.SerializeToString,
+    ('underworlds.Underworlds', 'stats'): Client.SerializeToString,
+    ('underworlds.Underworlds', 'subscribe'): Client.SerializeToString,
     ('underworlds.Underworlds', 'timelineOrigin'): Context.SerializeToString,
     ('underworlds.Underworlds', 'topology'): Client.SerializeToString,
     ('underworlds.Underworlds', 'updateNodes'): NodesInContext.SerializeToString,
@@ -2144,18 +3597,32 @@ def beta_create_Underworlds_stub(channel, host=None, metadata_transformer=None,
     ('underworlds.Underworlds', 'byebye'): Empty.FromString,
     ('underworlds.Underworlds', 'deleteNodes'): Empty.FromString,
     ('underworlds.Underworlds', 'deleteSituations'): Empty.FromString,
+    ('underworlds.Underworlds', 'findNodes'): Nodes.FromString,
+    ('underworlds.Underworlds', 'forkWorld'): Empty.FromString,
+    ('underworlds.Underworlds', 'getChangesSince'): Changes.FromString,
     ('underworlds.Underworlds', 'getMesh'): Mesh.FromString,
+    ('underworlds.Underworlds', 'getMeshInfo'): MeshInfo.FromString,
+    ('underworlds.Underworlds', 'getMeshStream'): MeshChunk.FromString,
     ('underworlds.Underworlds', 'getNode'): Node.FromString,
+    ('underworlds.Underworlds', 'getNodes'): Node.FromString,
     ('underworlds.Underworlds', 'getNodesIds'): Nodes.FromString,
     ('underworlds.Underworlds', 'getNodesLen'): Size.FromString,
+    ('underworlds.Underworlds', 'getPushedMeshOffset'): MeshChunk.FromString,
     ('underworlds.Underworlds', 'getRootNode'): Node.FromString,
+    ('underworlds.Underworlds', 'getScene'): Snapshot.FromString,
     ('underworlds.Underworlds', 'getSituation'): Situation.FromString,
     ('underworlds.Underworlds', 'getSituationsIds'): Situations.FromString,
     ('underworlds.Underworlds', 'getSituationsLen'): Size.FromString,
     ('underworlds.Underworlds', 'hasMesh'): Bool.FromString,
     ('underworlds.Underworlds', 'helo'): Client.FromString,
+    ('underworlds.Underworlds', 'kNearest'): Nodes.FromString,
     ('underworlds.Underworlds', 'pushMesh'): Empty.FromString,
+    ('underworlds.Underworlds', 'pushMeshStream'): MeshChunk.FromString,
+    ('underworlds.Underworlds', 'queryBox'): Nodes.FromString,
+    ('underworlds.Underworlds', 'querySphere'): Nodes.FromString,
     ('underworlds.Underworlds', 'reset'): Empty.FromString,
+    ('underworlds.Underworlds', 'stats'): Stats.FromString,
+    ('underworlds.Underworlds', 'subscribe'): Invalidation.FromString,
     ('underworlds.Underworlds', 'timelineOrigin'): Time.FromString,
     ('underworlds.Underworlds', 'topology'): Topology.FromString,
     ('underworlds.Underworlds', 'updateNodes'): Empty.FromString,
@@ -2166,18 +3633,32 @@ def beta_create_Underworlds_stub(channel, host=None, metadata_transformer=None,
     'byebye': cardinality.Cardinality.UNARY_UNARY,
     'deleteNodes': cardinality.Cardinality.UNARY_UNARY,
     'deleteSituations': cardinality.Cardinality.UNARY_UNARY,
+    'findNodes': cardinality.Cardinality.UNARY_UNARY,
+    'forkWorld': cardinality.Cardinality.UNARY_UNARY,
+    'getChangesSince': cardinality.Cardinality.UNARY_UNARY,
     'getMesh': cardinality.Cardinality.UNARY_UNARY,
+    'getMeshInfo': cardinality.Cardinality.UNARY_UNARY,
+    'getMeshStream': cardinality.Cardinality.UNARY_STREAM,
     'getNode': cardinality.Cardinality.UNARY_UNARY,
+    'getNodes': cardinality.Cardinality.UNARY_STREAM,
     'getNodesIds': cardinality.Cardinality.UNARY_UNARY,
     'getNodesLen': cardinality.Cardinality.UNARY_UNARY,
+    'getPushedMeshOffset': cardinality.Cardinality.UNARY_UNARY,
     'getRootNode': cardinality.Cardinality.UNARY_UNARY,
+    'getScene': cardinality.Cardinality.UNARY_UNARY,
     'getSituation': cardinality.Cardinality.UNARY_UNARY,
     'getSituationsIds': cardinality.Cardinality.UNARY_UNARY,
     'getSituationsLen': cardinality.Cardinality.UNARY_UNARY,
     'hasMesh': cardinality.Cardinality.UNARY_UNARY,
     'helo': cardinality.Cardinality.UNARY_UNARY,
+    'kNearest': cardinality.Cardinality.UNARY_UNARY,
     'pushMesh': cardinality.Cardinality.UNARY_UNARY,
+    'pushMeshStream': cardinality.Cardinality.STREAM_UNARY,
+    'queryBox': cardinality.Cardinality.UNARY_UNARY,
+    'querySphere': cardinality.Cardinality.UNARY_UNARY,
     'reset': cardinality.Cardinality.UNARY_UNARY,
+    'stats': cardinality.Cardinality.UNARY_UNARY,
+    'subscribe': cardinality.Cardinality.UNARY_STREAM,
     'timelineOrigin': cardinality.Cardinality.UNARY_UNARY,
     'topology': cardinality.Cardinality.UNARY_UNARY,
     'updateNodes': cardinality.Cardinality.UNARY_UNARY,
@@ -2186,94 +3667,4 @@ def beta_create_Underworlds_stub(channel, host=None, metadata_transformer=None,
   }
   stub_options = beta_implementations.stub_options(host=host, metadata_transformer=metadata_transformer, request_serializers=request_serializers, response_deserializers=response_deserializers, thread_pool=pool, thread_pool_size=pool_size)
   return beta_implementations.dynamic_stub(channel, 'underworlds.Underworlds', cardinalities, options=stub_options)
-
-
-class UnderworldsInvalidationStub(object):
-
-  def __init__(self, channel):
-    """Constructor.
-
-    Args:
-      channel: A grpc.Channel.
-    """
-    self.emitInvalidation = channel.unary_unary(
-        '/underworlds.UnderworldsInvalidation/emitInvalidation',
-        request_serializer=Invalidation.SerializeToString,
-        response_deserializer=Empty.FromString,
-        )
-
-
-class UnderworldsInvalidationServicer(object):
-
-  def emitInvalidation(self, request, context):
-    """Sends (to the client's invalidation server) 'invalidated'
-    nodes/situations that need to be updated.  Invalidated nodes/situations
-    can be new nodes/situations, nodes/situations that have changed, or
-    nodes/situations that have been removed (see Invalidation.type).
-    """
-    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-    context.set_details('Method not implemented!')
-    raise NotImplementedError('Method not implemented!')
-
-
-def add_UnderworldsInvalidationServicer_to_server(servicer, server):
-  rpc_method_handlers = {
-      'emitInvalidation': grpc.unary_unary_rpc_method_handler(
-          servicer.emitInvalidation,
-          request_deserializer=Invalidation.FromString,
-          response_serializer=Empty.SerializeToString,
-      ),
-  }
-  generic_handler = grpc.method_handlers_generic_handler(
-      'underworlds.UnderworldsInvalidation', rpc_method_handlers)
-  server.add_generic_rpc_handlers((generic_handler,))
-
-
-class BetaUnderworldsInvalidationServicer(object):
-  def emitInvalidation(self, request, context):
-    """Sends (to the client's invalidation server) 'invalidated'
-    nodes/situations that need to be updated.  Invalidated nodes/situations
-    can be new nodes/situations, nodes/situations that have changed, or
-    nodes/situations that have been removed (see Invalidation.type).
-    """
-    context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
-
-
-class BetaUnderworldsInvalidationStub(object):
-  def emitInvalidation(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
-    """Sends (to the client's invalidation server) 'invalidated'
-    nodes/situations that need to be updated.  Invalidated nodes/situations
-    can be new nodes/situations, nodes/situations that have changed, or
-    nodes/situations that have been removed (see Invalidation.type).
-    """
-    raise NotImplementedError()
-  emitInvalidation.future = None
-
-
-def beta_create_UnderworldsInvalidation_server(servicer, pool=None, pool_size=None, default_timeout=None, maximum_timeout=None):
-  request_deserializers = {
-    ('underworlds.UnderworldsInvalidation', 'emitInvalidation'): Invalidation.FromString,
-  }
-  response_serializers = {
-    ('underworlds.UnderworldsInvalidation', 'emitInvalidation'): Empty.SerializeToString,
-  }
-  method_implementations = {
-    ('underworlds.UnderworldsInvalidation', 'emitInvalidation'): face_utilities.unary_unary_inline(servicer.emitInvalidation),
-  }
-  server_options = beta_implementations.server_options(request_deserializers=request_deserializers, response_serializers=response_serializers, thread_pool=pool, thread_pool_size=pool_size, default_timeout=default_timeout, maximum_timeout=maximum_timeout)
-  return beta_implementations.server(method_implementations, options=server_options)
-
-
-def beta_create_UnderworldsInvalidation_stub(channel, host=None, metadata_transformer=None, pool=None, pool_size=None):
-  request_serializers = {
-    ('underworlds.UnderworldsInvalidation', 'emitInvalidation'): Invalidation.SerializeToString,
-  }
-  response_deserializers = {
-    ('underworlds.UnderworldsInvalidation', 'emitInvalidation'): Empty.FromString,
-  }
-  cardinalities = {
-    'emitInvalidation': cardinality.Cardinality.UNARY_UNARY,
-  }
-  stub_options = beta_implementations.stub_options(host=host, metadata_transformer=metadata_transformer, request_serializers=request_serializers, response_deserializers=response_deserializers, thread_pool=pool, thread_pool_size=pool_size)
-  return beta_implementations.dynamic_stub(channel, 'underworlds.UnderworldsInvalidation', cardinalities, options=stub_options)
 # @@protoc_insertion_point(module_scope)
@@ -8,7 +8,11 @@ logging.basicConfig(level=logging.DEBUG)
 
 import underworlds
 import underworlds.server
+import underworlds.underworlds_pb2 as gRPC
+from grpc.beta import interfaces as beta_interfaces
+from grpc.framework.interfaces.face.face import AbortionError
 from underworlds.types import Node
+from underworlds.tools.primitives_3d import Box
 
 
 class TestSingleUser(unittest.TestCase):
@@ -30,12 +34,89 @@ class TestSingleUser(unittest.TestCase):
         self.assertGreaterEqual(uptime,1)
         self.assertGreater(2, uptime)
 
+    def test_stats(self):
+
+        # (the sizes of the messages are not recorded by default)
+        self.server.servicer.metrics.sizes = True
+
+        world = self.ctx.worlds["base"]
+        world.scene.nodes.append([Node("n1"), Node("n2")])
+        time.sleep(0.05) # wait for propagation
+
+        stats = self.ctx.stats()
+
+        self.assertGreaterEqual(stats["latencies"]["rpc.updateNodes"]["count"], 1)
+        self.assertIn("updateNodes.apply", stats["latencies"])
+        self.assertGreaterEqual(stats["counters"]["rpc.updateNodes.calls"], 1)
+        self.assertGreater(stats["counters"]["rpc.updateNodes.request_bytes"], 0)
+        self.assertEqual(stats["gauges"]["worlds"]["base"]["nodes"], 3)
+
+        client = stats["gauges"]["clients"][self.ctx.id]
+        self.assertEqual(client["name"], "unittest - basic server interaction")
+        self.assertEqual(client["dropped"], 0)
+
+    def tearDown(self):
+        self.ctx.close()
+        self.server.stop(0).wait()
+
+MAX_MESSAGE_LENGTH = 64 * 1024
+
+class TestServerOptions(unittest.TestCase):
+
+    def setUp(self):
+        self.server = underworlds.server.start(max_workers=8,
+                                               max_concurrent_rpcs=32,
+                                               max_message_length=MAX_MESSAGE_LENGTH,
+                                               keepalive_time=10,
+                                               keepalive_timeout=5)
+
+        self.ctx = underworlds.Context("unittest - server options")
+
+    def test_options(self):
+
+        world = self.ctx.worlds["base"]
+        world.scene.nodes.append(Node("n1"))
+        time.sleep(0.05) # wait for propagation
+
+        self.assertEqual(len(world.scene.nodes), 2)
+        self.assertEqual(len(world.scene.nodebyname("n1")), 1)
+
+    def test_max_message_length(self):
+
+        mesh = gRPC.Mesh(id="large", packed_vertices=bytes(12 * 10000)) # 10000 vertices
+        self.assertGreater(mesh.ByteSize(), MAX_MESSAGE_LENGTH)
+
+        with self.assertRaises(AbortionError) as context:
+            self.ctx.rpc.pushMesh(gRPC.MeshInContext(client=gRPC.Client(id=self.ctx.id), mesh=mesh),
+                                  underworlds._TIMEOUT_SECONDS)
+        self.assertEqual(context.exception.code, beta_interfaces.StatusCode.RESOURCE_EXHAUSTED)
+
+        # smaller messages are still accepted
+        box = Box.create(1, 1, 1)
+        self.ctx.push_mesh(box)
+        self.assertTrue(self.ctx.has_mesh(box.id))
+
+    def test_max_concurrent_rpcs(self):
+
+        server = underworlds.server.start(port=50052, max_concurrent_rpcs=1)
+        try:
+            # the invalidation stream of the client holds the only RPC slot...
+            ctx = underworlds.Context("unittest - concurrent RPCs", port=50052)
+
+            # ...so that further RPCs are rejected
+            with self.assertRaises(AbortionError) as context:
+                ctx.uptime()
+            self.assertEqual(context.exception.code, beta_interfaces.StatusCode.RESOURCE_EXHAUSTED)
+        finally:
+            server.stop(0)
+
     def tearDown(self):
         self.ctx.close()
         self.server.stop(0).wait()
 
 def test_suite():
      suite = unittest.TestLoader().loadTestsFromTestCase(TestSingleUser)
+     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestServerOptions))
      return suite
 
 
@@ -86,7 +86,522 @@ class TestCore(unittest.TestCase):
         self.assertEqual(n.name, n2.name)
         self.assertEqual(n.properties, n2.properties)
 
+    def test_scene(self):
+
+        scene = Scene()
+        self.assertEqual(len(scene), 1) # the root node
+        self.assertEqual(scene.node(scene.rootnode.id), scene.rootnode)
+
+        nodes = [Node() for i in range(5)]
+        for n in nodes:
+            self.assertTrue(scene.append(n))
+
+        self.assertEqual(len(scene), 6)
+        self.assertEqual(len(scene.nodes), 6)
+        self.assertIsNone(scene.node("non-existing-id"))
+
+        # updating a node replaces it in place
+        n2 = Node.deserialize(nodes[2].serialize(underworlds.underworlds_pb2.Node))
+        n2.name = "updated"
+        self.assertTrue(scene.update(n2))
+        self.assertEqual(len(scene), 6)
+        self.assertEqual(scene.node(n2.id).name, "updated")
+        self.assertListEqual([n.id for n in scene.nodes],
+                             [scene.rootnode.id] + [n.id for n in nodes])
+
+        scene.remove(nodes[0])
+        self.assertEqual(len(scene), 5)
+        self.assertIsNone(scene.node(nodes[0].id))
+        self.assertFalse(nodes[0] in scene)
+        self.assertTrue(nodes[1] in scene)
+
+        # re-added nodes go at the end
+        scene.append(nodes[0])
+        self.assertEqual(list(scene.nodes)[-1], nodes[0])
+
+    def test_scene_hierarchy(self):
+
+        scene = Scene()
+        root = scene.rootnode
+
+        parent1 = Node()
+        parent1.parent = root.id
+        parent2 = Node()
+        parent2.parent = root.id
+        child = Node()
+        child.parent = parent1.id
+
+        # add the child before its parent
+        scene.append(child)
+        scene.append(parent1)
+        scene.append(parent2)
+
+        self.assertListEqual(list(root.children), [parent1.id, parent2.id])
+        self.assertListEqual(list(parent1.children), [child.id])
+        self.assertListEqual(list(parent2.children), [])
+
+        # re-parenting, in place
+        child.parent = parent2.id
+        scene.update(child)
+        self.assertListEqual(list(parent1.children), [])
+        self.assertListEqual(list(parent2.children), [child.id])
+        self.assertEqual(scene.parent(child.id), parent2.id)
+
+        # replacing a node keeps its children
+        parent2bis = Node.deserialize(parent2.serialize(underworlds.underworlds_pb2.Node))
+        scene.update(parent2bis)
+        self.assertListEqual(list(scene.node(parent2.id).children), [child.id])
+
+        scene.remove(parent2bis)
+        self.assertListEqual(list(root.children), [parent1.id])
+        self.assertEqual(scene.parent(child.id), parent2.id)
+
+        # replacing the root node updates Scene.rootnode
+        root2 = Node.deserialize(root.serialize(underworlds.underworlds_pb2.Node))
+        scene.update(root2)
+        self.assertTrue(scene.rootnode is root2)
+        root = root2
+
+        child.parent = root.id
+        scene.update(child)
+        self.assertListEqual(list(root.children), [parent1.id, child.id])
+
+    def test_scene_fork(self):
+
+        scene = Scene()
+        root = scene.rootnode
+
+        parent = Node()
+        parent.parent = root.id
+        child = Node()
+        child.parent = parent.id
+        scene.append(parent)
+        scene.append(child)
+
+        fork = scene.fork()
+        self.assertEqual(len(fork), 3)
+        self.assertTrue(fork.node(parent.id) is parent) # nodes are shared
+
+        # modifying the hierarchy of the fork does not affect the original scene
+        child2 = Node()
+        child2.parent = parent.id
+        fork.append(child2)
+        self.assertListEqual(list(fork.node(parent.id).children), [child.id, child2.id])
+        self.assertListEqual(list(parent.children), [child.id])
+        self.assertFalse(child2 in scene)
+
+        # ...and vice versa
+        scene.remove(child)
+        self.assertListEqual(list(scene.node(parent.id).children), [])
+        self.assertListEqual(list(fork.node(parent.id).children), [child.id, child2.id])
+        self.assertTrue(child in fork)
+
+        fork.reroot("new root")
+        self.assertEqual(fork.rootnode.id, "new root")
+        self.assertEqual(list(fork.nodes)[0], fork.rootnode)
+        self.assertIsNone(fork.node(root.id))
+        self.assertListEqual(list(fork.rootnode.children), [parent.id])
+        self.assertEqual(fork.node(parent.id).parent, "new root")
+        self.assertEqual(parent.parent, root.id)
+        self.assertListEqual(list(scene.rootnode.children), [parent.id])
+
+    def test_world_transforms(self):
+
+        scene = Scene()
+        root = scene.rootnode
+
+        parent = Entity()
+        parent.parent = root.id
+        parent.translate((1, 0, 0))
+        child = Mesh()
+        child.parent = parent.id
+        child.translate((0, 2, 0))
+        child.properties["mesh_ids"] = []
+        child.properties["aabb"] = (-1, -1, -1, 1, 1, 1)
+        scene.append(parent)
+        scene.append(child)
+
+        self.assertListEqual(scene.world_transform(child.id)[:3, 3].tolist(), [1, 2, 0])
+        self.assertListEqual([v.tolist() for v in scene.world_aabb(child.id)], [[0, 1, -1], [2, 3, 1]])
+        self.assertIsNone(scene.world_aabb(parent.id)) # no geometry
+        self.assertIsNone(scene.world_transform("non-existing-id"))
+
+        # the values are cached...
+        self.assertTrue(scene.world_transform(child.id) is scene.world_transform(child.id))
+
+        # ...until an ancestor moves
+        other = Node.deserialize(parent.serialize(underworlds.underworlds_pb2.Node))
+        other.translate((5, 0, 0))
+        scene.update(other)
+        self.assertListEqual(scene.world_transform(child.id)[:3, 3].tolist(), [5, 2, 0])
+        self.assertListEqual(scene.world_aabb(child.id)[0].tolist(), [4, 1, -1])
+
+        self.assertListEqual(scene.descendants(root.id), [parent.id, child.id])
+
+        # the mesh hulls are preferred to the 'aabb' property
+        scene.hulls = lambda mesh_id: numpy.array([(0, 0, 0), (0.5, 0.5, 0.5)])
+        child2 = Node.deserialize(child.serialize(underworlds.underworlds_pb2.Node))
+        child2.properties["mesh_ids"] = ["a"]
+        scene.update(child2)
+        self.assertListEqual([v.tolist() for v in scene.world_aabb(child.id)], [[5, 2, 0], [5.5, 2.5, 0.5]])
+
+        # forks keep their own cache
+        fork = scene.fork()
+        scene.remove(other)
+        self.assertListEqual(scene.world_transform(child.id)[:3, 3].tolist(), [0, 2, 0])
+        self.assertListEqual(fork.world_transform(child.id)[:3, 3].tolist(), [5, 2, 0])
+
+    def test_aabbtree(self):
+
+        import random
+        from underworlds.helpers.aabbtree import AABBTree
+
+        random.seed(0)
+        tree = AABBTree()
+        boxes = {}
+        for i in range(2000):
+            id = random.randrange(500)
+            if random.random() < 0.2:
+                tree.remove(id)
+                boxes.pop(id, None)
+            else:
+                x, y, z = [random.uniform(0, 100) for _ in range(3)]
+                boxes[id] = ((x, y, z), (x + 1, y + 2, z + 3))
+                tree.update(id, *boxes[id])
+
+        self.assertEqual(len(tree), len(boxes))
+        self.assertLess(tree._root.height, 20) # the tree is balanced
+
+        def distance(point, box):
+            return numpy.linalg.norm(numpy.maximum(0, numpy.maximum(numpy.subtract(box[0], point),
+                                                                    numpy.subtract(point, box[1]))))
+
+        for x, y, z in [(10, 10, 10), (50, 20, 80), (-10, 50, 50)]:
+            self.assertCountEqual(tree.query_box((x, y, z), (x + 20, y + 20, z + 20)),
+                                  [id for id, (bb_min, bb_max) in boxes.items() \
+                                        if all(bb_min[i] <= (x, y, z)[i] + 20 and (x, y, z)[i] <= bb_max[i] for i in range(3))])
+            self.assertCountEqual(tree.query_sphere((x, y, z), 15),
+                                  [id for id, box in boxes.items() if distance((x, y, z), box) <= 15])
+            self.assertListEqual([round(d, 6) for id, d in tree.nearest((x, y, z), 5)],
+                                 sorted(round(distance((x, y, z), box), 6) for box in boxes.values())[:5])
+
+    def test_spatial_index(self):
+
+        scene = Scene()
+
+        nodes = []
+        for i in range(10):
+            n = Mesh()
+            n.parent = scene.rootnode.id
+            n.translate((i, 0, 0))
+            n.properties["mesh_ids"] = []
+            n.properties["aabb"] = (-0.1, -0.1, -0.1, 0.1, 0.1, 0.1)
+            scene.append(n)
+            nodes.append(n)
+
+        self.assertCountEqual(scene.query_box((0.95, -1, -1), (3, 1, 1)), [n.id for n in nodes[1:4]])
+        self.assertListEqual([id for id, d in scene.nearest((9.5, 0, 0), 3)], [n.id for n in nodes[9:6:-1]])
+
+        # the index follows the changes of the scene
+        moved = Node.deserialize(nodes[0].serialize(underworlds.underworlds_pb2.Node))
+        moved.translate((2, 0, 0))
+        scene.update(moved)
+        scene.remove(nodes[3])
+        self.assertCountEqual(scene.query_box((0.95, -1, -1), (3, 1, 1)), [n.id for n in nodes[0:3]])
+
+        # moving a parent moves its children
+        nodes[5].parent = nodes[1].id
+        nodes[5].translate((0, 0, 0))
+        scene.update(nodes[5])
+        self.assertCountEqual(scene.query_sphere((1, 0, 0), 0.5), [nodes[1].id, nodes[5].id])
+
+        fork = scene.fork()
+        self.assertCountEqual(fork.query_sphere((1, 0, 0), 0.5), [nodes[1].id, nodes[5].id])
+
+        # concurrent readers re-index the moved nodes only once, consistently
+        import threading
+        for i, n in enumerate(nodes[6:]):
+            n.translate((6 + i, 10, 0))
+            scene.update(n)
+        results = []
+        def query():
+            results.append((sorted(scene.query_box((5.5, 9, -1), (10, 11, 1))),
+                            sorted(scene.world_aabb(n.id)[0].tolist() for n in nodes[6:])))
+        readers = [threading.Thread(target=query) for i in range(8)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(len(results), 8)
+        for ids, aabbs in results:
+            self.assertListEqual(ids, sorted(n.id for n in nodes[6:]))
+            self.assertListEqual(aabbs, results[0][1])
+        self.assertFalse(scene._index_dirty)
+
+    def test_find(self):
+
+        scene = Scene()
+
+        table = Mesh("table")
+        table.properties["mesh_ids"] = ["a", "b"]
+        chair = Mesh("chair")
+        chair.properties["mesh_ids"] = ["b"]
+        chair.properties["physics"] = True
+        camera = Camera("camera")
+        camera.properties["aspect"] = 1.5
+        for node in [table, chair, camera]:
+            node.parent = scene.rootnode.id
+            scene.append(node)
+
+        self.assertListEqual(scene.find(name="chair"), [chair.id])
+        self.assertListEqual(scene.find(name="unknown"), [])
+        self.assertListEqual(scene.find(types=[MESH]), [table.id, chair.id])
+        self.assertCountEqual(scene.find(types=[CAMERA, ENTITY]), [scene.rootnode.id, camera.id])
+        self.assertListEqual(scene.find(properties={"mesh_ids": "b"}), [table.id, chair.id])
+        self.assertListEqual(scene.find(properties={"mesh_ids": ["a", "b"]}), [table.id])
+        self.assertListEqual(scene.find(types=[MESH], properties={"physics": False}), [table.id])
+        self.assertListEqual(scene.find(properties={"aspect": None}), [camera.id]) # (not indexed)
+        self.assertListEqual(scene.nodebyname("table"), [table])
+
+        # the indices follow the changes of the nodes...
+        chair2 = Node.deserialize(chair.serialize(underworlds.underworlds_pb2.Node))
+        chair2.name = "stool"
+        chair2.properties["mesh_ids"] = ["c"]
+        scene.update(chair2)
+        self.assertListEqual(scene.find(name="chair"), [])
+        self.assertListEqual(scene.find(name="stool", properties={"mesh_ids": "c"}), [chair.id])
+        self.assertListEqual(scene.find(properties={"mesh_ids": "b"}), [table.id])
+
+        scene.remove(table)
+        self.assertListEqual(scene.find(types=[MESH]), [chair.id])
+
+        # ...independently in forked scenes
+        fork = scene.fork()
+        fork.remove(chair2)
+        self.assertListEqual(fork.find(types=[MESH]), [])
+        self.assertListEqual(scene.find(types=[MESH]), [chair.id])
+
+    def test_world_fork(self):
+
+        world = World("test")
+        n = Node()
+        n.parent = world.scene.rootnode.id
+        world.scene.append(n)
+        s = Situation()
+        world.timeline.update(s)
+
+        world2 = World("test2")
+        root2 = world2.scene.rootnode.id
+        world2.fork(world)
+
+        self.assertEqual(world2.scene.rootnode.id, root2)
+        self.assertEqual(len(world2.scene), 2)
+        self.assertEqual(world2.scene.parent(n.id), root2)
+        self.assertTrue(s.id in world2.timeline.situations)
+
+        world2.timeline.remove(s)
+        self.assertTrue(s.id in world.timeline.situations)
+
+    def test_changeset(self):
 
+        changes = ChangeSet()
+        changes.add(["a", "b"], NEW)
+        changes.add(["a", "c"], UPDATE)
+        changes.add(["b", "d"], DELETE)
+        changes.add(["d"], NEW)
+
+        self.assertListEqual(changes.ids(NEW), ["a"])
+        self.assertListEqual(changes.ids(UPDATE), ["c", "d"])
+        self.assertListEqual(changes.ids(DELETE), [])
+        self.assertEqual(len(changes), 3)
+
+    def test_world_history(self):
+
+        SCENE = underworlds.underworlds_pb2.Invalidation.SCENE
+        TIMELINE = underworlds.underworlds_pb2.Invalidation.TIMELINE
+
+        world = World("test")
+        world.HISTORY_LENGTH = 3
+
+        for i in range(3):
+            world.revision += 1
+            world.record(SCENE, ["node%d" % i], NEW)
+
+        world.revision += 1
+        world.record(TIMELINE, ["situation"], NEW)
+
+        changes = world.changes_since(2)
+        self.assertListEqual(changes[SCENE].ids(NEW), ["node2"])
+        self.assertListEqual(changes[TIMELINE].ids(NEW), ["situation"])
+
+        self.assertEqual(len(world.changes_since(4)[SCENE]), 0)
+
+        # the first change has been forgotten
+        self.assertIsNone(world.changes_since(0))
+        self.assertIsNotNone(world.changes_since(1))
+
+    def test_metrics(self):
+
+        from underworlds.helpers.metrics import Metrics
+
+        metrics = Metrics()
+        for i in range(100):
+            metrics.observe("op", 0.001 if i < 90 else 0.1)
+        metrics.count("bytes", 10)
+        metrics.count("bytes", 5)
+        metrics.gauge("depth", lambda: 3)
+
+        stats = metrics.snapshot()
+        op = stats["latencies"]["op"]
+        self.assertEqual(op["count"], 100)
+        self.assertAlmostEqual(op["max"], 0.1)
+        self.assertAlmostEqual(op["p50"], 0.001)
+        self.assertAlmostEqual(op["p99"], 0.1)
+        self.assertEqual(stats["counters"]["bytes"], 15)
+        self.assertEqual(stats["gauges"]["depth"], 3)
+
+        # (the snapshot is JSON-serializable)
+        json.dumps(stats)
+
+    def test_metered(self):
+
+        import time
+        import grpc
+        from underworlds.helpers.metrics import Metrics, metered
+
+        class Servicer:
+            def __init__(self, sizes):
+                self.metrics = Metrics(sizes = sizes)
+
+            @metered
+            def unary(self, request, context):
+                return underworlds.underworlds_pb2.Time(time=1.)
+
+            @metered
+            def stream(self, request, context):
+                for i in range(3):
+                    time.sleep(0.01)
+                    yield underworlds.underworlds_pb2.Time(time=i)
+
+            @metered
+            def failing(self, request, context):
+                raise RuntimeError("failing RPC")
+
+            @metered
+            def not_found(self, request, context):
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+                return underworlds.underworlds_pb2.Time()
+
+        class RPCContext:
+            def __init__(self):
+                self._code = None
+            def set_code(self, code):
+                self._code = code
+            def code(self):
+                return self._code
+
+        servicer = Servicer(sizes = False)
+        servicer.unary(underworlds.underworlds_pb2.Time(time=1.), RPCContext())
+        self.assertEqual(len(list(servicer.stream(underworlds.underworlds_pb2.Time(), None))), 3)
+
+        stats = servicer.metrics.snapshot()
+        self.assertEqual(stats["counters"]["rpc.unary.calls"], 1)
+        self.assertNotIn("rpc.unary.errors", stats["counters"])
+        self.assertNotIn("rpc.unary.request_bytes", stats["counters"])
+        # the latency of a streamed response covers the whole stream
+        self.assertGreaterEqual(stats["latencies"]["rpc.stream"]["max"], 0.03)
+
+        # failed calls are timed, and counted as errors
+        with self.assertRaises(RuntimeError):
+            servicer.failing(underworlds.underworlds_pb2.Time(), RPCContext())
+        servicer.not_found(underworlds.underworlds_pb2.Time(), RPCContext())
+        stats = servicer.metrics.snapshot()
+        for rpc in ["failing", "not_found"]:
+            self.assertEqual(stats["counters"]["rpc.%s.errors" % rpc], 1)
+            self.assertEqual(stats["latencies"]["rpc." + rpc]["count"], 1)
+
+        servicer = Servicer(sizes = True)
+        servicer.unary(underworlds.underworlds_pb2.Time(time=1.), None)
+        stats = servicer.metrics.snapshot()
+        self.assertEqual(stats["counters"]["rpc.unary.request_bytes"], 9)
+        self.assertEqual(stats["counters"]["rpc.unary.response_bytes"], 9)
+
+    def test_tracing(self):
+
+        import os, tempfile
+        from underworlds.helpers.profile import Tracer, merge
+
+        tracer = Tracer()
+
+        @tracer.span
+        def inner(nodes):
+            return len(nodes)
+
+        @tracer.span
+        def outer(nodes):
+            return inner(nodes)
+
+        outer([1, 2]) # tracing disabled: not recorded
+
+        tmpdir = tempfile.mkdtemp()
+        path = tracer.enable(tmpdir)
+        self.assertEqual(outer([1, 2, 3]), 3)
+        tracer.instant("done")
+        tracer.disable()
+
+        with open(path) as f:
+            events = json.load(f)
+
+        spans = {e["name"]: e for e in events if e["ph"] == "X"}
+        self.assertEqual(len(spans), 2)
+        outer_span = spans["TestCore.test_tracing.<locals>.outer"]
+        inner_span = spans["TestCore.test_tracing.<locals>.inner"]
+        # the inner call is nested in the outer one
+        self.assertEqual(inner_span["tid"], outer_span["tid"])
+        self.assertGreaterEqual(inner_span["ts"], outer_span["ts"])
+        self.assertLessEqual(inner_span["ts"] + inner_span["dur"], outer_span["ts"] + outer_span["dur"])
+        self.assertEqual(outer_span["args"]["batch_size"], 3)
+
+        self.assertEqual(len([e for e in events if e["ph"] == "i"]), 1)
+        self.assertEqual(len([e for e in events if e["ph"] == "M"]), 2) # process and thread names
+
+        merged = os.path.join(tmpdir, "merged.json")
+        merge([path, path], merged)
+        with open(merged) as f:
+            self.assertEqual(len(json.load(f)["traceEvents"]), 2 * len(events))
+
+    def test_tracing_sampling(self):
+
+        import tempfile
+        from underworlds.helpers.profile import Tracer
+
+        tracer = Tracer()
+
+        @tracer.span
+        def inner():
+            pass
+
+        @tracer.span
+        def outer():
+            inner()
+
+        path = tracer.enable(tempfile.mkdtemp(), sampling = 0.5)
+        for i in range(200):
+            outer()
+        tracer.disable()
+
+        with open(path) as f:
+            events = [e for e in json.load(f) if e["ph"] == "X"]
+
+        outers = [e for e in events if e["name"].endswith("outer")]
+        inners = [e for e in events if e["name"].endswith("inner")]
+        self.assertLess(0, len(outers))
+        self.assertLess(len(outers), 200)
+
+        # inner calls are recorded if and only if their caller is
+        self.assertEqual(len(inners), len(outers))
+        for i in inners:
+            self.assertTrue(any(o["ts"] <= i["ts"] and i["ts"] + i["dur"] <= o["ts"] + o["dur"] for o in outers))
 
 def test_suite():
      suite = unittest.TestLoader().loadTestsFromTestCase(TestCore)
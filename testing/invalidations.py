@@ -0,0 +1,144 @@
+#! /usr/bin/env python
+
+import time
+import threading
+import unittest
+
+import logging; logger = logging.getLogger("underworlds.testing.invalidations")
+logging.basicConfig(level=logging.DEBUG)
+
+import underworlds.underworlds_pb2 as gRPC
+from underworlds.server import Client, InvalidationCoalescer
+from underworlds.types import NEW, UPDATE, DELETE, RESYNC
+
+WINDOW=0.01 # coalescing window (in sec)
+
+class ActiveRPCContext:
+    def is_active(self):
+        return True
+
+class TestInvalidations(unittest.TestCase):
+
+    def setUp(self):
+        self.emitted = []
+        self.pushed = []
+        self.coalescer = InvalidationCoalescer(WINDOW, self.emit)
+
+    def emit(self, target, world, ids, invalidation_type, nodes):
+        self.emitted.append((target, world, ids, invalidation_type))
+        self.pushed.extend(nodes)
+
+    def test_coalescing(self):
+
+        SCENE = gRPC.Invalidation.SCENE
+
+        self.coalescer.add(SCENE, "base", ["a", "b"], NEW)
+        self.coalescer.add(SCENE, "base", ["a", "c"], UPDATE)
+        self.coalescer.add(SCENE, "base", ["c"], UPDATE)
+        self.coalescer.add(SCENE, "base", ["b", "d"], DELETE)
+
+        # nothing is emitted before the end of the window
+        self.assertListEqual(self.emitted, [])
+
+        time.sleep(WINDOW * 5)
+
+        self.assertListEqual(self.emitted, [(SCENE, "base", ["a"], NEW),
+                                            (SCENE, "base", ["c"], UPDATE),
+                                            (SCENE, "base", ["d"], DELETE)])
+
+    def test_recreated(self):
+
+        SCENE = gRPC.Invalidation.SCENE
+
+        self.coalescer.add(SCENE, "base", ["a"], UPDATE)
+        self.coalescer.add(SCENE, "base", ["a"], DELETE)
+        self.coalescer.add(SCENE, "base", ["a"], NEW)
+
+        time.sleep(WINDOW * 5)
+
+        # deleted then re-created nodes are simply updated
+        self.assertListEqual(self.emitted, [(SCENE, "base", ["a"], UPDATE)])
+
+    def test_separate_worlds(self):
+
+        SCENE = gRPC.Invalidation.SCENE
+        TIMELINE = gRPC.Invalidation.TIMELINE
+
+        self.coalescer.add(SCENE, "base", ["a"], NEW)
+        self.coalescer.add(SCENE, "other", ["a"], DELETE)
+        self.coalescer.add(TIMELINE, "base", ["s"], NEW)
+
+        time.sleep(WINDOW * 5)
+
+        self.assertEqual(len(self.emitted), 3)
+        self.assertIn((SCENE, "base", ["a"], NEW), self.emitted)
+        self.assertIn((SCENE, "other", ["a"], DELETE), self.emitted)
+        self.assertIn((TIMELINE, "base", ["s"], NEW), self.emitted)
+
+        # invalidations emitted after a window are sent in the next window
+        self.emitted = []
+        self.pushed = []
+        self.coalescer.add(SCENE, "base", ["a"], DELETE)
+
+        time.sleep(WINDOW * 5)
+
+        self.assertListEqual(self.emitted, [(SCENE, "base", ["a"], DELETE)])
+
+    def test_pushed_nodes(self):
+
+        SCENE = gRPC.Invalidation.SCENE
+
+        a = gRPC.Node(id="a", name="a1")
+        self.coalescer.add(SCENE, "base", ["a"], NEW, [a])
+        a = gRPC.Node(id="a", name="a2")
+        self.coalescer.add(SCENE, "base", ["a"], UPDATE, [a])
+        b = gRPC.Node(id="b")
+        self.coalescer.add(SCENE, "base", ["b"], UPDATE, [b])
+        self.coalescer.add(SCENE, "base", ["b"], DELETE)
+
+        time.sleep(WINDOW * 5)
+
+        self.assertListEqual(self.emitted, [(SCENE, "base", ["a"], NEW),
+                                            (SCENE, "base", ["b"], DELETE)])
+
+        # only the latest version of the nodes is pushed
+        self.assertListEqual([n.name for n in self.pushed], ["a2"])
+
+    def test_client_stream(self):
+
+        client = Client("test", queue_size=2)
+
+        for i in range(3):
+            client.emit_invalidation(gRPC.Invalidation(world="base", ids=[str(i)]))
+
+        self.assertEqual(client.queue_depth, 2)
+        self.assertEqual(client.dropped_invalidations, 1)
+
+        # the client is subscribed as soon as its stream is created, even if
+        # not iterated yet
+        stream = client.invalidations(ActiveRPCContext())
+
+        # the dropped invalidation is replaced by a request to resync the
+        # world, once the pending invalidations are sent
+        received = [(invalidation.type, list(invalidation.ids)) for invalidation in
+                    [next(stream) for i in range(3)]]
+        self.assertListEqual(received, [(NEW, ["0"]), (NEW, ["1"]), (RESYNC, [])])
+
+        # closing the client closes the stream
+        closer = threading.Thread(target=client.close)
+        closer.start()
+        self.assertListEqual(list(stream), [])
+        closer.join(1)
+        self.assertFalse(closer.is_alive())
+
+        self.assertEqual(client.stats()["sent"], 2)
+        self.assertEqual(client.queue_depth, 0)
+
+
+def test_suite():
+     suite = unittest.TestLoader().loadTestsFromTestCase(TestInvalidations)
+     return suite
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,563 @@
+#! /usr/bin/env python
+
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+
+import numpy
+
+import logging; logger = logging.getLogger("underworlds.testing.meshes")
+logging.basicConfig(level=logging.DEBUG)
+
+import underworlds
+import underworlds.server
+import underworlds.underworlds_pb2 as gRPC
+import grpc
+from grpc.beta import interfaces as beta_interfaces
+from grpc.framework.interfaces.face.face import AbortionError
+from underworlds.meshstore import MeshStore, MeshCache, BLOBS, lod_id
+from underworlds.types import MeshData, MESH_FLOAT, LOD_FULL, LOD_HIGH, LOD_LOW, LOD_HULL
+from underworlds.tools.primitives_3d import Box, Sphere
+from underworlds.helpers.lod import decimate, convex_hull
+
+def terrain(n):
+    """ Returns a (n x n vertices) bumpy square surface.
+    """
+    x, y = numpy.meshgrid(numpy.linspace(0, 10, n), numpy.linspace(0, 10, n))
+    vertices = numpy.stack([x.ravel(), y.ravel(), numpy.sin(x).ravel() * numpy.cos(y).ravel()], axis=1)
+
+    i = numpy.arange(n * n).reshape(n, n)[:-1, :-1].ravel()
+    faces = numpy.concatenate([numpy.stack([i, i + 1, i + n], axis=1),
+                               numpy.stack([i + 1, i + n + 1, i + n], axis=1)])
+
+    normals = numpy.tile([0., 0., 1.], (n * n, 1))
+    return MeshData(vertices, faces, normals)
+
+class TestMeshEncoding(unittest.TestCase):
+
+    def test_packed(self):
+
+        box = Box.create(1, 2, 3, diffuse = (1, 0, 0, 1))
+        data = box.serialize(gRPC.Mesh)
+
+        self.assertEqual(len(data.vertices), 0)
+        self.assertEqual(len(data.packed_vertices), len(box.vertices) * 3 * 4)
+
+        mesh = MeshData.deserialize(gRPC.Mesh.FromString(data.SerializeToString()))
+        self.assertEqual(mesh.vertices.shape, (len(box.vertices), 3))
+        self.assertListEqual(mesh.vertices.tolist(), [list(v) for v in box.vertices])
+        self.assertListEqual(mesh.faces.tolist(), [list(f) for f in box.faces])
+        self.assertTrue(numpy.allclose(mesh.normals, box.normals))
+        self.assertEqual(mesh.diffuse, (1, 0, 0, 1))
+
+    def test_id(self):
+
+        box = Box.create(1, 1, 1)
+        self.assertEqual(box.id, Box.create(1, 1, 1).id)
+        self.assertNotEqual(box.id, Box.create(1, 1, 2).id)
+        self.assertNotEqual(box.id, Box.create(1, 1, 1, diffuse = (1, 0, 0, 1)).id)
+
+        # the ID does not change through serialization...
+        self.assertEqual(MeshData.deserialize(box.serialize(gRPC.Mesh)).id, box.id)
+
+        # ...nor from one process to another
+        id = subprocess.check_output([sys.executable, "-c",
+                "from underworlds.tools.primitives_3d import Box; print(Box.create(1, 1, 1).id)"],
+                universal_newlines = True).strip()
+        self.assertEqual(id, box.id)
+
+    def test_unpacked(self):
+        """ Meshes encoded with the repeated fields can still be read.
+        """
+        box = Box.create(1, 1, 1)
+
+        data = gRPC.Mesh(id=box.id)
+        for vertex in box.vertices:
+            point = data.vertices.add()
+            point.x, point.y, point.z = vertex
+        for f in box.faces:
+            face = data.faces.add()
+            face.x, face.y, face.z = f
+
+        mesh = MeshData.deserialize(data)
+        self.assertListEqual(mesh.vertices.tolist(), [list(v) for v in box.vertices])
+        self.assertListEqual(mesh.faces.tolist(), [list(f) for f in box.faces])
+        self.assertEqual(mesh.normals.shape, (0, 3))
+
+
+class TestLevelsOfDetail(unittest.TestCase):
+
+    def test_decimate(self):
+
+        mesh = terrain(50)
+
+        for ratio in [0.5, 0.1]:
+            vertices, faces = decimate(mesh.vertices, mesh.faces, ratio)
+            self.assertLessEqual(len(faces), len(mesh.faces) * ratio)
+            self.assertGreater(len(faces), len(mesh.faces) * ratio / 4)
+            self.assertLess(faces.max(), len(vertices))
+
+        # small meshes are kept as they are
+        box = Box.create(1, 1, 1)
+        vertices, faces = decimate(box.vertices, box.faces, 0.1)
+        self.assertEqual(len(faces), len(box.faces))
+
+    def test_convex_hull(self):
+
+        box = Box.create(1, 2, 3)
+        vertices, faces = convex_hull(box.vertices)
+        self.assertEqual(len(vertices), 8)
+        self.assertEqual(len(faces), 12)
+
+        points = numpy.random.RandomState(0).randn(1000, 3)
+        vertices, faces = convex_hull(points)
+
+        # all the points are inside the hull, whose faces are oriented outwards
+        a, b, c = vertices[faces[:, 0]], vertices[faces[:, 1]], vertices[faces[:, 2]]
+        normals = numpy.cross(b - a, c - a)
+        self.assertLess((numpy.dot(points, normals.T) - (normals * a).sum(axis=1)).max(), 1e-9)
+
+        with self.assertRaises(ValueError):
+            convex_hull([(0, 0, 0), (1, 0, 0), (0, 1, 0), (1, 1, 0), (2, 3, 0)])
+
+    def test_approximated_convex_hull(self):
+
+        # (all the points are on the hull: the worst case for quickhull)
+        points = numpy.random.RandomState(0).randn(20000, 3)
+        points /= numpy.linalg.norm(points, axis=1)[:, numpy.newaxis]
+
+        starttime = time.time()
+        vertices, faces = convex_hull(points, max_vertices=256)
+        self.assertLess(time.time() - starttime, 2.)
+
+        self.assertLessEqual(len(vertices), 256 + 6)
+        # the approximated hull has the same bounding box
+        numpy.testing.assert_allclose(vertices.min(axis=0), points.min(axis=0))
+        numpy.testing.assert_allclose(vertices.max(axis=0), points.max(axis=0))
+
+    def test_store(self):
+
+        path = tempfile.mkdtemp()
+        store = MeshStore(path)
+
+        mesh = terrain(50)
+        store[mesh.id] = mesh.serialize(gRPC.Mesh)
+
+        self.assertTrue(store.lod(mesh.id, LOD_FULL) is store[mesh.id])
+
+        nb_faces = {}
+        for lod in [LOD_HIGH, LOD_LOW, LOD_HULL]:
+            nb_faces[lod] = len(MeshData.arrays(store.lod(mesh.id, lod))[1])
+            self.assertIn(lod_id(mesh.id, lod), store)
+
+        self.assertLess(nb_faces[LOD_HIGH], len(mesh.faces))
+        self.assertLess(nb_faces[LOD_LOW], nb_faces[LOD_HIGH])
+        self.assertLess(nb_faces[LOD_HULL], len(mesh.faces))
+
+        with self.assertRaises(KeyError):
+            store.lod("non-existing-id", LOD_LOW)
+
+        # the levels of detail are not counted as meshes
+        self.assertEqual(len(store), 1)
+
+        # replacing a mesh discards its levels of detail
+        store[mesh.id] = terrain(10).serialize(gRPC.Mesh)
+        self.assertNotIn(lod_id(mesh.id, LOD_LOW), store)
+
+        store.close()
+        shutil.rmtree(path)
+
+
+class TestMeshStore(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.store = MeshStore(self.path)
+
+    def test_store(self):
+
+        box = Box.create(1, 2, 3, diffuse = (1, 0, 0, 1))
+        mesh = box.serialize(gRPC.Mesh)
+
+        self.assertFalse(box.id in self.store)
+        with self.assertRaises(KeyError):
+            self.store[box.id]
+
+        self.store[box.id] = mesh
+        self.assertTrue(box.id in self.store)
+        self.assertEqual(len(self.store), 1)
+
+        arrays = self.store.arrays(box.id)
+        self.assertEqual(arrays["vertices"].shape, (len(box.vertices), 3))
+        self.assertEqual(arrays["faces"].shape, (len(box.faces), 3))
+        self.assertListEqual(arrays["faces"].tolist(), [list(f) for f in box.faces])
+        self.assertEqual(arrays["diffuse"], (1, 0, 0, 1))
+
+        # a new store on the same directory (eg, after a restart) has the mesh
+        store = MeshStore(self.path)
+        self.assertTrue(box.id in store)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store[box.id], mesh)
+
+        # replacing a mesh, or storing it again, does not change the count
+        store[box.id] = Box.create(1, 1, 1).serialize(gRPC.Mesh)
+        store[box.id] = Box.create(1, 1, 1).serialize(gRPC.Mesh)
+        self.assertEqual(len(store), 1)
+
+    def test_deduplication(self):
+
+        mesh = Box.create(1, 1, 1).serialize(gRPC.Mesh)
+
+        self.store["a"] = mesh
+        self.store["b"] = mesh
+        self.assertEqual(len(self.store), 2)
+
+        # the content is only stored once
+        self.assertEqual(len(os.listdir(os.path.join(self.path, BLOBS))), 1)
+
+    def test_cache(self):
+
+        box = Box.create(1, 1, 1).serialize(gRPC.Mesh)
+        sphere = Sphere.create(1).serialize(gRPC.Mesh)
+
+        store = MeshStore(self.path, cache_size = 1)
+        store[box.id] = box
+        store[sphere.id] = sphere
+
+        # the meshes are cached once read...
+        mesh = store[box.id]
+        self.assertEqual(mesh, box)
+        self.assertTrue(store[box.id] is mesh)
+
+        # ...but only the last one remains in the cache, the others are read
+        # from the disk
+        store[sphere.id]
+        self.assertFalse(store[box.id] is mesh)
+        self.assertEqual(store[box.id], box)
+
+    def test_info(self):
+
+        mesh = terrain(50)
+        self.store[mesh.id] = mesh.serialize(gRPC.Mesh)
+
+        info = self.store.info(mesh.id)
+        self.assertEqual(info.nb_vertices, len(mesh.vertices))
+        self.assertEqual(info.nb_faces, len(mesh.faces))
+
+        # the hull vertices are enough to compute the bounds of the mesh...
+        hull = numpy.frombuffer(info.packed_hull_vertices, dtype=MESH_FLOAT).reshape(-1, 3)
+        self.assertLess(len(hull), len(mesh.vertices) / 2)
+        numpy.testing.assert_allclose(hull.min(axis=0), mesh.vertices.min(axis=0), atol=1e-5)
+        numpy.testing.assert_allclose(hull.max(axis=0), mesh.vertices.max(axis=0), atol=1e-5)
+        self.assertAlmostEqual(info.aabb_max.x, 10., places=5)
+
+        # ...and the bounding sphere contains all of them
+        center = (info.sphere_center.x, info.sphere_center.y, info.sphere_center.z)
+        self.assertLessEqual(numpy.linalg.norm(mesh.vertices - center, axis=1).max(), info.sphere_radius + 1e-5)
+
+        # the properties are stored, and discarded with the mesh
+        self.assertEqual(MeshStore(self.path).info(mesh.id), info)
+        self.store[mesh.id] = terrain(10).serialize(gRPC.Mesh)
+        self.assertEqual(self.store.info(mesh.id).nb_vertices, 100)
+
+        with self.assertRaises(KeyError):
+            self.store.info("non-existing-id")
+
+    def test_mesh_cache(self):
+
+        box = Box.create(1, 1, 1)
+        self.store[box.id] = box.serialize(gRPC.Mesh)
+
+        # another process reads the same directory
+        cache = MeshCache(self.path)
+        mesh = cache[box.id]
+        self.assertTrue(isinstance(mesh, MeshData))
+        self.assertEqual(mesh.id, box.id)
+        self.assertListEqual(mesh.faces.tolist(), [list(f) for f in box.faces])
+        self.assertTrue(cache[box.id] is mesh)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.path)
+
+
+class TestMeshStreaming(unittest.TestCase):
+
+    CHUNK_SIZE = 256
+
+    def setUp(self):
+        # small chunks and threshold, so that even small meshes are streamed
+        self.defaults = (underworlds._MESH_STREAMING_THRESHOLD,
+                         underworlds._MESH_CHUNK_SIZE,
+                         underworlds.server._MESH_STREAMING_THRESHOLD,
+                         underworlds.server._MESH_CHUNK_SIZE)
+        underworlds._MESH_STREAMING_THRESHOLD = self.CHUNK_SIZE
+        underworlds._MESH_CHUNK_SIZE = self.CHUNK_SIZE
+        underworlds.server._MESH_STREAMING_THRESHOLD = self.CHUNK_SIZE
+        underworlds.server._MESH_CHUNK_SIZE = self.CHUNK_SIZE
+
+        self.server = underworlds.server.start()
+        self.caches = []
+        self.contexts = []
+        self.ctx = self.context("unittest - meshes")
+
+    def context(self, name):
+        """ Returns a new context, with its own (empty) mesh cache.
+        """
+        self.caches.append(tempfile.mkdtemp())
+        os.environ["UWDS_MESH_CACHE"] = self.caches[-1]
+        self.contexts.append(underworlds.Context(name))
+        del os.environ["UWDS_MESH_CACHE"]
+        return self.contexts[-1]
+
+    def test_streaming(self):
+
+        sphere = Sphere.create(1)
+        self.assertGreater(sphere.serialize(gRPC.Mesh).ByteSize(), 10 * self.CHUNK_SIZE)
+
+        self.ctx.push_mesh(sphere)
+        self.assertTrue(self.ctx.has_mesh(sphere.id))
+
+        # too large for getMesh...
+        with self.assertRaises(AbortionError) as context:
+            self.ctx.rpc.getMesh(gRPC.MeshInContext(client=gRPC.Client(id=self.ctx.id),
+                                                    mesh=gRPC.Mesh(id=sphere.id)),
+                                 underworlds._TIMEOUT_SECONDS)
+        self.assertEqual(context.exception.code, beta_interfaces.StatusCode.RESOURCE_EXHAUSTED)
+
+        # ...but transparently streamed
+        mesh = self.context("unittest - meshes 2").mesh(sphere.id)
+        self.assertListEqual(mesh.faces.tolist(), [list(f) for f in sphere.faces])
+        self.assertEqual(len(mesh.vertices), len(sphere.vertices))
+
+        # small meshes are still sent at once
+        box = Box.create(1, 1, 1)
+        self.ctx.push_mesh(box)
+        self.assertEqual(len(self.context("unittest - meshes 3").mesh(box.id).faces), len(box.faces))
+
+    def test_mesh_info(self):
+
+        mesh = terrain(50)
+        self.ctx.push_mesh(mesh)
+
+        info = self.context("unittest - meshes 2").mesh_info(mesh.id)
+        self.assertEqual(info.nb_faces, len(mesh.faces))
+        numpy.testing.assert_allclose(info.aabb, [mesh.vertices.min(axis=0), mesh.vertices.max(axis=0)], atol=1e-5)
+        self.assertLess(len(info.hull), len(mesh.vertices))
+
+        with self.assertRaises(AbortionError) as context:
+            self.ctx.mesh_info("non-existing-id")
+        self.assertEqual(context.exception.code, beta_interfaces.StatusCode.NOT_FOUND)
+
+    def test_mesh_info_not_ready(self):
+
+        class RPCContext:
+            def __init__(self):
+                self._code = None
+            def set_code(self, code):
+                self._code = code
+            def code(self):
+                return self._code
+            def set_details(self, details):
+                pass
+
+        servicer = self.server.servicer
+        box = Box.create(1, 1, 1)
+        # (stored without requesting the computation of its properties)
+        servicer.meshes[box.id] = box.serialize(gRPC.Mesh)
+
+        # the properties are not computed by the RPC itself...
+        context = RPCContext()
+        servicer.getMeshInfo(gRPC.MeshInContext(client=gRPC.Client(id=self.ctx.id),
+                                                mesh=gRPC.Mesh(id=box.id)), context)
+        self.assertEqual(context.code(), grpc.StatusCode.UNAVAILABLE)
+
+        # ...but in the background: the clients wait for them
+        self.assertEqual(self.ctx.mesh_info(box.id).nb_vertices, len(box.vertices))
+
+    def test_hulls(self):
+
+        servicer = self.server.servicer
+        box = Box.create(1, 1, 1)
+
+        with self.assertRaises(KeyError):
+            servicer._mesh_hull(box.id)
+
+        self.ctx.push_mesh(box)
+        for i in range(100): # wait for the properties of the mesh to be computed
+            if box.id in servicer._hulls:
+                break
+            time.sleep(0.02)
+
+        hull = servicer._mesh_hull(box.id)
+        self.assertEqual(len(hull), 8)
+
+        # the hulls are then kept in memory: the store is not read anymore
+        def info(id, compute = True):
+            raise AssertionError("the mesh store should not be read")
+        servicer.meshes.info = info
+        try:
+            self.assertTrue(servicer._mesh_hull(box.id) is hull)
+        finally:
+            del servicer.meshes.info
+
+    def test_mesh_cache(self):
+
+        box = Box.create(1, 1, 1)
+        self.ctx.push_mesh(box)
+
+        ctx = self.context("unittest - meshes 2")
+        mesh = ctx.mesh(box.id)
+        self.assertEqual(mesh.id, box.id)
+
+        # repeated accesses are served by the in-process cache...
+        self.assertTrue(ctx.mesh(box.id) is mesh)
+
+        # ...and the meshes are available to the other clients of the
+        # host, even without the server
+        self.assertEqual(MeshCache(ctx.mesh_cache.path)[box.id].id, box.id)
+
+        sphere = Sphere.create(1)
+        ctx.mesh_cache[sphere.id] = sphere.serialize(gRPC.Mesh)
+        self.assertFalse(ctx.has_mesh(sphere.id))
+        self.assertEqual(ctx.mesh(sphere.id).id, sphere.id)
+
+    def test_lod(self):
+
+        mesh = terrain(50)
+        self.ctx.push_mesh(mesh)
+
+        ctx = self.context("unittest - meshes 2")
+        lod = ctx.mesh(mesh.id, LOD_LOW)
+        self.assertLess(len(lod.faces), len(mesh.faces) / 5)
+
+        self.assertEqual(len(ctx.mesh(mesh.id).faces), len(mesh.faces))
+        self.assertTrue(ctx.mesh(mesh.id, LOD_LOW) is lod)
+
+    def test_resume(self):
+
+        sphere = Sphere.create(1)
+        data = sphere.serialize(gRPC.Mesh).SerializeToString()
+        client = gRPC.Client(id=self.ctx.id)
+
+        def chunks(start, end):
+            for offset in range(start, end, self.CHUNK_SIZE):
+                yield gRPC.MeshChunk(client=client, id=sphere.id,
+                                     offset=offset, size=len(data),
+                                     data=data[offset:offset + self.CHUNK_SIZE])
+
+        # an interrupted upload...
+        res = self.ctx.rpc.pushMeshStream(chunks(0, 3 * self.CHUNK_SIZE), underworlds._TIMEOUT_SECONDS)
+        self.assertEqual(res.offset, 3 * self.CHUNK_SIZE)
+        self.assertFalse(self.ctx.has_mesh(sphere.id))
+
+        offset = self.ctx.rpc.getPushedMeshOffset(gRPC.MeshChunk(client=client, id=sphere.id),
+                                                  underworlds._TIMEOUT_SECONDS).offset
+        self.assertEqual(offset, 3 * self.CHUNK_SIZE)
+
+        # chunks must follow the ones already received
+        with self.assertRaises(AbortionError) as context:
+            self.ctx.rpc.pushMeshStream(chunks(5 * self.CHUNK_SIZE, len(data)), underworlds._TIMEOUT_SECONDS)
+        self.assertEqual(context.exception.code, beta_interfaces.StatusCode.FAILED_PRECONDITION)
+
+        # ...is resumed where it stopped
+        self.ctx.push_mesh(sphere)
+        self.assertTrue(self.ctx.has_mesh(sphere.id))
+
+        # downloads can be resumed as well
+        received = b"".join(chunk.data for chunk in \
+                            self.ctx.rpc.getMeshStream(gRPC.MeshChunk(client=client,
+                                                                      id=sphere.id,
+                                                                      offset=offset),
+                                                       underworlds._TIMEOUT_SECONDS))
+        self.assertEqual(received, data[offset:])
+
+    def test_legacy_client(self):
+
+        box = Box.create(1, 1, 1)
+        sphere = Sphere.create(1)
+        self.ctx.push_mesh(box)
+        self.ctx.push_mesh(sphere)
+
+        # clients not declaring their support of packed meshes...
+        client = self.ctx.rpc.helo(gRPC.Welcome(name="unittest - legacy"), underworlds._TIMEOUT_SECONDS)
+
+        # ...get them with the repeated fields instead (the unpacked box
+        # would be streamed otherwise)
+        underworlds.server._MESH_STREAMING_THRESHOLD = 10 * self.CHUNK_SIZE
+        data = self.ctx.rpc.getMesh(gRPC.MeshInContext(client=client, mesh=gRPC.Mesh(id=box.id)),
+                                    underworlds._TIMEOUT_SECONDS)
+        self.assertFalse(data.packed_vertices)
+        self.assertEqual(len(data.vertices), len(box.vertices))
+        self.assertListEqual(MeshData.deserialize(data).faces.tolist(), [list(f) for f in box.faces])
+
+        chunks = list(self.ctx.rpc.getMeshStream(gRPC.MeshChunk(client=client, id=sphere.id),
+                                                 underworlds._TIMEOUT_SECONDS))
+        data = gRPC.Mesh.FromString(b"".join(chunk.data for chunk in chunks))
+        self.assertFalse(data.packed_faces)
+        self.assertListEqual(MeshData.deserialize(data).faces.tolist(), [list(f) for f in sphere.faces])
+
+        # up-to-date clients get packed meshes
+        data = self.ctx.rpc.getMesh(gRPC.MeshInContext(client=gRPC.Client(id=self.ctx.id),
+                                                       mesh=gRPC.Mesh(id=box.id)),
+                                    underworlds._TIMEOUT_SECONDS)
+        self.assertEqual(len(data.vertices), 0)
+        self.assertTrue(data.packed_vertices)
+
+    def test_expired_upload(self):
+
+        sphere = Sphere.create(1)
+        data = sphere.serialize(gRPC.Mesh).SerializeToString()
+        client = gRPC.Client(id=self.ctx.id)
+
+        chunks = (gRPC.MeshChunk(client=client, id=sphere.id,
+                                 offset=offset, size=len(data),
+                                 data=data[offset:offset + self.CHUNK_SIZE])
+                  for offset in range(0, 3 * self.CHUNK_SIZE, self.CHUNK_SIZE))
+        self.ctx.rpc.pushMeshStream(chunks, underworlds._TIMEOUT_SECONDS)
+
+        def offset():
+            return self.ctx.rpc.getPushedMeshOffset(gRPC.MeshChunk(client=client, id=sphere.id),
+                                                    underworlds._TIMEOUT_SECONDS).offset
+
+        # recent partial uploads are kept...
+        c = self.server.servicer._clients[self.ctx.id]
+        c.expire_uploads()
+        self.assertEqual(offset(), 3 * self.CHUNK_SIZE)
+
+        # ...but discarded once they time out
+        c.expire_uploads(timeout=0)
+        self.assertEqual(offset(), 0)
+        self.assertEqual(len(c.uploads), 0)
+
+        # (the upload can then be restarted)
+        self.ctx.push_mesh(sphere)
+        self.assertTrue(self.ctx.has_mesh(sphere.id))
+
+    def tearDown(self):
+        for ctx in self.contexts:
+            ctx.close()
+        self.server.stop(0).wait()
+
+        for path in self.caches:
+            shutil.rmtree(path)
+
+        (underworlds._MESH_STREAMING_THRESHOLD,
+         underworlds._MESH_CHUNK_SIZE,
+         underworlds.server._MESH_STREAMING_THRESHOLD,
+         underworlds.server._MESH_CHUNK_SIZE) = self.defaults
+
+
+def test_suite():
+     suite = unittest.TestLoader().loadTestsFromTestCase(TestMeshEncoding)
+     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestLevelsOfDetail))
+     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestMeshStore))
+     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestMeshStreaming))
+     return suite
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,7 @@ logging.basicConfig(level=logging.DEBUG)
 
 import underworlds
 import underworlds.server
-from underworlds.types import Node
+from underworlds.types import Node, Mesh, Camera, CAMERA
 
 PROPAGATION_TIME=0.05 # time to wait for node update notification propagation (in sec)
 
@@ -216,6 +216,323 @@ class TestNodes(unittest.TestCase):
         time.sleep(PROPAGATION_TIME) # wait for propagation
         self.assertEqual(len(nodes), 1)
 
+    def test_concurrent_updates(self):
+        """ Several clients concurrently adding nodes to the same world, while
+        another one reads.
+        """
+        import threading
+
+        NB_THREADS = 5
+        NB_NODES = 20
+
+        def provider(idx):
+            with underworlds.Context("unittest - provider %d" % idx) as ctx:
+                nodes = ctx.worlds["base"].scene.nodes
+                for i in range(NB_NODES):
+                    nodes.append(Node())
+                    nodes.update_future.result()
+
+        threads = [threading.Thread(target=provider, args=(i,)) for i in range(NB_THREADS)]
+        for t in threads:
+            t.start()
+
+        world = self.ctx.worlds["base"]
+        for i in range(10):
+            len(world.scene.nodes)
+            world.scene.rootnode
+
+        for t in threads:
+            t.join()
+
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        nodes = world.scene.nodes
+        self.assertEqual(len(nodes), 1 + NB_THREADS * NB_NODES)
+        self.assertEqual(len(world.scene.rootnode.children), NB_THREADS * NB_NODES)
+
+    def test_batch_fetch(self):
+
+        nodes = self.ctx.worlds["base"].scene.nodes
+
+        new_nodes = [Node() for i in range(10)]
+        nodes.append(new_nodes)
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        nodes2 = self.ctx2.worlds["base"].scene.nodes
+        self.assertEqual(len(nodes2), 11)
+
+        # accessing one stale node refreshes all the stale nodes at once
+        self.assertEqual(nodes2[new_nodes[0].id], new_nodes[0])
+        self.assertEqual(len(nodes2._updated_ids), 0)
+
+        for n in new_nodes:
+            self.assertIn(n, nodes2)
+
+    def test_snapshot(self):
+
+        world = self.ctx.worlds["base"]
+        self.assertEqual(world.revision, 0)
+
+        new_nodes = [Node() for i in range(10)]
+        world.scene.nodes.append(new_nodes)
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        # a new client gets the whole world at once
+        with underworlds.Context("unittest - snapshot") as ctx:
+            world2 = ctx.worlds["base"]
+            self.assertEqual(world2.revision, 1)
+
+            nodes = world2.scene.nodes
+            self.assertEqual(len(nodes), 11)
+            self.assertEqual(len(nodes._updated_ids), 0)
+            self.assertEqual(world2.scene.rootnode, world.scene.rootnode)
+            for n in new_nodes:
+                self.assertIn(n, nodes)
+
+    def test_resync(self):
+
+        world = self.ctx.worlds["base"]
+        world2 = self.ctx2.worlds["base"]
+
+        n1 = Node()
+        n2 = Node()
+        world.scene.nodes.append([n1, n2])
+        world.scene.nodes.update_future.result()
+        world.scene.nodes.remove(n2)
+        world.scene.nodes.remove_future.result()
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        # resynchronising with changes already received is harmless
+        world2.resync()
+        self.assertEqual(world2.revision, 2)
+
+        nodes2 = world2.scene.nodes
+        self.assertEqual(len(nodes2), 2)
+        self.assertIn(n1, nodes2)
+        self.assertNotIn(n2, nodes2)
+
+    def test_missed_invalidations(self):
+
+        nodes = self.ctx.worlds["base"].scene.nodes
+        nodes2 = self.ctx2.worlds["base"].scene.nodes
+
+        # drop all the invalidations, as a server with a full queue would
+        on_invalidation = self.ctx2._on_invalidation
+        self.ctx2._on_invalidation = lambda invalidation: None
+
+        n1 = Node()
+        nodes.append(n1)
+        nodes.update_future.result()
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+        self.assertEqual(len(nodes2), 1)
+
+        # ...then tell the client to resync
+        self.ctx2._on_invalidation = on_invalidation
+        on_invalidation(underworlds.underworlds_pb2.Invalidation(type=underworlds.RESYNC, world="base"))
+        self.assertEqual(len(nodes2), 2)
+
+        # invalidations received late are not counted twice
+        on_invalidation(underworlds.underworlds_pb2.Invalidation(type=underworlds.NEW, world="base", ids=[n1.id]))
+        self.assertEqual(len(nodes2), 2)
+        self.assertIn(n1, nodes2)
+
+    def test_unknown_deletions(self):
+
+        nodes = self.ctx.worlds["base"].scene.nodes
+        self.assertEqual(len(nodes), 1)
+
+        # deletion of nodes that were never known (eg, deleted before the
+        # initial snapshot was taken) are ignored
+        nodes._on_remotely_deleted_nodes(["unknown"])
+        self.assertEqual(len(nodes), 1)
+
+        n = Node()
+        nodes.append(n)
+        nodes.update_future.result()
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+        self.assertEqual(len(nodes), 2)
+
+        # duplicate deletions are only counted once
+        nodes._on_remotely_deleted_nodes([n.id])
+        nodes._on_remotely_deleted_nodes([n.id])
+        self.assertEqual(len(nodes), 1)
+        self.assertNotIn(n.id, nodes._updated_ids)
+        self.assertNotIn(n, nodes)
+
+    def test_vanished_nodes(self):
+
+        nodes = self.ctx.worlds["base"].scene.nodes
+        nodes2 = self.ctx2.worlds["base"].scene.nodes
+
+        # hold the deletions back, so that the nodes are deleted between
+        # their invalidation and their fetching
+        on_invalidation = self.ctx2._on_invalidation
+        deletions = []
+        def holding_deletions(invalidation):
+            if invalidation.type == underworlds.DELETE:
+                deletions.append(invalidation)
+            else:
+                on_invalidation(invalidation)
+        self.ctx2._on_invalidation = holding_deletions
+
+        n1 = Node()
+        n2 = Node()
+        nodes.append([n1, n2])
+        nodes.update_future.result()
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+        self.assertEqual(len(nodes2), 3)
+
+        nodes.remove(n1)
+        nodes.remove_future.result()
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+        self.assertEqual(len(deletions), 1)
+
+        self.assertEqual(len(list(nodes2)), 2)
+        self.assertEqual(len(nodes2), 2)
+        self.assertIn(n2, nodes2)
+
+        # the late deletion is not counted twice
+        for invalidation in deletions:
+            on_invalidation(invalidation)
+        self.assertEqual(len(nodes2), 2)
+        self.assertEqual(len(list(nodes2)), 2)
+
+    def test_failing_invalidation(self):
+
+        nodes = self.ctx.worlds["base"].scene.nodes
+        nodes2 = self.ctx2.worlds["base"].scene.nodes
+
+        on_invalidation = self.ctx2._on_invalidation
+        failures = []
+        def failing_once(invalidation):
+            if not failures:
+                failures.append(invalidation)
+                raise RuntimeError("failing invalidation")
+            on_invalidation(invalidation)
+        self.ctx2._on_invalidation = failing_once
+
+        n1 = Node()
+        nodes.append(n1)
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+        self.assertEqual(len(failures), 1)
+
+        # the following invalidations are still processed
+        n2 = Node()
+        nodes.append(n2)
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+        self.assertIn(n2.id, nodes2._updated_ids)
+
+    def test_push_mode(self):
+
+        with underworlds.Context("unittest - push", push_nodes=True) as push_ctx:
+
+            nodes = self.ctx.worlds["base"].scene.nodes
+            push_nodes = push_ctx.worlds["base"].scene.nodes
+
+            n = Node()
+            n.name = "test"
+            nodes.append(n)
+            time.sleep(PROPAGATION_TIME) # wait for propagation
+
+            # the node has been pushed along with its invalidation: no need to fetch it
+            self.assertEqual(len(push_nodes), 2)
+            self.assertNotIn(n.id, push_nodes._updated_ids)
+            self.assertEqual(push_nodes[n.id].name, "test")
+
+            n.name = "test2"
+            nodes.update(n)
+            time.sleep(PROPAGATION_TIME) # wait for propagation
+
+            self.assertNotIn(n.id, push_nodes._updated_ids)
+            self.assertEqual(push_nodes[n.id].name, "test2")
+
+            # the other clients are not affected
+            self.assertEqual(self.ctx2.worlds["base"].scene.nodes[n.id].name, "test2")
+
+    def test_copy_from(self):
+
+        world = self.ctx.worlds["base"]
+        copy = self.ctx.worlds["copy"]
+        copy2 = self.ctx2.worlds["copy"]
+
+        old = Node()
+        old.name = "old"
+        copy.scene.nodes.append(old)
+
+        new_nodes = [Node() for i in range(10)]
+        world.scene.nodes.append(new_nodes)
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        copy.copy_from(world)
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        # the root node of the copy is kept
+        self.assertNotEqual(copy.scene.rootnode, world.scene.rootnode)
+
+        for nodes in [copy.scene.nodes, copy2.scene.nodes]:
+            self.assertEqual(len(nodes), 11)
+            self.assertNotIn(old, nodes)
+            for n in new_nodes:
+                self.assertIn(n, nodes)
+                self.assertEqual(nodes[n.id].parent, copy.scene.rootnode.id)
+
+        # the copy is independent from the original world
+        copy.scene.nodes.remove(new_nodes[0])
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+        self.assertEqual(len(copy.scene.nodes), 10)
+        self.assertEqual(len(world.scene.nodes), 11)
+
+    def test_find(self):
+
+        world = self.ctx.worlds["base"]
+        scene = world.scene
+
+        n1 = Mesh("cube")
+        n1.properties["mesh_ids"] = ["a"]
+        n2 = Mesh("cube")
+        n2.properties["mesh_ids"] = ["b"]
+        n3 = Camera("camera")
+        n3.properties["aspect"] = 1.
+        n3.properties["horizontalfov"] = 1.
+        scene.nodes.append([n1, n2, n3])
+
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        self.assertListEqual(scene.find(name="cube"), [n1.id, n2.id])
+        self.assertListEqual(scene.find(types=[CAMERA]), [n3.id])
+        self.assertListEqual(scene.find(name="cube", properties={"mesh_ids": "b"}), [n2.id])
+        self.assertListEqual(scene.find(properties={"aspect": None}), [n3.id])
+        self.assertListEqual(scene.nodebyname("camera"), [n3])
+
+        # nodes are fetched from other clients' worlds as well
+        self.assertListEqual(self.ctx2.worlds["base"].scene.nodebyname("camera"), [n3])
+
+    def test_spatial_queries(self):
+
+        world = self.ctx.worlds["base"]
+        scene = world.scene
+
+        nodes = []
+        for i in range(10):
+            n = Node()
+            n.translate((i, 0, 0))
+            nodes.append(n)
+        scene.nodes.append(nodes)
+
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        self.assertCountEqual(scene.query_box((1.5, -1, -1), (4, 1, 1)), [n.id for n in nodes[2:5]])
+        self.assertCountEqual(scene.query_sphere((5, 1, 0), 1.5), [n.id for n in nodes[4:7]])
+        self.assertListEqual(scene.nearest((7.9, 0, 0), 2), [nodes[8].id, nodes[7].id])
+
+        # the index is updated with the nodes
+        nodes[0].translate((20, 0, 0))
+        scene.nodes.update(nodes[0])
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        self.assertListEqual(scene.nearest((20, 0, 0)), [nodes[0].id])
+        self.assertListEqual(scene.query_sphere((0, 0, 0), 0.5), [])
+
     def tearDown(self):
         self.ctx.close()
         self.ctx2.close()
@@ -127,6 +127,73 @@ class TestParenting(unittest.TestCase):
 
 
 
+    def test_reparenting(self):
+
+        world = self.ctx.worlds["base"]
+        nodes = world.scene.nodes
+
+        parent1 = Node()
+        parent2 = Node()
+        child = Node()
+
+        child.parent = parent1.id
+
+        nodes.append([parent1, parent2, child])
+
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        self.assertListEqual(nodes[parent1.id].children, [child.id])
+        self.assertListEqual(nodes[parent2.id].children, [])
+
+        child.parent = parent2.id
+        nodes.update(child)
+
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        self.assertEqual(nodes[child.id].parent, parent2.id)
+        self.assertListEqual(nodes[parent1.id].children, [])
+        self.assertListEqual(nodes[parent2.id].children, [child.id])
+
+        # deleting the parent moves the child to the root node
+        nodes.remove(parent2)
+
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        self.assertEqual(nodes[child.id].parent, world.scene.rootnode.id)
+        self.assertIn(child.id, world.scene.rootnode.children)
+
+    def test_world_transform(self):
+
+        world = self.ctx.worlds["base"]
+        nodes = world.scene.nodes
+
+        parent = Node()
+        parent.translate((1, 0, 0))
+        child = Node()
+        child.parent = parent.id
+        child.translate((0, 1, 0))
+
+        nodes.append([parent, child])
+
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        self.assertListEqual(nodes[child.id].world_transformation[:3, 3].tolist(), [1, 1, 0])
+        self.assertListEqual(get_world_transform(world.scene, nodes[child.id])[:3, 3].tolist(), [1, 1, 0])
+
+        # moving the parent does not invalidate its children: their world
+        # transformation is unknown until they are fetched again...
+        parent.translate((2, 0, 0))
+        nodes.update(parent)
+
+        time.sleep(PROPAGATION_TIME) # wait for propagation
+
+        self.assertNotIn(child.id, nodes._updated_ids)
+        self.assertIsNone(nodes[child.id].world_transformation)
+        self.assertListEqual(nodes[parent.id].world_transformation[:3, 3].tolist(), [2, 0, 0])
+
+        # ...but it can be computed from the parent's
+        self.assertListEqual(get_world_transform(world.scene, nodes[child.id])[:3, 3].tolist(), [2, 1, 0])
+
     def tearDown(self):
         self.ctx.close()
         self.server.stop(0).wait()
@@ -0,0 +1,226 @@
+#! /usr/bin/env python
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import logging; logger = logging.getLogger("underworlds.testing.persistence")
+logging.basicConfig(level=logging.DEBUG)
+
+import underworlds
+import underworlds.server
+from underworlds.journal import Journal, LOG, WORLD, UPDATE_NODES, DELETE_NODES
+from underworlds.types import Node, Situation
+from underworlds.tools.primitives_3d import Box
+
+PROPAGATION_TIME=0.05 # time to wait for node update notification propagation (in sec)
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def replay(self):
+        journal = Journal(self.path, sync_interval = 0)
+        records = [(kind, payload) for kind, timestamp, payload in journal.replay()]
+        return journal, records
+
+    def test_replay(self):
+
+        journal, records = self.replay()
+        self.assertListEqual(records, [])
+
+        journal.append(UPDATE_NODES, b"a")
+        journal.append(UPDATE_NODES, b"b")
+        journal.append(DELETE_NODES, b"a", timestamp = 12.)
+        journal.close()
+
+        journal = Journal(self.path)
+        records = list(journal.replay())
+        journal.close()
+
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[2], (DELETE_NODES, 12., b"a"))
+        self.assertListEqual([payload for kind, timestamp, payload in records], [b"a", b"b", b"a"])
+
+    def test_torn_record(self):
+
+        journal, _ = self.replay()
+        journal.append(UPDATE_NODES, b"a")
+        journal.append(UPDATE_NODES, b"b")
+        journal.close()
+
+        # simulates a crash while writing a record
+        with open(os.path.join(self.path, LOG), "ab") as log:
+            log.write(b"\x03\x00\x00")
+
+        journal, records = self.replay()
+        self.assertListEqual(records, [(UPDATE_NODES, b"a"), (UPDATE_NODES, b"b")])
+
+        # the torn record has been discarded: new records can be appended
+        journal.append(UPDATE_NODES, b"c")
+        journal.close()
+
+        journal, records = self.replay()
+        journal.close()
+        self.assertEqual(len(records), 3)
+
+    def test_snapshot(self):
+
+        journal, _ = self.replay()
+        journal.append(UPDATE_NODES, b"a")
+        journal.append(UPDATE_NODES, b"b")
+
+        seq = journal.rotate()
+        journal.append(UPDATE_NODES, b"c")
+        journal.write_snapshot(seq, [(WORLD, b"ab")])
+        journal.append(UPDATE_NODES, b"d")
+        journal.close()
+
+        journal, records = self.replay()
+        self.assertListEqual(records, [(WORLD, b"ab"), (UPDATE_NODES, b"c"), (UPDATE_NODES, b"d")])
+
+        # a snapshot interrupted before being written: no record is lost
+        seq = journal.rotate()
+        journal.append(UPDATE_NODES, b"e")
+        journal.close()
+
+        journal, records = self.replay()
+        self.assertListEqual(records, [(WORLD, b"ab"), (UPDATE_NODES, b"c"),
+                                       (UPDATE_NODES, b"d"), (UPDATE_NODES, b"e")])
+        journal.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+
+class TestPersistence(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.server = None
+
+    def start(self):
+        self.server = underworlds.server.start(journal_path = self.path, sync_interval = 0)
+
+    def stop(self):
+        self.server.stop(0).wait()
+        self.server = None
+
+    def test_restart(self):
+
+        self.start()
+
+        with underworlds.Context("unittest - persistence") as ctx:
+            world = ctx.worlds["base"]
+            root = world.scene.rootnode.id
+
+            parent = Node()
+            parent.name = "parent"
+            child = Node()
+            child.name = "child"
+            child.parent = parent.id
+            removed = Node()
+            world.scene.nodes.append([parent, child, removed])
+            world.scene.nodes.update_future.result()
+            world.scene.nodes.remove(removed)
+            world.scene.nodes.remove_future.result()
+
+            situation = Situation()
+            world.timeline.update(situation)
+
+            mesh = Box.create(1, 1, 1)
+            ctx.push_mesh(mesh)
+
+            ctx.worlds["copy"].copy_from(world)
+            time.sleep(PROPAGATION_TIME) # wait for propagation
+
+            world.resync()
+            revision = world.revision
+
+        self.stop()
+
+        # stopping the server takes a last snapshot, which empties the journal
+        self.assertEqual(os.path.getsize(os.path.join(self.path, LOG)), 0)
+
+        self.start()
+
+        with underworlds.Context("unittest - persistence") as ctx:
+            world = ctx.worlds["base"]
+            self.assertEqual(world.revision, revision)
+            self.assertEqual(world.scene.rootnode.id, root)
+
+            nodes = world.scene.nodes
+            self.assertEqual(len(nodes), 3)
+            self.assertNotIn(removed, nodes)
+            self.assertEqual(nodes[child.id].name, "child")
+            self.assertEqual(nodes[child.id].parent, parent.id)
+            self.assertListEqual(list(nodes[parent.id].children), [child.id])
+
+            self.assertIn(situation, world.timeline)
+
+            self.assertTrue(ctx.has_mesh(mesh.id))
+
+            self.assertEqual(len(ctx.worlds["copy"].scene.nodes), 3)
+
+    def test_snapshot(self):
+
+        servicer = underworlds.server.Server(0, Journal(self.path))
+
+        n = Node()
+        n.name = "test"
+        servicer._new_world("base")
+        # (not journaled: only the snapshot can restore it)
+        servicer._update_nodes(servicer._worlds["base"],
+                               [n.serialize(underworlds.underworlds_pb2.Node)],
+                               time.time())
+        servicer.close()
+
+        # the journal now only contains the snapshot
+        self.assertEqual(os.path.getsize(os.path.join(self.path, LOG)), 0)
+
+        servicer = underworlds.server.Server(0, Journal(self.path))
+        self.assertEqual(servicer._worlds["base"].scene.node(n.id).name, "test")
+        servicer.close()
+
+    def test_reset_waits_for_writers(self):
+
+        servicer = underworlds.server.Server(0, Journal(self.path))
+        servicer._new_world("base")
+
+        # a writer is currently modifying the world...
+        lock = servicer._world_locks["base"]
+        lock.acquire_write()
+
+        reset = threading.Thread(target=servicer.reset,
+                                 args=(underworlds.underworlds_pb2.Client(id="test"), None))
+        reset.start()
+        time.sleep(PROPAGATION_TIME)
+
+        # ...so that the reset (and its journal record) waits for it
+        self.assertTrue(reset.is_alive())
+        self.assertIn("base", servicer._worlds)
+
+        lock.release_write()
+        reset.join(1)
+        self.assertFalse(reset.is_alive())
+        self.assertNotIn("base", servicer._worlds)
+
+        servicer.close()
+
+    def tearDown(self):
+        if self.server is not None:
+            self.stop()
+        shutil.rmtree(self.path)
+
+
+def test_suite():
+     suite = unittest.TestLoader().loadTestsFromTestCase(TestJournal)
+     suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestPersistence))
+     return suite
+
+if __name__ == '__main__':
+    unittest.main()
@@ -96,10 +96,13 @@ def runtest(module):
 import basic_server_interaction, \
        topology, \
        core, \
+       invalidations, \
        nodes, \
        parenting, \
        waitforchanges, \
        timeline, \
+       persistence, \
+       meshes, \
        topology, \
        visibility, \
        basic_server_interaction, \
@@ -111,10 +114,13 @@ modules = [
     basic_server_interaction, \
     topology, \
     core, \
+    invalidations, \
     nodes, \
     parenting, \
     waitforchanges, \
     timeline, \
+    persistence, \
+    meshes, \
     model_loading, \
     spatial_relations_test, \
     edit_tools_test]